@@ -0,0 +1,231 @@
+"""Measure the clients' own overhead against an in-process stand-in dataplane.
+
+    python benchmarks/bench_clients.py [--calls 2000] [--policies 20000] [--bulk 400] [--latency 0.01]
+                                       [--check] [--json]
+
+Runs against `tests.fake_server.FakeIometeServer`, so no dataplane is needed. Per-call overhead is the
+SDK's time per call minus that of a bare `requests` / `aiohttp` call to the same server, which
+cancels out the server's own cost. With `--check`, the results are compared with the limits in
+`benchmarks/thresholds.json` and the script exits with status 1 if any is exceeded.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
+
+import requests  # noqa: E402
+
+from iomete_sdk.api_utils import APIUtils  # noqa: E402
+from iomete_sdk.security import DataSecurityApiClient  # noqa: E402
+from iomete_sdk.security.policy_models import AccessPolicyView, AccessPolicyResource, AccessPolicyItem, \
+    AccessType  # noqa: E402
+from iomete_sdk.spark import SparkJobApiClient  # noqa: E402
+from tests.fake_server import FakeIometeServer  # noqa: E402
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+THRESHOLDS = Path(__file__).resolve().parent / "thresholds.json"
+
+JOB = {"name": "bench-job", "bundleId": "bundle-1", "flow": "PRIORITY", "priority": "NORMAL",
+       "template": {"mainApplicationFile": "local:///app/job.py", "arguments": ["--mode=full"],
+                    "sparkConf": {f"spark.conf.{k}": str(k) for k in range(20)}}}
+
+
+def access_policy(i: int, prefix: str = "policy") -> AccessPolicyView:
+    return AccessPolicyView(
+        name=f"{prefix}-{i}", description="generated for the client benchmark",
+        resources=[AccessPolicyResource(databases=[f"db_{i % 40}"], tables=[f"table_{i % 500}", "events"],
+                                        columns=["*"])],
+        allow_policy_items=[AccessPolicyItem(users=[f"user-{i % 300}", "analyst"], groups=["data-eng"],
+                                             accesses=[AccessType.SELECT, AccessType.READ])],
+        deny_policy_items=[AccessPolicyItem(roles=["contractor"], accesses=[AccessType.ALL])],
+    )
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def peak_memory(fn) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_sync_calls(server: FakeIometeServer, calls: int, repeat: int) -> dict:
+    job = server.add_job(JOB)
+    with SparkJobApiClient(host=server.host, api_key=server.api_key, domain=server.domain) as client:
+        url = f"{client.spark_job_endpoint}/{job['id']}"
+        session = requests.Session()
+        session.headers.update({"Content-Type": "application/json", "X-API-TOKEN": server.api_key})
+
+        raw = best_of(repeat, lambda: [session.get(url).json() for _ in range(calls)]) / calls
+        sdk = best_of(repeat, lambda: [client.get_job_by_id(job_id=job["id"]) for _ in range(calls)]) / calls
+        session.close()
+    return {"sync_call_us": sdk * 1e6, "sync_call_overhead_us": (sdk - raw) * 1e6,
+            "sync_call_overhead_ratio": sdk / raw}
+
+
+def bench_async_calls(server: FakeIometeServer, calls: int, repeat: int) -> dict:
+    from iomete_sdk.spark import AsyncSparkJobApiClient
+
+    job = server.add_job({**JOB, "name": "bench-async-job"})
+
+    async def measure():
+        headers = {"Content-Type": "application/json", "X-API-TOKEN": server.api_key}
+        async with aiohttp.ClientSession(headers=headers) as session, \
+                AsyncSparkJobApiClient(host=server.host, api_key=server.api_key, domain=server.domain) as client:
+            url = f"{client.spark_job_endpoint}/{job['id']}"
+
+            async def raw_calls():
+                for _ in range(calls):
+                    async with session.get(url) as response:
+                        await response.json()
+
+            async def sdk_calls():
+                for _ in range(calls):
+                    await client.get_job_by_id(job_id=job["id"])
+
+            timings = {}
+            for name, run in (("raw", raw_calls), ("sdk", sdk_calls)):
+                best = None
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    await run()
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[name] = best / calls
+            return timings
+
+    timings = asyncio.run(measure())
+    return {"async_call_us": timings["sdk"] * 1e6, "async_call_overhead_us": (timings["sdk"] - timings["raw"]) * 1e6,
+            "async_call_overhead_ratio": timings["sdk"] / timings["raw"]}
+
+
+def bench_serialization(count: int, repeat: int) -> dict:
+    policies = [access_policy(i) for i in range(count)]
+    data = [policy.to_dict() for policy in policies]
+    encode = best_of(repeat, lambda: [policy.to_dict() for policy in policies]) / count
+    decode = best_of(repeat, lambda: [AccessPolicyView.from_dict(item) for item in data]) / count
+    return {"policy_encode_us": encode * 1e6, "policy_decode_us": decode * 1e6}
+
+
+def bench_policy_listing(server: FakeIometeServer, count: int) -> dict:
+    for i in range(count):
+        server.add_policy("access", access_policy(i).to_dict())
+
+    with DataSecurityApiClient(host=server.host, api_key=server.api_key, domain=server.domain) as client:
+        # warm up: the server encodes the list once
+        client.get_access_policies()
+        started = time.perf_counter()
+        client.get_access_policies()
+        listed = time.perf_counter() - started
+
+        def consume_stream():
+            for _ in client.iter_access_policies():
+                pass
+
+        list_peak = peak_memory(client.get_access_policies)
+        stream_peak = peak_memory(consume_stream)
+    return {"list_policies_ms": listed * 1000, "list_peak_mb": list_peak / 1e6, "stream_peak_mb": stream_peak / 1e6,
+            "stream_memory_ratio": stream_peak / list_peak}
+
+
+def bench_bulk(server: FakeIometeServer, count: int, latency: float, max_workers: int) -> dict:
+    server.latency = latency
+    try:
+        with DataSecurityApiClient(host=server.host, api_key=server.api_key, domain=server.domain,
+                                   api_utils=APIUtils(api_key=server.api_key, pool_maxsize=max_workers)) as client:
+            sample = [access_policy(i, "sequential") for i in range(20)]
+            started = time.perf_counter()
+            for policy in sample:
+                client.create_access_policy(policy)
+            sequential = (time.perf_counter() - started) / len(sample)
+
+            policies = [access_policy(i, "bulk") for i in range(count)]
+            started = time.perf_counter()
+            results = client.create_access_policies(policies, max_workers=max_workers)
+            elapsed = time.perf_counter() - started
+            client.api_utils.close()
+    finally:
+        server.latency = 0.0
+
+    failed = sum(isinstance(result, Exception) for result in results)
+    if failed:
+        raise RuntimeError(f"{failed} bulk creates failed")
+    return {"bulk_policies_per_s": count / elapsed, "bulk_speedup": sequential * count / elapsed}
+
+
+def check(results: dict, thresholds: dict) -> list:
+    failures = []
+    for name, limit in thresholds.items():
+        if name not in results:
+            continue
+        value = results[name]
+        if "max" in limit and value > limit["max"]:
+            failures.append(f"{name} = {value:.3f} > {limit['max']}")
+        if "min" in limit and value < limit["min"]:
+            failures.append(f"{name} = {value:.3f} < {limit['min']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--policies", type=int, default=20000)
+    parser.add_argument("--bulk", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.01, help="server latency for the bulk benchmark")
+    parser.add_argument("--max-workers", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--check", action="store_true", help=f"fail on results outside {THRESHOLDS.name}")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    with FakeIometeServer() as server:
+        results.update(bench_sync_calls(server, args.calls, args.repeat))
+        if aiohttp is not None:
+            results.update(bench_async_calls(server, args.calls, args.repeat))
+        results.update(bench_serialization(args.policies, args.repeat))
+        results.update(bench_policy_listing(server, args.policies))
+        results.update(bench_bulk(server, args.bulk, args.latency, args.max_workers))
+
+    thresholds = json.loads(THRESHOLDS.read_text())
+    failures = check(results, thresholds) if args.check else []
+
+    if args.json:
+        print(json.dumps({"results": results, "failures": failures}, indent=2))
+    else:
+        print(f"{'metric':<28} {'value':>12} {'limit':>10}")
+        for name, value in results.items():
+            limit = thresholds.get(name, {})
+            bound = f"<= {limit['max']}" if "max" in limit else f">= {limit['min']}" if "min" in limit else ""
+            print(f"{name:<28} {value:>12.3f} {bound:>10}")
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Compare the JSON codecs on large policy lists and job payloads.
+
+    python benchmarks/bench_codec.py [--policies 10000] [--repeat 5] [--gc]
+
+The orjson codec scans each body for integers beyond 64 bits before decoding it; the `scan ms`
+column is that share of its decode time.
+
+Like timeit, garbage collection is paused while timing unless `--gc` is given; with it, the
+collector's cost for the many decoded containers weighs on every codec alike.
+"""
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from iomete_sdk.codec import JsonCodec, OrjsonCodec, _has_long_digits, orjson  # noqa: E402
+from iomete_sdk.security.policy_models import AccessPolicyView, AccessPolicyResource, AccessPolicyItem, \
+    AccessType  # noqa: E402
+
+
+def policy_list(count: int) -> list:
+    return [
+        AccessPolicyView(
+            id=i,
+            name=f"policy-{i}",
+            description="generated for the codec benchmark",
+            resources=[AccessPolicyResource(databases=[f"db_{i % 50}"], tables=[f"table_{i}", "events"],
+                                            columns=["*"])],
+            allow_policy_items=[AccessPolicyItem(users=[f"user-{i}", "analyst"], groups=["data-eng"],
+                                                 accesses=[AccessType.SELECT, AccessType.READ])],
+        ).to_dict(encode_json=True)
+        for i in range(count)
+    ]
+
+
+def job_payload(index: int) -> dict:
+    return {
+        "name": f"job-{index}",
+        "bundleId": f"bundle-{index}",
+        "flow": "PRIORITY",
+        "priority": "NORMAL",
+        "jobType": "MANUAL",
+        "template": {
+            "applicationType": "python",
+            "image": "iomete/spark-py:3.5.3-v1",
+            "mainApplicationFile": "local:///app/job.py",
+            "arguments": [f"--partition={index}", "--mode=full"],
+            "envVars": {f"VAR_{k}": f"value-{k}" for k in range(20)},
+            "sparkConf": {f"spark.conf.{k}": str(k) for k in range(40)},
+            "instanceConfig": {"driverType": "driver-x-small", "executorType": "exec-x-small", "executorCount": 2},
+        },
+    }
+
+
+def best_of(repeat: int, fn, collect: bool) -> float:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        if not collect:
+            gc.disable()
+        try:
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policies", type=int, default=10000)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--gc", action="store_true", help="keep garbage collection enabled while timing")
+    args = parser.parse_args()
+
+    codecs = [JsonCodec()] + ([OrjsonCodec()] if orjson is not None else [])
+    workloads = {
+        f"{args.policies} policies (one body)": policy_list(args.policies),
+        f"{args.jobs} job payloads (one body each)": [job_payload(i) for i in range(args.jobs)],
+    }
+
+    print(f"{'workload':<36} {'codec':<8} {'encode ms':>10} {'decode ms':>10} {'scan ms':>10}")
+    for name, value in workloads.items():
+        bodies = value if name.endswith("each)") else [value]
+        for codec in codecs:
+            encoded = [codec.dumps(body) for body in bodies]
+            encode = best_of(args.repeat, lambda: [codec.dumps(body) for body in bodies], args.gc)
+            decode = best_of(args.repeat, lambda: [codec.loads(body) for body in encoded], args.gc)
+            scan = best_of(args.repeat, lambda: [_has_long_digits(body) for body in encoded], args.gc) \
+                if isinstance(codec, OrjsonCodec) else 0.0
+            print(f"{name:<36} {codec.name:<8} {encode * 1000:>10.1f} {decode * 1000:>10.1f} {scan * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
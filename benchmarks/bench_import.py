@@ -0,0 +1,62 @@
+"""Measure the cold start of short-lived scripts: a fresh interpreter importing the SDK and making one call.
+
+    python benchmarks/bench_import.py [--runs 15] [--src path/to/other/checkout/src]
+
+Each scenario runs `--runs` times in a new process against an in-process
+`tests.fake_server.FakeIometeServer`; the median wall time is reported. `--src` imports the SDK
+from another checkout, e.g. an older release extracted with `git archive`, to compare against.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tests.fake_server import FakeIometeServer  # noqa: E402
+
+SCENARIOS = {
+    "python -c pass": "pass",
+    "import requests": "import requests",
+    "import iomete_sdk.spark": "import iomete_sdk.spark",
+    "import iomete_sdk.security": "import iomete_sdk.security",
+    "SparkJobApiClient.get_job_by_id": "\n".join([
+        "from iomete_sdk.spark import SparkJobApiClient",
+        "SparkJobApiClient(host=HOST, api_key=KEY, domain=DOMAIN).get_job_by_id(job_id=JOB_ID)",
+    ]),
+    "DataSecurityApiClient.get_access_policy_by_id": "\n".join([
+        "from iomete_sdk.security import DataSecurityApiClient",
+        "DataSecurityApiClient(host=HOST, api_key=KEY, domain=DOMAIN).get_access_policy_by_id(POLICY_ID)",
+    ]),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--src", default=str(ROOT / "src"), help="directory to import iomete_sdk from")
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONPATH": args.src}
+    with FakeIometeServer() as server:
+        job = server.add_job({"name": "cold-start", "bundleId": "bundle-1"})
+        policy = server.add_policy("access", {"name": "cold-start", "resources": [], "allowPolicyItems": []})
+        prelude = (f"HOST, KEY, DOMAIN = {server.host!r}, {server.api_key!r}, {server.domain!r}\n"
+                   f"JOB_ID, POLICY_ID = {job['id']!r}, {policy['id']!r}\n")
+
+        print(f"{'scenario':<48} {'median ms':>10} {'min ms':>8}")
+        for name, script in SCENARIOS.items():
+            timings = []
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                subprocess.run([sys.executable, "-c", prelude + script], env=env, check=True)
+                timings.append(time.perf_counter() - started)
+            print(f"{name:<48} {statistics.median(timings) * 1000:>10.1f} {min(timings) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare the compiled policy codecs with dataclasses_json's reflective from_dict / to_dict.
+
+    python benchmarks/bench_policy_codecs.py [--policies 5000] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from dataclasses_json.core import _asdict, _decode_dataclass  # noqa: E402
+
+from iomete_sdk.security.policy_models import AccessPolicyView, AccessPolicyResource, AccessPolicyItem, \
+    AccessType, DataMaskPolicyView, DataMaskPolicyResource, DataMaskPolicyItem, RowFilterPolicyView, \
+    RowFilterPolicyResource, RowFilterPolicyItem, ValidityPeriod  # noqa: E402
+
+
+def access_policy(i: int) -> dict:
+    return AccessPolicyView(
+        id=i, name=f"access-{i}", description="generated for the codec benchmark",
+        validity_period=ValidityPeriod(start_time="2026/01/01 00:00:00", end_time="2027/01/01 00:00:00"),
+        resources=[AccessPolicyResource(databases=[f"db_{i % 50}"], tables=[f"table_{i}", "events"], columns=["*"])],
+        allow_policy_items=[AccessPolicyItem(users=[f"user-{i}", "analyst"], groups=["data-eng"],
+                                             accesses=[AccessType.SELECT, AccessType.READ])],
+        deny_policy_items=[AccessPolicyItem(roles=["contractor"], accesses=[AccessType.ALL])],
+    ).to_dict()
+
+
+def masking_policy(i: int) -> dict:
+    return DataMaskPolicyView(
+        id=i, name=f"mask-{i}",
+        resources=[DataMaskPolicyResource(database="sales", table=f"customers_{i}", column="email")],
+        data_mask_policy_items=[DataMaskPolicyItem(data_mask_type="MASK_HASH", groups=["analysts"])],
+    ).to_dict()
+
+
+def filter_policy(i: int) -> dict:
+    return RowFilterPolicyView(
+        id=i, name=f"filter-{i}",
+        resources=[RowFilterPolicyResource(database="sales", table=f"orders_{i}")],
+        row_filter_policy_items=[RowFilterPolicyItem(filter_expr="region = 'EU'", users=[f"user-{i}"])],
+    ).to_dict()
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policies", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'model':<22} {'path':<16} {'from_dict ms':>13} {'to_dict ms':>11}")
+    for model, build in [(AccessPolicyView, access_policy), (DataMaskPolicyView, masking_policy),
+                         (RowFilterPolicyView, filter_policy)]:
+        data = [build(i) for i in range(args.policies)]
+        views = [model.from_dict(item) for item in data]
+        assert [_asdict(view) for view in views] == [view.to_dict() for view in views]
+
+        paths = [
+            ("dataclasses_json", lambda item: _decode_dataclass(model, item, False), _asdict),
+            ("compiled", model.from_dict, model.to_dict),
+        ]
+        for name, from_dict, to_dict in paths:
+            decode = best_of(args.repeat, lambda: [from_dict(item) for item in data])
+            encode = best_of(args.repeat, lambda: [to_dict(view) for view in views])
+            print(f"{model.__name__:<22} {name:<16} {decode * 1000:>13.1f} {encode * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measure the memory a decoded policy snapshot holds per policy.
+
+    python benchmarks/bench_policy_memory.py [--policies 20000]
+"""
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from iomete_sdk.security.compact import freeze_all  # noqa: E402
+from iomete_sdk.security.policy_models import AccessPolicyView  # noqa: E402
+
+
+def snapshot_body(count: int) -> bytes:
+    """Policies shaped like a real domain: a few hundred principals and databases shared by many policies."""
+    return json.dumps([
+        {
+            "id": i,
+            "name": f"access-{i}",
+            "isEnabled": True,
+            "priority": "NORMAL",
+            "description": "managed by the policy sync job",
+            "resources": [{
+                "databases": [f"db_{i % 40}"],
+                "databasesInclusionType": "INCLUDE",
+                "tables": [f"table_{i % 500}", "events"],
+                "tablesInclusionType": "INCLUDE",
+                "columns": ["*"],
+                "columnsInclusionType": "INCLUDE",
+            }],
+            "allowPolicyItems": [
+                {"users": [f"user-{i % 300}", f"user-{(i + 7) % 300}", "analyst"], "groups": ["data-eng"],
+                 "accesses": ["SELECT", "READ"]},
+                {"groups": [f"team-{i % 25}"], "roles": ["reader"], "accesses": ["SELECT"]},
+            ],
+            "denyPolicyItems": [{"roles": ["contractor"], "accesses": ["ALL"]}],
+        }
+        for i in range(count)
+    ]).encode("utf-8")
+
+
+def retained_bytes(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policies", type=int, default=20000)
+    args = parser.parse_args()
+
+    body = snapshot_body(args.policies)
+    builds = [
+        ("raw dicts", lambda: json.loads(body)),
+        ("AccessPolicyView", lambda: [AccessPolicyView.from_dict(policy) for policy in json.loads(body)]),
+        ("frozen AccessPolicyView",
+         lambda: freeze_all(AccessPolicyView.from_dict(policy) for policy in json.loads(body))),
+    ]
+
+    print(f"{'representation':<26} {'bytes/policy':>13} {'MB total':>9}")
+    for name, build in builds:
+        size = retained_bytes(build)
+        print(f"{name:<26} {size / args.policies:>13.0f} {size / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
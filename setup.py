@@ -23,11 +23,17 @@ setup(
     url='https://github.com/iomete/iomete-sdk',
     keywords=['iomete', 'sdk', 'spark-job', 'data-security-api'],
     extras_require={
-        'dev': ['pytest']
+        'dev': ['pytest', 'aiohttp>=3.9', 'orjson>=3.8', 'opentelemetry-sdk>=1.20', 'numpy>=1.22'],
+        'async': ['aiohttp>=3.9'],
+        'fast': ['orjson>=3.8'],
+        'otel': ['opentelemetry-api>=1.20'],
+        'metrics': ['numpy>=1.22'],
     },
     install_requires=[
         "requests==2.33.0",
-        "dataclasses-json==0.6.7",
+        # iomete_sdk.security.policy_codecs reuses the private _ExtendedEncoder, _asdict, _decode_dataclass and
+        # _user_overrides_or_exts of dataclasses_json.core; widen only after checking they still exist
+        "dataclasses-json>=0.6.7,<0.7",
     ],
     classifiers=[
         "Development Status :: 5 - Production/Stable",
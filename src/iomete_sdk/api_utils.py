@@ -1,10 +1,22 @@
-import json
 import logging
+import time
 from dataclasses import dataclass
 from json import JSONDecodeError
+from typing import Any, Callable, Iterator, Optional, Sequence
 
 import requests
 
+from iomete_sdk.cache import TTLCache, MISSING
+from iomete_sdk.codec import JsonCodec, default_codec
+from iomete_sdk.instrumentation import RequestEvent, RequestHook, TimedHTTPAdapter, url_template, _connect_timing
+from iomete_sdk.json_stream import iter_json_array
+from iomete_sdk.retry import RetryPolicy
+from iomete_sdk.throttle import TokenBucketRateLimiter, ConcurrencyLimiter
+from iomete_sdk.timeouts import Timeout, RequestOptions, current_request_options
+
+# bytes read from a streamed response body at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 @dataclass
 class ClientError(Exception):
@@ -15,44 +27,279 @@ class ClientError(Exception):
         return self.__repr__()
 
 
+class RequestTimeoutError(TimeoutError):
+    """Raised when connecting to or reading from the dataplane times out."""
+
+
+class DeadlineExceededError(RequestTimeoutError):
+    """Raised when the deadline set with `request_options` passes before a call completes."""
+
+
+@dataclass
+class ValidatedResponse:
+    """Validators of a GET response and the value decoded from it."""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    value: Any
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def timeout_error(options: RequestOptions, method: str, url: str, cause: Exception = None) -> RequestTimeoutError:
+    remaining = options.remaining()
+    if remaining is not None and remaining <= 0:
+        return DeadlineExceededError(f"Deadline exceeded for {method} {url}")
+    return RequestTimeoutError(f"{method} {url} timed out: {cause}")
+
+
 class APIUtils:
+    """HTTP transport shared by the API clients.
+
+    Owns a pooled keep-alive `requests.Session`, so consecutive calls against the same
+    dataplane host reuse TCP/TLS connections. A single instance is safe to share between
+    threads and between `SparkJobApiClient` / `DataSecurityApiClient` instances.
+
+    Throttling (429), gateway errors (502/503/504), connection failures and timeouts are retried
+    according to `retry_policy`; only idempotent methods are retried unless a call opts in.
+    Every attempt is bounded by `timeout`, which `request_options` can override or cap with a
+    deadline for the calls made inside its block. Optional `rate_limiter` / `concurrency_limiter`
+    instances throttle every attempt and may be shared by several transports. Bodies are encoded
+    and decoded by `codec`, orjson when it is installed.
+
+    With a `validator_cache`, GET responses that carry an `ETag` or `Last-Modified` header are
+    remembered per URL and revalidated with `If-None-Match` / `If-Modified-Since`. A 304 answer
+    returns the previously decoded value itself, without parsing or decoding anything again.
+
+    `hooks` (`RequestHook`s, e.g. a `MetricsCollector`) see every attempt with its URL template,
+    status, connect/TTFB/total times and byte counts; without hooks nothing is measured.
+    """
     logger = logging.getLogger('APIUtils')
 
-    def __init__(self, api_key, verify: bool = True):
+    def __init__(self, api_key, verify: bool = True,
+                 pool_connections: int = 10, pool_maxsize: int = 10, keep_alive: bool = True,
+                 retry_policy: RetryPolicy = None, timeout: Timeout = None,
+                 rate_limiter: TokenBucketRateLimiter = None, concurrency_limiter: ConcurrencyLimiter = None,
+                 validator_cache: TTLCache = None, codec: JsonCodec = None, hooks: Sequence[RequestHook] = None):
         self.api_key = api_key
         self.verify = verify
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout = Timeout.of(timeout) or Timeout()
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.validator_cache = validator_cache
+        self.codec = codec or default_codec()
+        self.hooks = list(hooks or ())
+
+        self.session = self._create_session()
 
-    def call(self, method: str, url: str, payload: dict = None):
-        headers = {
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        session.headers.update({
             "Content-Type": "application/json",
-            "X-API-TOKEN": self.api_key
-        }
+            "X-API-TOKEN": self.api_key,
+            "Connection": "keep-alive" if self.keep_alive else "close",
+        })
+        session.verify = self.verify
 
-        try:
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                json=payload,
-                verify=self.verify
-            )
-            response.raise_for_status()
+        adapter = TimedHTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        self.session.close()
+
+    def add_hook(self, hook: RequestHook):
+        self.hooks.append(hook)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def call(self, method: str, url: str, payload: dict = None, retry: bool = None, decode: Callable = None):
+        """Send a request and return the decoded JSON body.
+
+        `retry` overrides whether the retry policy applies to this call; by default only
+        idempotent methods are retried. `decode`, if given, converts the parsed JSON into the
+        returned value; that converted value is what a conditional GET hands back on a 304.
+        """
+        conditional = self.validator_cache is not None and method.upper() == "GET"
+        validated = self.validator_cache.get(url) if conditional else MISSING
+        headers = validated.conditional_headers() if validated is not MISSING else None
+
+        response = self._request(method, url, payload, retry, headers)
+        if response.status_code == 304 and validated is not MISSING:
+            return validated.value
 
+        data = self._handle_response(response)
+        value = decode(data) if decode is not None else data
+
+        if conditional:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self.validator_cache.set(url, ValidatedResponse(etag=etag, last_modified=last_modified, value=value))
+        return value
+
+    def stream_array(self, method: str, url: str, payload: dict = None, retry: bool = None) -> Iterator[Any]:
+        """Send a request and yield the elements of the JSON array it returns as they are read.
+
+        The body is read in `STREAM_CHUNK_SIZE` chunks and decoded one element at a time, so the
+        raw body and the full list are never held in memory. The request is sent on the first
+        `next()`; errors are raised as by `call`. Streamed responses skip the validator cache.
+        """
+        response = self._request(method, url, payload, retry, None, stream=True)
+        try:
+            if response.status_code >= 400:
+                self._handle_response(response)
             if response.status_code == 204:
-                return None
+                return
+            yield from iter_json_array(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+        finally:
+            response.close()
+
+    def _request(self, method: str, url: str, payload: dict, retry: Optional[bool],
+                 headers: Optional[dict], stream: bool = False) -> requests.Response:
+        """Send with retries, timeouts and throttling; returns the final response whatever its status."""
+        options = current_request_options()
+        timeout = options.timeout or self.timeout
+        retryable = self.retry_policy.is_retryable(method, retry)
+        # encoded once for all attempts
+        data = self.codec.dumps(payload) if payload is not None else None
+        started = time.monotonic()
+        attempt = 1
+
+        while True:
+            remaining = options.remaining()
+            if remaining is not None and remaining <= 0:
+                self.logger.error(f"Deadline exceeded before attempt {attempt}: {method} {url}")
+                raise timeout_error(options, method, url)
+            attempt_timeout = timeout.bounded(remaining)
+
+            try:
+                response = self._send(method, url, data, headers, attempt_timeout, options, stream, attempt)
+            except requests.exceptions.Timeout as e:
+                delay = self.retry_policy.next_delay(attempt, started, remaining=options.remaining()) \
+                    if retryable else None
+                if delay is None:
+                    self.logger.error(f"Request Timeout: {e}")
+                    raise timeout_error(options, method, url, e) from e
+                self.logger.warning(f"Timeout on attempt {attempt}, retrying in {delay:.2f}s: {e}")
+            except requests.exceptions.ConnectionError as e:
+                delay = self.retry_policy.next_delay(attempt, started, remaining=options.remaining()) \
+                    if retryable else None
+                if delay is None:
+                    self.logger.error(f"Request Exception: {e}")
+                    raise
+                self.logger.warning(f"Connection error on attempt {attempt}, retrying in {delay:.2f}s: {e}")
+            except requests.exceptions.RequestException as e:
+                self.logger.error(f"Request Exception: {e}")
+                raise
+            else:
+                if not retryable or response.status_code not in self.retry_policy.retry_statuses:
+                    return response
+
+                delay = self.retry_policy.next_delay(attempt, started, response.headers.get("Retry-After"),
+                                                     remaining=options.remaining())
+                if delay is None:
+                    return response
+                response.close()
+                self.logger.warning(f"HTTP {response.status_code} on attempt {attempt}, retrying in {delay:.2f}s")
+
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(self, method: str, url: str, data: Optional[bytes], headers: Optional[dict], timeout: Timeout,
+              options: RequestOptions, stream: bool = False, attempt: int = 1):
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve(max_wait=options.remaining())
+            if delay is None:
+                raise DeadlineExceededError(f"Deadline exceeded waiting for the rate limiter: {method} {url}")
+            time.sleep(delay)
+
+        if self.concurrency_limiter is None:
+            return self._transmit(method, url, data, headers, timeout, stream, attempt)
+
+        if not self.concurrency_limiter.acquire(timeout=options.remaining()):
+            raise DeadlineExceededError(f"Deadline exceeded waiting for the concurrency limiter: {method} {url}")
+        started = time.monotonic()
+        status = None
+        try:
+            response = self._transmit(method, url, data, headers, timeout, stream, attempt)
+            status = response.status_code
+            return response
+        finally:
+            self.concurrency_limiter.release(latency=time.monotonic() - started, status=status)
+
+    def _transmit(self, method: str, url: str, data: Optional[bytes], headers: Optional[dict], timeout: Timeout,
+                  stream: bool, attempt: int) -> requests.Response:
+        if not self.hooks:
+            return self.session.request(method=method, url=url, data=data, headers=headers,
+                                        verify=self.verify, timeout=(timeout.connect, timeout.read), stream=stream)
 
-            return response.json()
+        event = RequestEvent(method=method, url=url, url_template=url_template(url), attempt=attempt,
+                             request_bytes=len(data) if data else 0)
+        self._notify("before_request", event)
+        _connect_timing.seconds = 0.0
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method=method, url=url, data=data, headers=headers,
+                                            verify=self.verify, timeout=(timeout.connect, timeout.read),
+                                            stream=stream)
+        except Exception as e:
+            event.total = time.perf_counter() - started
+            event.connect_time = _connect_timing.seconds
+            event.error = e
+            self._notify("on_error", event)
+            raise
+
+        event.total = time.perf_counter() - started
+        event.connect_time = _connect_timing.seconds
+        # requests' elapsed runs until the headers were parsed
+        event.ttfb = max(0.0, response.elapsed.total_seconds() - event.connect_time)
+        event.status = response.status_code
+        if stream:
+            length = response.headers.get("Content-Length")
+            event.response_bytes = int(length) if length and length.isdigit() else None
+        else:
+            event.response_bytes = len(response.content)
+        self._notify("after_response", event)
+        return response
+
+    def _notify(self, callback: str, event: RequestEvent):
+        for hook in self.hooks:
+            try:
+                getattr(hook, callback)(event)
+            except Exception:
+                self.logger.exception(f"{type(hook).__name__}.{callback} failed")
+
+    def _handle_response(self, response: requests.Response):
+        try:
+            response.raise_for_status()
         except requests.exceptions.HTTPError as e:
             self.logger.error(f"HTTP Error: {e}")
             self.logger.info(f"Response content: {response.content}")
 
             try:
-                json_content = json.loads(response.content)
+                json_content = self.codec.loads(response.content)
             except JSONDecodeError as e:
                 self.logger.error(f"JSON Parsing Exception: {e}")
                 raise ClientError(status=response.status_code, content={})
 
             raise ClientError(status=response.status_code, content=json_content)
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Request Exception: {e}")
-            raise
+
+        if response.status_code == 204:
+            return None
+
+        return self.codec.loads(response.content)
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from json import JSONDecodeError
+
+from iomete_sdk.api_utils import ClientError, DeadlineExceededError, RequestTimeoutError, timeout_error
+from iomete_sdk.codec import JsonCodec, default_codec
+from iomete_sdk.retry import RetryPolicy
+from iomete_sdk.throttle import TokenBucketRateLimiter, ConcurrencyLimiter
+from iomete_sdk.timeouts import Timeout, current_request_options
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class AsyncAPIUtils:
+    """asyncio counterpart of `APIUtils` built on aiohttp.
+
+    The underlying `aiohttp.ClientSession` is created lazily inside the running event loop and
+    keeps a shared keep-alive connection pool of `pool_maxsize` connections. One instance can be
+    shared by `AsyncSparkJobApiClient` / `AsyncDataSecurityApiClient` instances on the same loop.
+    """
+    logger = logging.getLogger('AsyncAPIUtils')
+
+    def __init__(self, api_key, verify: bool = True, pool_maxsize: int = 100, pool_maxsize_per_host: int = 0,
+                 keep_alive: bool = True, retry_policy: RetryPolicy = None, timeout: Timeout = None,
+                 rate_limiter: TokenBucketRateLimiter = None, concurrency_limiter: ConcurrencyLimiter = None,
+                 codec: JsonCodec = None):
+        if aiohttp is None:
+            raise ImportError("AsyncAPIUtils requires aiohttp, install it with: pip install iomete-sdk[async]")
+
+        self.api_key = api_key
+        self.verify = verify
+        self.pool_maxsize = pool_maxsize
+        self.pool_maxsize_per_host = pool_maxsize_per_host
+        self.keep_alive = keep_alive
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout = Timeout.of(timeout) or Timeout()
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.codec = codec or default_codec()
+
+        self._session = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize,
+                                             limit_per_host=self.pool_maxsize_per_host,
+                                             force_close=not self.keep_alive,
+                                             ssl=None if self.verify else False)
+            self._session = aiohttp.ClientSession(connector=connector, headers={
+                "Content-Type": "application/json",
+                "X-API-TOKEN": self.api_key
+            })
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def call(self, method: str, url: str, payload: dict = None, retry: bool = None):
+        options = current_request_options()
+        timeout = options.timeout or self.timeout
+        retryable = self.retry_policy.is_retryable(method, retry)
+        started = time.monotonic()
+        attempt = 1
+
+        while True:
+            remaining = options.remaining()
+            if remaining is not None and remaining <= 0:
+                self.logger.error(f"Deadline exceeded before attempt {attempt}: {method} {url}")
+                raise timeout_error(options, method, url)
+            attempt_timeout = aiohttp.ClientTimeout(total=remaining,
+                                                    sock_connect=timeout.connect,
+                                                    sock_read=timeout.read)
+
+            try:
+                status, content, retry_after = await self._send(method, url, payload, attempt_timeout, remaining)
+            except RequestTimeoutError:
+                # already final; RequestTimeoutError is a TimeoutError and would match the clause below
+                raise
+            except asyncio.TimeoutError as e:
+                delay = self.retry_policy.next_delay(attempt, started, remaining=options.remaining()) \
+                    if retryable else None
+                if delay is None:
+                    self.logger.error(f"Request Timeout: {e}")
+                    raise timeout_error(options, method, url, e) from e
+                self.logger.warning(f"Timeout on attempt {attempt}, retrying in {delay:.2f}s: {e}")
+            except aiohttp.ClientConnectionError as e:
+                delay = self.retry_policy.next_delay(attempt, started, remaining=options.remaining()) \
+                    if retryable else None
+                if delay is None:
+                    self.logger.error(f"Request Exception: {e}")
+                    raise
+                self.logger.warning(f"Connection error on attempt {attempt}, retrying in {delay:.2f}s: {e}")
+            except aiohttp.ClientError as e:
+                self.logger.error(f"Request Exception: {e}")
+                raise
+            else:
+                if not retryable or status not in self.retry_policy.retry_statuses:
+                    return self._handle_response(url, status, content)
+
+                delay = self.retry_policy.next_delay(attempt, started, retry_after, remaining=options.remaining())
+                if delay is None:
+                    return self._handle_response(url, status, content)
+                self.logger.warning(f"HTTP {status} on attempt {attempt}, retrying in {delay:.2f}s")
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send(self, method: str, url: str, payload: dict, timeout: "aiohttp.ClientTimeout",
+                    remaining: float = None):
+        data = self.codec.dumps(payload) if payload is not None else None
+
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve(max_wait=remaining)
+            if delay is None:
+                raise DeadlineExceededError(f"Deadline exceeded waiting for the rate limiter: {method} {url}")
+            await asyncio.sleep(delay)
+
+        if self.concurrency_limiter is not None:
+            try:
+                await asyncio.wait_for(self.concurrency_limiter.acquire_async(), timeout=remaining)
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError(f"Deadline exceeded waiting for the concurrency limiter: {method} {url}")
+
+        started = time.monotonic()
+        status = None
+        try:
+            async with self._get_session().request(method=method, url=url, data=data,
+                                                   timeout=timeout) as response:
+                status = response.status
+                return status, await response.read(), response.headers.get("Retry-After")
+        finally:
+            if self.concurrency_limiter is not None:
+                self.concurrency_limiter.release(latency=time.monotonic() - started, status=status)
+
+    def _handle_response(self, url: str, status: int, content: bytes):
+        if status >= 400:
+            self.logger.error(f"HTTP Error: {status} for url: {url}")
+            self.logger.info(f"Response content: {content}")
+
+            try:
+                json_content = self.codec.loads(content)
+            except JSONDecodeError as e:
+                self.logger.error(f"JSON Parsing Exception: {e}")
+                raise ClientError(status=status, content={})
+
+            raise ClientError(status=status, content=json_content)
+
+        if status == 204:
+            return None
+
+        return self.codec.loads(content)
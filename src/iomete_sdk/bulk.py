@@ -0,0 +1,69 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable, List, TypeVar, Union
+
+from iomete_sdk.api_utils import DeadlineExceededError
+from iomete_sdk.throttle import TokenBucketRateLimiter
+from iomete_sdk.timeouts import current_request_options
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# progress(completed, total)
+ProgressCallback = Callable[[int, int], None]
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def _rate_limited(fn: Callable[[T], R], rate_limiter: TokenBucketRateLimiter) -> Callable[[T], R]:
+    def call(item: T) -> R:
+        delay = rate_limiter.reserve(max_wait=current_request_options().remaining())
+        if delay is None:
+            raise DeadlineExceededError("Deadline exceeded waiting for the bulk rate limiter")
+        time.sleep(delay)
+        return fn(item)
+
+    return call
+
+
+def run_bulk(fn: Callable[[T], R], items: Iterable[T], max_workers: int = DEFAULT_MAX_WORKERS,
+             progress: ProgressCallback = None,
+             rate_limiter: TokenBucketRateLimiter = None) -> List[Union[R, Exception]]:
+    """Apply `fn` to every item on a bounded worker pool.
+
+    Returns one entry per item in input order: the value returned by `fn`, or the exception it
+    raised. A failing item never aborts the others. At most `max_workers` calls run at once and
+    at most `2 * max_workers` are queued, so large inputs don't pile up pending work. Workers run
+    in a copy of the caller's context, so a surrounding `request_options` deadline applies. With
+    a `rate_limiter`, each call first waits for a token, on top of any limiter of the transport.
+    """
+    items = list(items)
+    if rate_limiter is not None:
+        fn = _rate_limited(fn, rate_limiter)
+    results: List[Union[R, Exception]] = [None] * len(items)
+    completed = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="iomete-bulk") as executor:
+        pending = {}
+        next_index = 0
+
+        while next_index < len(items) or pending:
+            while next_index < len(items) and len(pending) < 2 * max_workers:
+                context = contextvars.copy_context()
+                pending[executor.submit(context.run, fn, items[next_index])] = next_index
+                next_index += 1
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    results[index] = e
+
+                completed += 1
+                if progress is not None:
+                    progress(completed, len(items))
+
+    return results
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+MISSING = object()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    # entries dropped to stay within maxsize
+    evictions: int = 0
+    # entries dropped because their ttl passed
+    expirations: int = 0
+    # entries dropped by writes through the owning client
+    invalidations: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TTLCache:
+    """Thread-safe in-memory cache with per-entry time-to-live and a least-recently-used size bound."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._expirations = self._invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value or `MISSING`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return MISSING
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(hits=self._hits, misses=self._misses, evictions=self._evictions,
+                              expirations=self._expirations, invalidations=self._invalidations,
+                              size=len(self._entries))
@@ -0,0 +1,109 @@
+import json
+import math
+import re
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# orjson decodes integers beyond 64 bits as floats; bodies with such long digit runs use the stdlib.
+# Mapping digits to "1" and everything else to "0" finds them several times faster than a regex.
+_DIGIT_MASK = bytes(ord("1") if ord("0") <= byte <= ord("9") else ord("0") for byte in range(256))
+_LONG_DIGITS = b"1" * 19
+_LONG_DIGITS_TEXT = re.compile(r"[0-9]{19}")
+
+
+def _has_long_digits(data: Union[bytes, bytearray, str]) -> bool:
+    # linear in the body, a tenth to a fifth of orjson's decoding time; see benchmarks/bench_codec.py
+    if len(data) < len(_LONG_DIGITS):
+        return False
+    if isinstance(data, str):
+        return _LONG_DIGITS_TEXT.search(data) is not None
+    return _LONG_DIGITS in data.translate(_DIGIT_MASK)
+
+
+# values without floats inside
+_LEAVES = frozenset((str, int, bool, type(None)))
+
+
+def _has_non_finite(container: Any, keys: bool) -> bool:
+    """Whether a dict, list or tuple holds a NaN or infinite float; in dict keys too with `keys`."""
+    if isinstance(container, dict):
+        if keys and _has_non_finite(list(container), keys):
+            return True
+        container = container.values()
+
+    for item in container:
+        kind = type(item)
+        if kind in _LEAVES:
+            continue
+        if kind is list:
+            # most lists hold names only; skip them without a call
+            if not _LEAVES.issuperset(map(type, item)) and _has_non_finite(item, keys):
+                return True
+        elif kind is dict:
+            if _has_non_finite(item, keys):
+                return True
+        elif kind is float or isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, (dict, list, tuple)) and _has_non_finite(item, keys):
+            return True
+    return False
+
+
+class JsonCodec:
+    """Encodes request bodies and decodes response bodies; the stdlib `json` implementation.
+
+    Subclass and override `dumps` / `loads` to plug in another library. `loads` must raise
+    `json.JSONDecodeError` on invalid input.
+    """
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        # same output requests produces for `json=payload`
+        return json.dumps(obj, allow_nan=False).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """`JsonCodec` backed by orjson, several times faster on large bodies.
+
+    Anything orjson refuses or would decode differently (integers beyond 64 bits, NaN/Infinity
+    literals, non-UTF-8 input) goes through the stdlib codec instead, so every body the stdlib
+    codec accepts decodes and encodes to the same JSON values. Encoded bodies differ only in
+    bytes: non-ASCII text is written as UTF-8 rather than `\\u` escapes and there is no
+    whitespace between tokens. NaN and infinite floats raise the stdlib codec's `ValueError`.
+    """
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires orjson, install it with: pip install iomete-sdk[fast]")
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            body = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return super().dumps(obj)
+        # orjson writes NaN and infinities as null (as "null" in keys), so only bodies with nulls can hide them
+        if b"null" in body and _has_non_finite([obj], keys=b'"null":' in body):
+            return super().dumps(obj)
+        return body
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        if _has_long_digits(data):
+            return super().loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super().loads(data)
+
+
+def default_codec() -> JsonCodec:
+    """orjson when it is installed, the stdlib otherwise."""
+    return OrjsonCodec() if orjson is not None else JsonCodec()
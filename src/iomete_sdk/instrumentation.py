@@ -0,0 +1,239 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger('instrumentation')
+
+# path segment after a collection -> placeholder naming the id in it
+_ID_PLACEHOLDERS = {
+    "domains": "{domain}",
+    "jobs": "{job_id}",
+    "runs": "{run_id}",
+    "policy": "{policy_id}",
+    "name": "{job_name}",
+}
+# segments that follow a collection without being an id
+_LITERAL_SEGMENTS = frozenset({"name", "runs", "logs", "metrics"})
+
+# upper bounds of the latency buckets in seconds; one more bucket counts everything slower
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def url_template(url: str) -> str:
+    """The URL's path with ids replaced by placeholders, e.g. `/api/v2/domains/{domain}/sdk/spark/jobs/{job_id}`."""
+    segments = urlsplit(url).path.split("/")
+    for index in range(1, len(segments)):
+        placeholder = _ID_PLACEHOLDERS.get(segments[index - 1])
+        if placeholder is not None and segments[index] and \
+                (segments[index] not in _LITERAL_SEGMENTS or segments[index - 1] == "name"):
+            segments[index] = placeholder
+    return "/".join(segments)
+
+
+@dataclass
+class RequestEvent:
+    """One attempt of a request, as seen by `RequestHook`s.
+
+    The same instance is passed to `before_request` and then to `after_response` or `on_error`,
+    so hooks can keep per-attempt state in `extras`. Times are in seconds.
+    """
+    method: str
+    url: str
+    url_template: str
+    # 1 for the first attempt, 2 for the first retry, ...
+    attempt: int
+    request_bytes: int
+    status: Optional[int] = None
+    # None for streamed responses without a Content-Length
+    response_bytes: Optional[int] = None
+    # time spent opening a connection; 0 when a pooled connection was reused
+    connect_time: float = 0.0
+    # from sending the request, once connected, until the response headers arrived
+    ttfb: Optional[float] = None
+    # until the body was read (or, for streamed responses, until the headers arrived)
+    total: Optional[float] = None
+    error: Optional[BaseException] = None
+    extras: dict = field(default_factory=dict)
+
+
+class RequestHook:
+    """Base class for `APIUtils` instrumentation; override the callbacks you need.
+
+    Callbacks run on the calling thread for every attempt, retries included. An exception raised
+    by a hook is logged and doesn't affect the request.
+    """
+
+    def before_request(self, event: RequestEvent):
+        pass
+
+    def after_response(self, event: RequestEvent):
+        """Called for every response, whatever its status."""
+
+    def on_error(self, event: RequestEvent):
+        """Called when an attempt fails without a response, e.g. on a timeout; `event.error` is set."""
+
+
+class Histogram:
+    """Counts of observed values per bucket of `bounds`, with approximate percentiles."""
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the `q` quantile (0 < q <= 1), capped at the largest value seen."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.counts)),
+        }
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    # responses with a status >= 400 and attempts that failed without a response
+    errors: int = 0
+    # attempts after the first one
+    retries: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    connect: Histogram = field(default_factory=Histogram)
+    ttfb: Histogram = field(default_factory=Histogram)
+    total: Histogram = field(default_factory=Histogram)
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytesSent": self.bytes_sent,
+            "bytesReceived": self.bytes_received,
+            "connect": self.connect.to_dict(),
+            "ttfb": self.ttfb.to_dict(),
+            "total": self.total.to_dict(),
+        }
+
+
+class MetricsCollector(RequestHook):
+    """In-memory latency histograms and counters per method and URL template. Thread-safe."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._stats: Dict[Tuple[str, str], EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, event: RequestEvent, failed: bool):
+        key = (event.method, event.url_template)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats(connect=Histogram(self.buckets),
+                                                         ttfb=Histogram(self.buckets),
+                                                         total=Histogram(self.buckets))
+            stats.requests += 1
+            stats.errors += failed
+            stats.retries += event.attempt > 1
+            stats.bytes_sent += event.request_bytes
+            stats.bytes_received += event.response_bytes or 0
+            stats.connect.observe(event.connect_time)
+            if event.ttfb is not None:
+                stats.ttfb.observe(event.ttfb)
+            if event.total is not None:
+                stats.total.observe(event.total)
+
+    def after_response(self, event: RequestEvent):
+        self._record(event, failed=event.status >= 400)
+
+    def on_error(self, event: RequestEvent):
+        self._record(event, failed=True)
+
+    def stats(self, method: str, url_template: str) -> Optional[EndpointStats]:
+        return self._stats.get((method.upper(), url_template))
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Stats per `"<METHOD> <url template>"`, as plain data."""
+        with self._lock:
+            return {f"{method} {template}": stats.to_dict() for (method, template), stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# seconds the current thread spent opening connections since `APIUtils` last reset it
+_connect_timing = threading.local()
+
+
+def _add_connect_time(started: float):
+    _connect_timing.seconds = getattr(_connect_timing, "seconds", 0.0) + time.perf_counter() - started
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(started)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(started)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """`HTTPAdapter` whose connections record how long connecting (and the TLS handshake) took."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool,
+                                                   "https": _TimedHTTPSConnectionPool}
@@ -0,0 +1,101 @@
+import codecs
+import json
+import re
+from json import JSONDecodeError
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _TextBuffer:
+    """UTF-8 text read from byte chunks on demand; consumed text is dropped as more is read."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def read_more(self) -> bool:
+        if self.exhausted:
+            return False
+
+        parts = [self.text[self.pos:]]
+        self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                parts.append(self._decoder.decode(chunk))
+                break
+        else:
+            parts.append(self._decoder.decode(b"", final=True))
+            self.exhausted = True
+        self.text = "".join(parts)
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or "" at the end of the input."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.read_more():
+                return ""
+
+    def _terminated(self, end: int) -> bool:
+        # a value followed by something other than a separator may be a number cut by a chunk boundary
+        end = _WHITESPACE.match(self.text, end).end()
+        return end < len(self.text) and self.text[end] in ",]"
+
+    def decode_value(self) -> Any:
+        attempted = -1
+        while True:
+            available = len(self.text) - self.pos
+            if available > attempted or self.exhausted:
+                try:
+                    value, end = self._json.raw_decode(self.text, self.pos)
+                except JSONDecodeError:
+                    if self.exhausted:
+                        raise
+                    # retry once the buffer has doubled, so a huge element is parsed O(log n) times
+                    attempted = 2 * available
+                else:
+                    if self.exhausted or self._terminated(end):
+                        self.pos = end
+                        return value
+                    attempted = available
+            self.read_more()
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a JSON array read from `chunks` of UTF-8 bytes, one at a time.
+
+    Only the element being decoded is held in memory, not the whole document. A top-level
+    object is decoded whole and its `items` array is yielded.
+    """
+    buffer = _TextBuffer(chunks)
+
+    start = buffer.peek()
+    if start == "{":
+        while buffer.read_more():
+            pass
+        yield from json.loads(buffer.text).get("items", [])
+        return
+    if start != "[":
+        raise JSONDecodeError("Expecting a JSON array", buffer.text, buffer.pos)
+
+    buffer.pos += 1
+    if buffer.peek() == "]":
+        return
+
+    while True:
+        buffer.peek()
+        yield buffer.decode_value()
+
+        separator = buffer.peek()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise JSONDecodeError("Expecting ',' or ']'", buffer.text, buffer.pos)
+        buffer.pos += 1
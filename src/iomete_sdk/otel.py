@@ -0,0 +1,83 @@
+from urllib.parse import urlsplit
+
+from iomete_sdk.instrumentation import RequestEvent, RequestHook
+
+try:
+    from opentelemetry import metrics, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # pragma: no cover - optional dependency
+    trace = None
+
+INSTRUMENTATION_NAME = "iomete_sdk"
+
+
+class OpenTelemetryHook(RequestHook):
+    """Reports each attempt as an OpenTelemetry client span and records the HTTP client metrics.
+
+    Spans are named `"<METHOD> <url template>"` and carry the stable HTTP semantic convention
+    attributes; `http.client.request.duration` and the request/response body size histograms
+    are recorded per method, URL template and status. Uses the global tracer and meter
+    providers unless others are given.
+    """
+
+    def __init__(self, tracer_provider=None, meter_provider=None):
+        if trace is None:
+            raise ImportError("OpenTelemetryHook requires opentelemetry-api, "
+                              "install it with: pip install iomete-sdk[otel]")
+
+        self.tracer = trace.get_tracer(INSTRUMENTATION_NAME, tracer_provider=tracer_provider)
+        meter = metrics.get_meter(INSTRUMENTATION_NAME, meter_provider=meter_provider)
+        self.duration = meter.create_histogram("http.client.request.duration", unit="s",
+                                               description="Duration of HTTP client requests.")
+        self.request_size = meter.create_histogram("http.client.request.body.size", unit="By",
+                                                   description="Size of HTTP client request bodies.")
+        self.response_size = meter.create_histogram("http.client.response.body.size", unit="By",
+                                                    description="Size of HTTP client response bodies.")
+
+    @staticmethod
+    def _attributes(event: RequestEvent) -> dict:
+        url = urlsplit(event.url)
+        attributes = {"http.request.method": event.method, "url.template": event.url_template,
+                      "server.address": url.hostname}
+        if url.port is not None:
+            attributes["server.port"] = url.port
+        return attributes
+
+    def before_request(self, event: RequestEvent):
+        attributes = {**self._attributes(event), "url.full": event.url}
+        if event.attempt > 1:
+            attributes["http.request.resend_count"] = event.attempt - 1
+        event.extras["otel.span"] = self.tracer.start_span(f"{event.method} {event.url_template}",
+                                                           kind=SpanKind.CLIENT, attributes=attributes)
+
+    def after_response(self, event: RequestEvent):
+        attributes = {**self._attributes(event), "http.response.status_code": event.status}
+        if event.status >= 400:
+            attributes["error.type"] = str(event.status)
+
+        span = event.extras.pop("otel.span", None)
+        if span is not None:
+            span.set_attribute("http.response.status_code", event.status)
+            if event.status >= 400:
+                span.set_attribute("error.type", str(event.status))
+                span.set_status(Status(StatusCode.ERROR))
+            span.end()
+        self._record(event, attributes)
+
+    def on_error(self, event: RequestEvent):
+        attributes = {**self._attributes(event), "error.type": type(event.error).__qualname__}
+
+        span = event.extras.pop("otel.span", None)
+        if span is not None:
+            span.set_attribute("error.type", attributes["error.type"])
+            span.record_exception(event.error)
+            span.set_status(Status(StatusCode.ERROR, str(event.error)))
+            span.end()
+        self._record(event, attributes)
+
+    def _record(self, event: RequestEvent, attributes: dict):
+        if event.total is not None:
+            self.duration.record(event.total, attributes)
+        self.request_size.record(event.request_bytes, attributes)
+        if event.response_bytes is not None:
+            self.response_size.record(event.response_bytes, attributes)
@@ -0,0 +1,47 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 100
+
+# fetch_page(page_number, page_size), page numbers starting at 0
+PageFetcher = Callable[[int, int], List[T]]
+
+
+def iter_pages(fetch_page: PageFetcher, page_size: int = DEFAULT_PAGE_SIZE, prefetch: bool = True) -> Iterator[T]:
+    """Yield the items of consecutive pages until a short page.
+
+    At most the current and the next page are held, so memory stays flat regardless of the total
+    count. With `prefetch`, the next page is fetched on a background thread, in a copy of the
+    caller's context, while the caller processes the current one. A server that ignores the page
+    parameters and returns everything at once ends the iteration after that first page.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="iomete-page") if prefetch else None
+    try:
+        page_number = 0
+        items = fetch_page(page_number, page_size)
+        while True:
+            last_page = len(items) != page_size
+            next_page = None
+            if not last_page:
+                page_number += 1
+                if executor is not None:
+                    next_page = executor.submit(contextvars.copy_context().run, fetch_page, page_number, page_size)
+
+            yield from items
+
+            if last_page:
+                return
+            previous_first = items[0]
+            items = next_page.result() if next_page is not None else fetch_page(page_number, page_size)
+            if items and items[0] == previous_first:
+                # the same page again: pagination isn't supported
+                return
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
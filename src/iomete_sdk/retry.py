@@ -0,0 +1,72 @@
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional
+
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+@dataclass
+class RetryPolicy:
+    """Retry settings used by `APIUtils` / `AsyncAPIUtils`.
+
+    Failed attempts are retried after an exponential backoff with full jitter
+    (`uniform(0, min(backoff_max, backoff_base * 2 ** (attempt - 1)))`), or after the server's
+    `Retry-After` when it asks for longer. No retry is scheduled once `max_attempts` is reached
+    or when the next attempt would start after `total_timeout` seconds from the first one.
+    """
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    total_timeout: Optional[float] = 60.0
+    respect_retry_after: bool = True
+
+    retry_statuses: FrozenSet[int] = RETRYABLE_STATUSES
+    retry_methods: FrozenSet[str] = IDEMPOTENT_METHODS
+
+    def is_retryable(self, method: str, retry: bool = None) -> bool:
+        """`retry` overrides the per method default, e.g. to opt a POST in."""
+        if retry is not None:
+            return retry
+        return method.upper() in self.retry_methods
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def next_delay(self, attempt: int, started: float, retry_after: str = None,
+                   remaining: float = None) -> Optional[float]:
+        """Delay before the attempt following `attempt` (1-based), or None when retries are exhausted.
+
+        `remaining` is the time left until the caller's deadline, if any.
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        delay = self.backoff(attempt)
+        if self.respect_retry_after and retry_after:
+            delay = max(delay, parse_retry_after(retry_after) or 0.0)
+
+        if self.total_timeout is not None and time.monotonic() - started + delay > self.total_timeout:
+            return None
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """Parse a `Retry-After` header given either in seconds or as an HTTP date."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
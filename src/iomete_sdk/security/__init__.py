@@ -1 +1,28 @@
-from iomete_sdk.security.data_security import DataSecurityApiClient
+import importlib
+from typing import TYPE_CHECKING
+
+# exported name -> module defining it, imported on first access (PEP 562) so that the sync client
+# doesn't pull in aiohttp and vice versa
+_EXPORTS = {
+    "DataSecurityApiClient": "iomete_sdk.security.data_security",
+    "AsyncDataSecurityApiClient": "iomete_sdk.security.async_data_security",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from iomete_sdk.security.data_security import DataSecurityApiClient
+    from iomete_sdk.security.async_data_security import AsyncDataSecurityApiClient
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,358 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from fnmatch import fnmatchcase
+from itertools import chain
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from dataclasses_json import dataclass_json, LetterCase
+
+from iomete_sdk.security.policy_models import AccessType, PolicyPriority, ResourceInclusionType
+from iomete_sdk.security.policy_semantics import PUBLIC_GROUP, USER_MACRO, validity_bounds, value_name
+
+PUBLIC = f"group:{PUBLIC_GROUP}"
+ALL_ACCESSES = AccessType.ALL.value
+
+
+class FindingKind(str, Enum):
+    # two masking policies apply to the same column and principal; only the first one is used
+    MASK_CONFLICT = "MASK_CONFLICT"
+    # two row filter policies apply to the same table and principal; only the first one is used
+    ROW_FILTER_CONFLICT = "ROW_FILTER_CONFLICT"
+    # an allow and a deny item of the same priority overlap; the deny wins
+    ACCESS_CONFLICT = "ACCESS_CONFLICT"
+    # a NORMAL priority deny item never applies because an OVERRIDE allow grants the access first
+    SHADOWED_DENY = "SHADOWED_DENY"
+    # a policy that can never apply: disabled, expired, with a validity period that can't be parsed,
+    # or without resources or items
+    DEAD_POLICY = "DEAD_POLICY"
+
+
+@dataclass_json(letter_case=LetterCase.CAMEL)
+@dataclass
+class Finding:
+    kind: FindingKind
+    # names and ids of the policies involved, the one that takes effect first
+    policies: List[str]
+    policy_ids: List[Optional[int]]
+    # database.table[.column], as named (or patterned) by the policies
+    resource: Optional[str] = None
+    # "user:<name>", "group:<name>" or "role:<name>"
+    principals: List[str] = field(default_factory=list)
+    accesses: List[str] = field(default_factory=list)
+    detail: Optional[str] = None
+
+
+@dataclass_json(letter_case=LetterCase.CAMEL)
+@dataclass
+class AnalysisReport:
+    findings: List[Finding] = field(default_factory=list)
+
+    def of_kind(self, kind: FindingKind) -> List[Finding]:
+        return [finding for finding in self.findings if finding.kind == kind]
+
+
+@dataclass
+class _Entry:
+    # OVERRIDE first, then input order: the order policies take effect in
+    rank: Tuple[bool, int]
+    policy: object
+    principals: FrozenSet[str]
+    override: bool = False
+    accesses: FrozenSet[str] = frozenset()
+    # None: every column
+    columns: Optional[Tuple[str, ...]] = None
+    # (principals, accesses) of the item's exceptions
+    exceptions: Tuple[Tuple[FrozenSet[str], FrozenSet[str]], ...] = ()
+    detail: Optional[str] = None
+
+
+def _user(user: str) -> str:
+    # {USER} applies to every user, which for overlaps is the same as the public group
+    return PUBLIC if user == USER_MACRO else f"user:{user}"
+
+
+def _principals(items) -> FrozenSet[str]:
+    return frozenset(chain.from_iterable(
+        chain((_user(user) for user in item.users or ()), (f"group:{group}" for group in item.groups or ()),
+              (f"role:{role}" for role in item.roles or ()))
+        for item in items))
+
+
+def _overlap(a: FrozenSet[str], b: FrozenSet[str], everything: str) -> FrozenSet[str]:
+    """Names in both `a` and `b`, where `everything` (the public group, or ALL accesses) stands for any name."""
+    if everything in a:
+        return b
+    if everything in b:
+        return a
+    return a & b
+
+
+def _is_pattern(name: str) -> bool:
+    return "*" in name or "?" in name
+
+
+def _covers(general: Tuple[str, ...], specific: Tuple[str, ...]) -> bool:
+    return all(fnmatchcase(name, pattern) for pattern, name in zip(general, specific))
+
+
+def _columns(names: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+    names = tuple(name.lower() for name in names or () if name)
+    return None if not names or "*" in names else names
+
+
+def _columns_cover(general: Optional[Tuple[str, ...]], specific: Optional[Tuple[str, ...]]) -> bool:
+    if general is None:
+        return True
+    return specific is not None and all(any(fnmatchcase(name, pattern) for pattern in general) for name in specific)
+
+
+def _columns_overlap(a: Optional[Tuple[str, ...]], b: Optional[Tuple[str, ...]]) -> bool:
+    return a is None or b is None or any(fnmatchcase(x, y) or fnmatchcase(y, x) for x in a for y in b)
+
+
+class _KeyIndex:
+    """Entries grouped by resource key, with pattern keys indexed by their first literal name.
+
+    A pattern key can only cover keys with the same name at that level, so each key only visits
+    the pattern keys sharing one of its names, plus those without any literal name.
+    """
+
+    def __init__(self):
+        self.entries: Dict[Tuple[str, ...], List[_Entry]] = {}
+        # (level, literal name) -> pattern keys whose first literal name is at that level
+        self.patterns_by_name: Dict[Tuple[int, str], List[Tuple[str, ...]]] = {}
+        self.all_patterns: List[Tuple[str, ...]] = []
+
+    def add(self, key: Tuple[str, ...], entry: _Entry):
+        entries = self.entries.get(key)
+        if entries is None:
+            entries = self.entries[key] = []
+            if any(_is_pattern(name) for name in key):
+                literal = next(((level, name) for level, name in enumerate(key) if not _is_pattern(name)), None)
+                if literal is None:
+                    self.all_patterns.append(key)
+                else:
+                    self.patterns_by_name.setdefault(literal, []).append(key)
+        entries.append(entry)
+
+    def covering(self, key: Tuple[str, ...]) -> List[_Entry]:
+        """The entries of `key` and of every pattern key that covers it."""
+        found = list(self.entries[key])
+        candidates = chain.from_iterable(self.patterns_by_name.get(literal, ()) for literal in enumerate(key))
+        for pattern in chain(candidates, self.all_patterns):
+            if pattern != key and _covers(pattern, key):
+                found.extend(self.entries[pattern])
+        return found
+
+
+class _Findings:
+    """Merges findings about the same policies and resource into one, collecting principals and accesses."""
+
+    def __init__(self):
+        self._merged: Dict[tuple, Tuple[Finding, set, set]] = {}
+
+    def add(self, kind: FindingKind, entries: List[_Entry], resource: str, principals: Iterable[str] = (),
+            accesses: Iterable[str] = (), detail: str = None):
+        """`entries` in the order their policies take effect."""
+        policies = [entry.policy for entry in entries]
+        key = (kind, tuple(entry.rank for entry in entries), resource)
+        merged = self._merged.get(key)
+        if merged is None:
+            finding = Finding(kind=kind, policies=[policy.name for policy in policies],
+                              policy_ids=[policy.id for policy in policies], resource=resource, detail=detail)
+            merged = self._merged[key] = (finding, set(), set())
+        merged[1].update(principals)
+        merged[2].update(accesses)
+
+    def __iter__(self):
+        for finding, principals, accesses in self._merged.values():
+            finding.principals = sorted(principals)
+            finding.accesses = sorted(accesses)
+            yield finding
+
+
+def _resource_label(key: Tuple[str, ...]) -> str:
+    return ".".join(key)
+
+
+def _is_override(policy) -> bool:
+    return value_name(policy.priority) == PolicyPriority.OVERRIDE.value
+
+
+def _dead(policy, items, now: datetime) -> Optional[str]:
+    reasons = []
+    if not policy.is_enabled:
+        reasons.append("disabled")
+    validity = validity_bounds(policy)
+    if validity is None:
+        reasons.append("validity period can't be parsed")
+    elif validity[1] is not None and validity[1] <= now:
+        reasons.append(f"expired at {policy.validity_period.end_time} {policy.validity_period.time_zone}")
+    if not policy.resources:
+        reasons.append("no resources")
+    if not items:
+        reasons.append("no policy items")
+    return ", ".join(reasons) or None
+
+
+def _selection_conflicts(index: _KeyIndex, kind: FindingKind, findings: _Findings):
+    """Masks or row filters: the first applicable policy is used, any other one for the same principal is not."""
+    for key, own in index.entries.items():
+        entries = index.covering(key)
+        if len(entries) < 2:
+            continue
+        public = {entry.rank for entry in entries if PUBLIC in entry.principals}
+        by_principal: Dict[str, set] = defaultdict(set)
+        for entry in entries:
+            for principal in entry.principals:
+                by_principal[principal].add(entry.rank)
+
+        # report each overlap where it is most specific: at a key that one of the policies names itself
+        own_ranks = {entry.rank for entry in own}
+        by_rank = {entry.rank: entry for entry in entries}
+        conflicts: Dict[FrozenSet, set] = defaultdict(set)
+        for principal, ranks in by_principal.items():
+            ranks = frozenset(ranks | public)
+            if len(ranks) > 1 and not ranks.isdisjoint(own_ranks):
+                conflicts[ranks].add(principal)
+        for ranks, principals in conflicts.items():
+            conflicting = [by_rank[rank] for rank in sorted(ranks)]
+            detail = ", ".join(entry.detail for entry in conflicting if entry.detail)
+            findings.add(kind, conflicting, _resource_label(key), principals, detail=detail or None)
+
+
+def _excepted(entry: _Entry, principals: FrozenSet[str], accesses: FrozenSet[str]) -> bool:
+    return any(_overlap(principals, exception_principals, PUBLIC) == principals
+               and _overlap(accesses, exception_accesses, ALL_ACCESSES) == accesses
+               for exception_principals, exception_accesses in entry.exceptions)
+
+
+def _access_findings(index: _KeyIndex, findings: _Findings):
+    for key, own in index.entries.items():
+        entries = index.covering(key)
+        allows: Dict[str, List[_Entry]] = defaultdict(list)
+        for entry in entries:
+            if entry.detail == "allow":
+                for principal in entry.principals:
+                    allows[principal].append(entry)
+        if not allows:
+            continue
+        public_allows = allows.get(PUBLIC, [])
+
+        own_ids = {id(entry) for entry in own}
+        for deny in entries:
+            if deny.detail != "deny":
+                continue
+            if PUBLIC in deny.principals:
+                candidates = {id(entry): entry for entry in chain.from_iterable(allows.values())}
+            else:
+                candidates = {id(entry): entry for entry in chain(
+                    public_allows, chain.from_iterable(allows.get(principal, ()) for principal in deny.principals))}
+
+            for allow in candidates.values():
+                if allow.policy is deny.policy or (id(allow) not in own_ids and id(deny) not in own_ids):
+                    continue
+                principals = _overlap(deny.principals, allow.principals, PUBLIC)
+                accesses = _overlap(deny.accesses, allow.accesses, ALL_ACCESSES)
+                if not principals or not accesses or _excepted(allow, principals, accesses) \
+                        or _excepted(deny, principals, accesses):
+                    continue
+
+                if allow.override and not deny.override:
+                    if id(deny) in own_ids and _columns_cover(allow.columns, deny.columns):
+                        findings.add(FindingKind.SHADOWED_DENY, [allow, deny], _resource_label(key),
+                                     principals, accesses)
+                elif allow.override == deny.override and _columns_overlap(allow.columns, deny.columns):
+                    findings.add(FindingKind.ACCESS_CONFLICT, [deny, allow], _resource_label(key),
+                                 principals, accesses, detail="deny wins")
+
+
+def _live(policy, now: datetime) -> bool:
+    validity = validity_bounds(policy)
+    return policy.is_enabled and validity is not None and (validity[1] is None or now < validity[1])
+
+
+def _included(*inclusion_types) -> bool:
+    return all(value_name(inclusion or ResourceInclusionType.INCLUDE) == ResourceInclusionType.INCLUDE.value
+               for inclusion in inclusion_types)
+
+
+def _names(*names: Optional[str]) -> Tuple[str, ...]:
+    return tuple((name or "*").lower() for name in names)
+
+
+def analyze_policies(access_policies: Iterable = (), filter_policies: Iterable = (),
+                     masking_policies: Iterable = (), now: datetime = None) -> AnalysisReport:
+    """Find conflicting masks and row filters, conflicting or shadowed access items and dead policies.
+
+    Policies are grouped by the (database, table[, column]) names they use, and within a group by
+    principal, so each policy is only compared with the policies that name the same resource or
+    a pattern covering it; the work grows with the number of actual overlaps, not with the square
+    of the number of policies. Resources using EXCLUDE are not checked for overlaps.
+
+    Findings about the same policies and resource are merged; `AnalysisReport.to_dict()` /
+    `to_json()` give the machine-readable form.
+    """
+    now = now or datetime.now(timezone.utc)
+    findings = _Findings()
+    dead = []
+
+    access = _KeyIndex()
+    for order, policy in enumerate(access_policies):
+        reason = _dead(policy, (policy.allow_policy_items or []) + (policy.deny_policy_items or []), now)
+        if reason:
+            dead.append((policy, reason))
+        if not _live(policy, now):
+            continue
+        override = _is_override(policy)
+        rank = (not override, order)
+        for kind, exceptions in (("allow", policy.allow_exceptions), ("deny", policy.deny_exceptions)):
+            exceptions = tuple((_principals([item]), frozenset(value_name(access) for access in item.accesses or ()))
+                               for item in exceptions or ())
+            for item in getattr(policy, f"{kind}_policy_items") or ():
+                for resource in policy.resources or ():
+                    if not _included(resource.databases_inclusion_type, resource.tables_inclusion_type,
+                                     resource.columns_inclusion_type):
+                        continue
+                    entry = _Entry(rank, policy, _principals([item]), override,
+                                   frozenset(value_name(access) for access in item.accesses or ()),
+                                   _columns(resource.columns), exceptions, kind)
+                    for database in resource.databases or ("*",):
+                        for table in resource.tables or ("*",):
+                            access.add(_names(database, table), entry)
+
+    masks = _KeyIndex()
+    for order, policy in enumerate(masking_policies):
+        items = policy.data_mask_policy_items or []
+        reason = _dead(policy, items, now)
+        if reason:
+            dead.append((policy, reason))
+        if not _live(policy, now) or not items:
+            continue
+        detail = "/".join(dict.fromkeys(value_name(item.data_mask_type) for item in items))
+        entry = _Entry((not _is_override(policy), order), policy, _principals(items), detail=detail)
+        for resource in policy.resources or ():
+            masks.add(_names(resource.database, resource.table, resource.column), entry)
+
+    filters = _KeyIndex()
+    for order, policy in enumerate(filter_policies):
+        items = policy.row_filter_policy_items or []
+        reason = _dead(policy, items, now)
+        if reason:
+            dead.append((policy, reason))
+        if not _live(policy, now) or not items:
+            continue
+        entry = _Entry((not _is_override(policy), order), policy, _principals(items))
+        for resource in policy.resources or ():
+            filters.add(_names(resource.database, resource.table), entry)
+
+    _access_findings(access, findings)
+    _selection_conflicts(masks, FindingKind.MASK_CONFLICT, findings)
+    _selection_conflicts(filters, FindingKind.ROW_FILTER_CONFLICT, findings)
+
+    report = AnalysisReport([Finding(kind=FindingKind.DEAD_POLICY, policies=[policy.name], policy_ids=[policy.id],
+                                     detail=reason) for policy, reason in dead])
+    report.findings.extend(findings)
+    return report
@@ -0,0 +1,131 @@
+import logging
+from dataclasses import dataclass
+from typing import List
+
+from iomete_sdk.async_api_utils import AsyncAPIUtils
+from iomete_sdk.security.policy_models import AccessPolicyView, RowFilterPolicyView, DataMaskPolicyView
+from iomete_sdk.timeouts import Timeout
+
+
+@dataclass
+class AsyncDataSecurityApiClient:
+    """asyncio version of `DataSecurityApiClient` with the same methods and return values."""
+    logger = logging.getLogger('AsyncDataSecurityApiClient')
+
+    host: str
+    api_key: str
+    domain: str
+
+    data_security_endpoint: str = None
+    api_utils: AsyncAPIUtils = None
+    # connect/read timeouts of the transport created by this client
+    timeout: Timeout = None
+
+    def __post_init__(self):
+        # a transport passed in by the caller is shared and stays open when this client is closed
+        self._owns_api_utils = self.api_utils is None
+        if self._owns_api_utils:
+            self.api_utils = AsyncAPIUtils(self.api_key, timeout=self.timeout)
+
+        self.logger.debug(f"Host: {self.host}")
+        self.data_security_endpoint = f"{self.host}/api/v1/domains/{self.domain}/data-security"
+
+    async def close(self):
+        if self._owns_api_utils:
+            await self.api_utils.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def create_access_policy(self, policy: AccessPolicyView) -> AccessPolicyView:
+        data = await self.api_utils.call(method="POST",
+                                         url=f"{self.data_security_endpoint}/access/policy",
+                                         payload=policy.to_dict())
+
+        return AccessPolicyView.from_dict(data)
+
+    async def get_access_policies(self) -> List[AccessPolicyView]:
+        data = await self.api_utils.call(method="GET",
+                                         url=f"{self.data_security_endpoint}/access/policy")
+
+        return [AccessPolicyView.from_dict(policy) for policy in data]
+
+    async def get_access_policy_by_id(self, policy_id: int) -> AccessPolicyView:
+        data = await self.api_utils.call(method="GET",
+                                         url=f"{self.data_security_endpoint}/access/policy/{policy_id}")
+
+        return AccessPolicyView.from_dict(data)
+
+    async def update_access_policy_by_id(self, policy_id: int, policy: AccessPolicyView) -> AccessPolicyView:
+        data = await self.api_utils.call(method="PUT",
+                                         url=f"{self.data_security_endpoint}/access/policy/{policy_id}",
+                                         payload=policy.to_dict())
+
+        return AccessPolicyView.from_dict(data)
+
+    async def delete_access_policy_by_id(self, policy_id: int):
+        await self.api_utils.call(method="DELETE",
+                                  url=f"{self.data_security_endpoint}/access/policy/{policy_id}")
+
+    async def create_filter_policy(self, policy: RowFilterPolicyView) -> RowFilterPolicyView:
+        data = await self.api_utils.call(method="POST",
+                                         url=f"{self.data_security_endpoint}/filter/policy",
+                                         payload=policy.to_dict())
+
+        return RowFilterPolicyView.from_dict(data)
+
+    async def get_filter_policies(self) -> List[RowFilterPolicyView]:
+        data = await self.api_utils.call(method="GET",
+                                         url=f"{self.data_security_endpoint}/filter/policy")
+
+        return [RowFilterPolicyView.from_dict(policy) for policy in data]
+
+    async def get_filter_policy_by_id(self, policy_id: int) -> RowFilterPolicyView:
+        data = await self.api_utils.call(method="GET",
+                                         url=f"{self.data_security_endpoint}/filter/policy/{policy_id}")
+
+        return RowFilterPolicyView.from_dict(data)
+
+    async def update_filter_policy_by_id(self, policy_id: int, policy: RowFilterPolicyView) -> RowFilterPolicyView:
+        data = await self.api_utils.call(method="PUT",
+                                         url=f"{self.data_security_endpoint}/filter/policy/{policy_id}",
+                                         payload=policy.to_dict())
+
+        return RowFilterPolicyView.from_dict(data)
+
+    async def delete_filter_policy_by_id(self, policy_id: int):
+        await self.api_utils.call(method="DELETE",
+                                  url=f"{self.data_security_endpoint}/filter/policy/{policy_id}")
+
+    async def create_masking_policy(self, policy: DataMaskPolicyView) -> DataMaskPolicyView:
+        data = await self.api_utils.call(method="POST",
+                                         url=f"{self.data_security_endpoint}/mask/policy",
+                                         payload=policy.to_dict())
+
+        return DataMaskPolicyView.from_dict(data)
+
+    async def get_masking_policies(self) -> List[DataMaskPolicyView]:
+        data = await self.api_utils.call(method="GET",
+                                         url=f"{self.data_security_endpoint}/mask/policy")
+
+        return [DataMaskPolicyView.from_dict(policy) for policy in data]
+
+    async def get_masking_policy_by_id(self, policy_id: int) -> DataMaskPolicyView:
+        data = await self.api_utils.call(method="GET",
+                                         url=f"{self.data_security_endpoint}/mask/policy/{policy_id}")
+
+        return DataMaskPolicyView.from_dict(data)
+
+    async def update_masking_policy_by_id(self, policy_id: int, policy: DataMaskPolicyView) -> DataMaskPolicyView:
+        data = await self.api_utils.call(method="PUT",
+                                         url=f"{self.data_security_endpoint}/mask/policy/{policy_id}",
+                                         payload=policy.to_dict())
+
+        return DataMaskPolicyView.from_dict(data)
+
+    async def delete_masking_policy_by_id(self, policy_id: int):
+        await self.api_utils.call(method="DELETE",
+                                  url=f"{self.data_security_endpoint}/mask/policy/{policy_id}")
@@ -0,0 +1,93 @@
+import dataclasses
+import sys
+from typing import Any, Dict, Iterable, List, Tuple, Union, get_args, get_origin, get_type_hints
+
+# model class -> its generated frozen variant, and back
+_FROZEN: Dict[type, type] = {}
+_MODELS: Dict[type, type] = {}
+
+
+def _frozen_type(type_):
+    origin = get_origin(type_)
+    if origin is Union:
+        return Union[tuple(_frozen_type(arg) for arg in get_args(type_))]
+    if origin in (list, List):
+        (item_type,) = get_args(type_) or (Any,)
+        return Tuple[_frozen_type(item_type), ...]
+    if dataclasses.is_dataclass(type_):
+        return frozen_model(type_)
+    return type_
+
+
+def frozen_model(cls: type) -> type:
+    """The frozen, slotted and hashable variant of a policy model: same fields, lists as tuples."""
+    frozen = _FROZEN.get(cls)
+    if frozen is not None:
+        return frozen
+
+    hints = get_type_hints(cls)
+    fields = [(field.name, _frozen_type(hints[field.name]), dataclasses.field(default=field.default))
+              for field in dataclasses.fields(cls)]
+    frozen = dataclasses.make_dataclass(f"Frozen{cls.__name__}", fields, frozen=True, slots=True, namespace={
+        "thaw": thaw,
+        "to_dict": lambda self, encode_json=False: thaw(self).to_dict(encode_json=encode_json),
+    })
+    # importable by name, so frozen snapshots can be pickled
+    frozen.__module__ = __name__
+    globals()[frozen.__name__] = frozen
+    _FROZEN[cls] = frozen
+    _MODELS[frozen] = cls
+    return frozen
+
+
+def _key(value):
+    # shared values are compared by identity; others by type and value, so "SELECT" and
+    # AccessType.SELECT, or 1 and True, never replace one another
+    if type(value) is tuple or type(value) in _MODELS:
+        return id(value)
+    return type(value), value
+
+
+def _freeze(value, pool: dict):
+    value_type = type(value)
+    if value_type is str:
+        return sys.intern(value)
+
+    if value_type is list or value_type is tuple:
+        frozen = tuple(_freeze(item, pool) for item in value)
+    elif dataclasses.is_dataclass(value) and value_type not in _MODELS and not isinstance(value, type):
+        frozen_cls = frozen_model(value_type)
+        frozen = frozen_cls(**{field.name: _freeze(getattr(value, field.name), pool)
+                               for field in dataclasses.fields(value)})
+    else:
+        return value
+
+    key = (type(frozen), tuple(_key(item) for item in (frozen if type(frozen) is tuple else
+                                                        (getattr(frozen, name) for name in frozen.__slots__))))
+    return pool.setdefault(key, frozen)
+
+
+def freeze(obj, pool: dict = None):
+    """Frozen, hashable copy of a policy model, e.g. for long-lived snapshots or as a dict key.
+
+    Lists become tuples and strings are interned. Equal nested resources, items and lists are
+    stored once: pass the same `pool` dict when freezing many policies (or use `freeze_all`)
+    to share them across the whole snapshot.
+    """
+    return _freeze(obj, pool if pool is not None else {})
+
+
+def freeze_all(objs: Iterable) -> list:
+    """`freeze` every policy, sharing equal nested values between them."""
+    pool = {}
+    return [_freeze(obj, pool) for obj in objs]
+
+
+def thaw(obj):
+    """Mutable policy model equal to a frozen one, with fresh lists."""
+    if type(obj) is tuple:
+        return [thaw(item) for item in obj]
+    model = _MODELS.get(type(obj))
+    if model is None:
+        return obj
+    return model(**{name: thaw(getattr(obj, name)) for name in obj.__slots__})
@@ -1,9 +1,13 @@
 import logging
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, replace
+from typing import Iterator, List, Union, Optional
 
 from iomete_sdk.api_utils import ClientError, APIUtils
+from iomete_sdk.bulk import run_bulk, ProgressCallback, DEFAULT_MAX_WORKERS
+from iomete_sdk.cache import TTLCache, MISSING
 from iomete_sdk.security.policy_models import AccessPolicyView, RowFilterPolicyView, DataMaskPolicyView
+from iomete_sdk.security.reconcile import PolicyKind, PolicyPlan, PolicyPlanResult, plan_policies
+from iomete_sdk.timeouts import Timeout
 
 
 @dataclass
@@ -16,13 +20,62 @@ class DataSecurityApiClient:
 
     data_security_endpoint: str = None
     api_utils: APIUtils = None
+    # connect/read timeouts of the transport created by this client
+    timeout: Timeout = None
+    # opt-in read-through cache for get_*_policy_by_id, invalidated by this client's updates and deletes
+    cache: TTLCache = None
 
     def __post_init__(self):
-        self.api_utils = APIUtils(self.api_key)
+        # a transport passed in by the caller is shared and stays open when this client is closed
+        self._owns_api_utils = self.api_utils is None
+        if self._owns_api_utils:
+            self.api_utils = APIUtils(self.api_key, timeout=self.timeout)
 
         self.logger.debug(f"Host: {self.host}")
         self.data_security_endpoint = f"{self.host}/api/v1/domains/{self.domain}/data-security"
 
+    def close(self):
+        if self._owns_api_utils:
+            self.api_utils.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _get_policy_data(self, path: str, policy_id: int) -> dict:
+        # raw JSON is cached so every caller decodes its own, independently mutable view
+        if self.cache is not None:
+            data = self.cache.get((path, policy_id))
+            if data is not MISSING:
+                return data
+
+        data = self.api_utils.call(method="GET", url=f"{self.data_security_endpoint}/{path}/{policy_id}")
+        if self.cache is not None:
+            self.cache.set((path, policy_id), data)
+        return data
+
+    def _get_policies(self, path: str, view_type: type) -> list:
+        def decode(data: list) -> list:
+            if self.cache is not None:
+                for policy in data:
+                    self.cache.set((path, policy["id"]), policy)
+            return [view_type.from_dict(policy) for policy in data]
+
+        # with a validator cache on the transport, a 304 returns the views decoded last time
+        return self.api_utils.call(method="GET", url=f"{self.data_security_endpoint}/{path}", decode=decode)
+
+    def _iter_policies(self, path: str, view_type: type) -> Iterator:
+        for policy in self.api_utils.stream_array(method="GET", url=f"{self.data_security_endpoint}/{path}"):
+            if self.cache is not None:
+                self.cache.set((path, policy["id"]), policy)
+            yield view_type.from_dict(policy)
+
+    def _invalidate(self, path: str, policy_id: int):
+        if self.cache is not None:
+            self.cache.invalidate((path, policy_id))
+
     def create_access_policy(self, policy: AccessPolicyView) -> AccessPolicyView:
         data = self.api_utils.call(method="POST",
                                    url=f"{self.data_security_endpoint}/access/policy",
@@ -31,27 +84,49 @@ class DataSecurityApiClient:
         return AccessPolicyView.from_dict(data)
 
     def get_access_policies(self) -> List[AccessPolicyView]:
-        data = self.api_utils.call(method="GET",
-                                   url=f"{self.data_security_endpoint}/access/policy")
+        return self._get_policies("access/policy", AccessPolicyView)
 
-        return [AccessPolicyView.from_dict(policy) for policy in data]
+    def iter_access_policies(self) -> Iterator[AccessPolicyView]:
+        """Like `get_access_policies`, but decodes the response incrementally and yields one view at a time."""
+        return self._iter_policies("access/policy", AccessPolicyView)
 
     def get_access_policy_by_id(self, policy_id: int) -> AccessPolicyView:
-        data = self.api_utils.call(method="GET",
-                                   url=f"{self.data_security_endpoint}/access/policy/{policy_id}")
+        data = self._get_policy_data("access/policy", policy_id)
 
         return AccessPolicyView.from_dict(data)
 
     def update_access_policy_by_id(self, policy_id: int, policy: AccessPolicyView) -> AccessPolicyView:
-        data = self.api_utils.call(method="PUT",
-                                   url=f"{self.data_security_endpoint}/access/policy/{policy_id}",
-                                   payload=policy.to_dict())
+        try:
+            data = self.api_utils.call(method="PUT",
+                                       url=f"{self.data_security_endpoint}/access/policy/{policy_id}",
+                                       payload=policy.to_dict())
+        finally:
+            self._invalidate("access/policy", policy_id)
 
         return AccessPolicyView.from_dict(data)
 
     def delete_access_policy_by_id(self, policy_id: int):
-        self.api_utils.call(method="DELETE",
-                            url=f"{self.data_security_endpoint}/access/policy/{policy_id}")
+        try:
+            self.api_utils.call(method="DELETE",
+                                url=f"{self.data_security_endpoint}/access/policy/{policy_id}")
+        finally:
+            self._invalidate("access/policy", policy_id)
+
+    def create_access_policies(self, policies: List[AccessPolicyView], max_workers: int = DEFAULT_MAX_WORKERS,
+                               progress: ProgressCallback = None) -> List[Union[AccessPolicyView, Exception]]:
+        """Create policies concurrently; returns the created policy or the raised error per input, in order."""
+        return run_bulk(self.create_access_policy, policies, max_workers=max_workers, progress=progress)
+
+    def update_access_policies(self, policies: List[AccessPolicyView], max_workers: int = DEFAULT_MAX_WORKERS,
+                               progress: ProgressCallback = None) -> List[Union[AccessPolicyView, Exception]]:
+        """Update policies concurrently by `id`; returns the updated policy or the raised error per input."""
+        return run_bulk(lambda policy: self.update_access_policy_by_id(policy.id, policy), policies,
+                        max_workers=max_workers, progress=progress)
+
+    def delete_access_policies(self, policy_ids: List[int], max_workers: int = DEFAULT_MAX_WORKERS,
+                               progress: ProgressCallback = None) -> List[Optional[Exception]]:
+        """Delete policies concurrently; returns None or the raised error per input, in order."""
+        return run_bulk(self.delete_access_policy_by_id, policy_ids, max_workers=max_workers, progress=progress)
 
     def create_filter_policy(self, policy: RowFilterPolicyView) -> RowFilterPolicyView:
         data = self.api_utils.call(method="POST",
@@ -61,27 +136,48 @@ class DataSecurityApiClient:
         return RowFilterPolicyView.from_dict(data)
 
     def get_filter_policies(self) -> List[RowFilterPolicyView]:
-        data = self.api_utils.call(method="GET",
-                                   url=f"{self.data_security_endpoint}/filter/policy")
+        return self._get_policies("filter/policy", RowFilterPolicyView)
 
-        return [RowFilterPolicyView.from_dict(policy) for policy in data]
+    def iter_filter_policies(self) -> Iterator[RowFilterPolicyView]:
+        return self._iter_policies("filter/policy", RowFilterPolicyView)
 
     def get_filter_policy_by_id(self, policy_id: int) -> RowFilterPolicyView:
-        data = self.api_utils.call(method="GET",
-                                   url=f"{self.data_security_endpoint}/filter/policy/{policy_id}")
+        data = self._get_policy_data("filter/policy", policy_id)
 
         return RowFilterPolicyView.from_dict(data)
 
     def update_filter_policy_by_id(self, policy_id: int, policy: RowFilterPolicyView) -> RowFilterPolicyView:
-        data = self.api_utils.call(method="PUT",
-                                   url=f"{self.data_security_endpoint}/filter/policy/{policy_id}",
-                                   payload=policy.to_dict())
+        try:
+            data = self.api_utils.call(method="PUT",
+                                       url=f"{self.data_security_endpoint}/filter/policy/{policy_id}",
+                                       payload=policy.to_dict())
+        finally:
+            self._invalidate("filter/policy", policy_id)
 
         return RowFilterPolicyView.from_dict(data)
 
     def delete_filter_policy_by_id(self, policy_id: int):
-        self.api_utils.call(method="DELETE",
-                            url=f"{self.data_security_endpoint}/filter/policy/{policy_id}")
+        try:
+            self.api_utils.call(method="DELETE",
+                                url=f"{self.data_security_endpoint}/filter/policy/{policy_id}")
+        finally:
+            self._invalidate("filter/policy", policy_id)
+
+    def create_filter_policies(self, policies: List[RowFilterPolicyView], max_workers: int = DEFAULT_MAX_WORKERS,
+                               progress: ProgressCallback = None) -> List[Union[RowFilterPolicyView, Exception]]:
+        """Create policies concurrently; returns the created policy or the raised error per input, in order."""
+        return run_bulk(self.create_filter_policy, policies, max_workers=max_workers, progress=progress)
+
+    def update_filter_policies(self, policies: List[RowFilterPolicyView], max_workers: int = DEFAULT_MAX_WORKERS,
+                               progress: ProgressCallback = None) -> List[Union[RowFilterPolicyView, Exception]]:
+        """Update policies concurrently by `id`; returns the updated policy or the raised error per input."""
+        return run_bulk(lambda policy: self.update_filter_policy_by_id(policy.id, policy), policies,
+                        max_workers=max_workers, progress=progress)
+
+    def delete_filter_policies(self, policy_ids: List[int], max_workers: int = DEFAULT_MAX_WORKERS,
+                               progress: ProgressCallback = None) -> List[Optional[Exception]]:
+        """Delete policies concurrently; returns None or the raised error per input, in order."""
+        return run_bulk(self.delete_filter_policy_by_id, policy_ids, max_workers=max_workers, progress=progress)
 
     def create_masking_policy(self, policy: DataMaskPolicyView) -> DataMaskPolicyView:
         data = self.api_utils.call(method="POST",
@@ -91,24 +187,79 @@ class DataSecurityApiClient:
         return DataMaskPolicyView.from_dict(data)
 
     def get_masking_policies(self) -> List[DataMaskPolicyView]:
-        data = self.api_utils.call(method="GET",
-                                   url=f"{self.data_security_endpoint}/mask/policy")
+        return self._get_policies("mask/policy", DataMaskPolicyView)
 
-        return [DataMaskPolicyView.from_dict(policy) for policy in data]
+    def iter_masking_policies(self) -> Iterator[DataMaskPolicyView]:
+        return self._iter_policies("mask/policy", DataMaskPolicyView)
 
     def get_masking_policy_by_id(self, policy_id: int) -> DataMaskPolicyView:
-        data = self.api_utils.call(method="GET",
-                                   url=f"{self.data_security_endpoint}/mask/policy/{policy_id}")
+        data = self._get_policy_data("mask/policy", policy_id)
 
         return DataMaskPolicyView.from_dict(data)
 
     def update_masking_policy_by_id(self, policy_id: int, policy: DataMaskPolicyView) -> DataMaskPolicyView:
-        data = self.api_utils.call(method="PUT",
-                                   url=f"{self.data_security_endpoint}/mask/policy/{policy_id}",
-                                   payload=policy.to_dict())
+        try:
+            data = self.api_utils.call(method="PUT",
+                                       url=f"{self.data_security_endpoint}/mask/policy/{policy_id}",
+                                       payload=policy.to_dict())
+        finally:
+            self._invalidate("mask/policy", policy_id)
 
         return DataMaskPolicyView.from_dict(data)
 
     def delete_masking_policy_by_id(self, policy_id: int):
-        self.api_utils.call(method="DELETE",
-                            url=f"{self.data_security_endpoint}/mask/policy/{policy_id}")
+        try:
+            self.api_utils.call(method="DELETE",
+                                url=f"{self.data_security_endpoint}/mask/policy/{policy_id}")
+        finally:
+            self._invalidate("mask/policy", policy_id)
+
+    def create_masking_policies(self, policies: List[DataMaskPolicyView], max_workers: int = DEFAULT_MAX_WORKERS,
+                                progress: ProgressCallback = None) -> List[Union[DataMaskPolicyView, Exception]]:
+        """Create policies concurrently; returns the created policy or the raised error per input, in order."""
+        return run_bulk(self.create_masking_policy, policies, max_workers=max_workers, progress=progress)
+
+    def update_masking_policies(self, policies: List[DataMaskPolicyView], max_workers: int = DEFAULT_MAX_WORKERS,
+                                progress: ProgressCallback = None) -> List[Union[DataMaskPolicyView, Exception]]:
+        """Update policies concurrently by `id`; returns the updated policy or the raised error per input."""
+        return run_bulk(lambda policy: self.update_masking_policy_by_id(policy.id, policy), policies,
+                        max_workers=max_workers, progress=progress)
+
+    def delete_masking_policies(self, policy_ids: List[int], max_workers: int = DEFAULT_MAX_WORKERS,
+                                progress: ProgressCallback = None) -> List[Optional[Exception]]:
+        """Delete policies concurrently; returns None or the raised error per input, in order."""
+        return run_bulk(self.delete_masking_policy_by_id, policy_ids, max_workers=max_workers, progress=progress)
+
+    def plan_access_policies(self, desired: List[AccessPolicyView], delete_missing: bool = False) -> PolicyPlan:
+        """Diff desired access policies, matched by name, against the server; see `apply_policy_plan`."""
+        return plan_policies(PolicyKind.ACCESS, desired, self.get_access_policies(), delete_missing=delete_missing)
+
+    def plan_filter_policies(self, desired: List[RowFilterPolicyView], delete_missing: bool = False) -> PolicyPlan:
+        return plan_policies(PolicyKind.FILTER, desired, self.get_filter_policies(), delete_missing=delete_missing)
+
+    def plan_masking_policies(self, desired: List[DataMaskPolicyView], delete_missing: bool = False) -> PolicyPlan:
+        return plan_policies(PolicyKind.MASKING, desired, self.get_masking_policies(), delete_missing=delete_missing)
+
+    def apply_policy_plan(self, plan: PolicyPlan, max_workers: int = DEFAULT_MAX_WORKERS,
+                          progress: ProgressCallback = None) -> PolicyPlanResult:
+        """Send only the creates, updates and deletes of `plan`, concurrently, without aborting on failures."""
+        create, update, delete = {
+            PolicyKind.ACCESS: (self.create_access_policy, self.update_access_policy_by_id,
+                                self.delete_access_policy_by_id),
+            PolicyKind.FILTER: (self.create_filter_policy, self.update_filter_policy_by_id,
+                                self.delete_filter_policy_by_id),
+            PolicyKind.MASKING: (self.create_masking_policy, self.update_masking_policy_by_id,
+                                 self.delete_masking_policy_by_id),
+        }[plan.kind]
+
+        operations = [lambda policy=policy: create(policy) for policy in plan.creates]
+        operations += [lambda change=change: update(change.policy_id, replace(change.desired, id=change.policy_id))
+                       for change in plan.updates]
+        operations += [lambda policy=policy: delete(policy.id) for policy in plan.deletes]
+
+        results = run_bulk(lambda operation: operation(), operations, max_workers=max_workers, progress=progress)
+
+        updates_end = len(plan.creates) + len(plan.updates)
+        return PolicyPlanResult(creates=results[:len(plan.creates)],
+                                updates=results[len(plan.creates):updates_end],
+                                deletes=results[updates_end:])
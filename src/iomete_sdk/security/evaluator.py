@@ -0,0 +1,336 @@
+import heapq
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from fnmatch import translate
+from itertools import chain
+from operator import attrgetter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from iomete_sdk.security.policy_models import AccessType, PolicyPriority, ResourceInclusionType
+from iomete_sdk.security.policy_semantics import PUBLIC_GROUP, user_matches, validity_bounds, value_name
+
+logger = logging.getLogger('PolicyEvaluator')
+
+_RANK = attrgetter("rank")
+
+
+@dataclass(frozen=True)
+class Principal:
+    user: Optional[str] = None
+    groups: FrozenSet[str] = frozenset()
+    roles: FrozenSet[str] = frozenset()
+
+    def __post_init__(self):
+        # accept any iterable of names
+        object.__setattr__(self, "groups", frozenset(self.groups))
+        object.__setattr__(self, "roles", frozenset(self.roles))
+
+
+@dataclass(frozen=True)
+class Resource:
+    """A database, a table (`table`) or a column (`table` and `column`)."""
+    database: str
+    table: Optional[str] = None
+    column: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class AccessDecision:
+    allowed: bool
+    # the policy that decided; None when no policy applies and access is denied by default
+    policy: object = None
+
+
+@dataclass(frozen=True)
+class RowFilterDecision:
+    filter_expr: Optional[str]
+    policy: object
+
+
+@dataclass(frozen=True)
+class MaskDecision:
+    data_mask_type: Optional[str]
+    data_mask_custom_expr: Optional[str]
+    policy: object
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    access: AccessDecision
+    row_filter: Optional[RowFilterDecision]
+    mask: Optional[MaskDecision]
+
+
+class _NameMatcher:
+    """Matches one resource level (database, table or column) against a policy's names or patterns."""
+
+    def __init__(self, patterns: Optional[Sequence[str]], inclusion=ResourceInclusionType.INCLUDE):
+        patterns = [pattern.lower() for pattern in patterns or () if pattern]
+        self.exclude = value_name(inclusion or ResourceInclusionType.INCLUDE) == ResourceInclusionType.EXCLUDE.value
+        # no names, like "*", matches everything, including requests that stop above this level
+        self.match_all = not patterns or "*" in patterns
+        self.literals = frozenset(pattern for pattern in patterns if "*" not in pattern and "?" not in pattern)
+        wildcards = [translate(pattern) for pattern in patterns if pattern not in self.literals and pattern != "*"]
+        self.regex = re.compile("|".join(wildcards)) if wildcards else None
+
+    @property
+    def indexable(self) -> bool:
+        return not self.exclude and not self.match_all and self.regex is None
+
+    def matches(self, value: Optional[str]) -> bool:
+        if value is None:
+            return self.match_all and not self.exclude
+        hit = self.match_all or value in self.literals or (self.regex is not None and self.regex.match(value))
+        return bool(hit) != self.exclude
+
+
+@dataclass
+class _Item:
+    users: FrozenSet[str]
+    groups: FrozenSet[str]
+    roles: FrozenSet[str]
+    accesses: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def of(cls, item) -> "_Item":
+        return cls(users=frozenset(item.users or ()), groups=frozenset(item.groups or ()),
+                   roles=frozenset(item.roles or ()),
+                   accesses=frozenset(value_name(access) for access in getattr(item, "accesses", None) or ()))
+
+    def applies_to(self, principal: Principal) -> bool:
+        return (user_matches(self.users, principal.user) or PUBLIC_GROUP in self.groups
+                or not self.groups.isdisjoint(principal.groups) or not self.roles.isdisjoint(principal.roles))
+
+    def grants(self, principal: Principal, access: str) -> bool:
+        return (access in self.accesses or AccessType.ALL.value in self.accesses) and self.applies_to(principal)
+
+
+@dataclass
+class _Policy:
+    order: int
+    policy: object
+    # (database, table, column) matchers, one per resource of the policy
+    resources: List[Tuple[_NameMatcher, ...]]
+    items: Dict[str, List[_Item]] = field(default_factory=dict)
+    starts: Optional[datetime] = None
+    ends: Optional[datetime] = None
+    # OVERRIDE policies first, then in the order they were given
+    rank: Tuple[bool, int] = field(init=False)
+
+    def __post_init__(self):
+        self.rank = (value_name(self.policy.priority) != PolicyPriority.OVERRIDE.value, self.order)
+
+    def is_valid_at(self, at: datetime) -> bool:
+        return (self.starts is None or self.starts <= at) and (self.ends is None or at < self.ends)
+
+    def matches(self, names: Tuple[Optional[str], ...]) -> bool:
+        return any(all(matcher.matches(name) for matcher, name in zip(matchers, names)) for matchers in self.resources)
+
+
+class _ResourceIndex:
+    """Policies by the literal names of their resources, each list in the order policies take effect.
+
+    A resource is indexed at its first level with only literal names: policies for any database
+    and a literal table are found by table name, and so on. Only resources with a wildcard or
+    EXCLUDE at every level are candidates for every query.
+    """
+
+    def __init__(self, policies: List[_Policy]):
+        self.by_table: Dict[Tuple[str, str], List[_Policy]] = {}
+        self.by_database: Dict[str, List[_Policy]] = {}
+        # (level, name) -> policies whose resource is indexed at level 1 or 2 but not above
+        self.by_name: Dict[Tuple[int, str], List[_Policy]] = {}
+        self.unindexed: List[_Policy] = []
+
+        def add(bucket: List[_Policy], policy: _Policy):
+            # a policy's resources are added one after another, so repeats are adjacent
+            if not bucket or bucket[-1] is not policy:
+                bucket.append(policy)
+
+        for policy in policies:
+            for matchers in policy.resources:
+                database, table = matchers[0], matchers[1]
+                if database.indexable and table.indexable:
+                    for database_name in database.literals:
+                        for table_name in table.literals:
+                            add(self.by_table.setdefault((database_name, table_name), []), policy)
+                elif database.indexable:
+                    for database_name in database.literals:
+                        add(self.by_database.setdefault(database_name, []), policy)
+                else:
+                    level = next((level for level, matcher in enumerate(matchers) if matcher.indexable), None)
+                    if level is None:
+                        add(self.unindexed, policy)
+                    else:
+                        for name in matchers[level].literals:
+                            add(self.by_name.setdefault((level, name), []), policy)
+
+        for bucket in chain((self.unindexed,), self.by_table.values(), self.by_database.values(),
+                            self.by_name.values()):
+            bucket.sort(key=_RANK)
+
+    def candidates(self, names: Tuple[Optional[str], ...]) -> List[_Policy]:
+        """The policies matching `names`, OVERRIDE policies first, then in the order they were given."""
+        database, table = names[0], names[1]
+        lists = [self.unindexed, self.by_database.get(database)]
+        if table is not None:
+            lists.append(self.by_table.get((database, table)))
+        # a literal name never matches a request stopping above its level
+        lists.extend(self.by_name.get((level, name)) for level, name in enumerate(names) if level and name is not None)
+        lists = [policies for policies in lists if policies]
+
+        ordered = lists[0] if len(lists) == 1 else heapq.merge(*lists, key=_RANK)
+        found = []
+        for policy in ordered:
+            # the same policy from several lists comes out adjacently
+            if (not found or found[-1] is not policy) and policy.matches(names):
+                found.append(policy)
+        return found
+
+
+def _names(resource: Resource) -> Tuple[Optional[str], ...]:
+    return tuple(name.lower() if name is not None else None
+                 for name in (resource.database, resource.table, resource.column))
+
+
+class PolicyEvaluator:
+    """Answers access, row filter and masking questions locally from a snapshot of policies.
+
+    Resources are matched case-insensitively with `*` / `?` wildcards and INCLUDE/EXCLUDE; a
+    request that stops at the database or table level only matches policies covering every
+    table or column below it. Disabled policies and policies outside their validity period are
+    ignored. Access is decided level by level, OVERRIDE priority policies first: a deny item that
+    applies (and has no applicable deny exception) wins over allow items of the same level;
+    without any applicable item, access is denied. Row filters and masks come from the first
+    applicable item of the first matching policy. Items naming the `{USER}` macro apply to every
+    principal with a user; `{OWNER}` is not resolved, resource owners aren't part of the snapshot.
+    A policy whose validity period can't be parsed is logged and ignored.
+
+    Policies are indexed by the literal database, table or column names of their resources, so a
+    query only looks at the policies naming its resource plus those using patterns at every level. Works with the policy views and with
+    their frozen variants from `iomete_sdk.security.compact`.
+    """
+
+    def __init__(self, access_policies: Iterable = (), filter_policies: Iterable = (),
+                 masking_policies: Iterable = ()):
+        access = []
+        for policy, validity in _usable(access_policies):
+            resources = [(_NameMatcher(resource.databases, resource.databases_inclusion_type),
+                          _NameMatcher(resource.tables, resource.tables_inclusion_type),
+                          _NameMatcher(resource.columns, resource.columns_inclusion_type))
+                         for resource in policy.resources or ()]
+            items = {kind: [_Item.of(item) for item in getattr(policy, kind) or ()]
+                     for kind in ("allow_policy_items", "allow_exceptions", "deny_policy_items", "deny_exceptions")}
+            access.append(_Policy(len(access), policy, resources, items, *validity))
+
+        filters = [_Policy(order, policy, [(_NameMatcher([resource.database]), _NameMatcher([resource.table]))
+                                           for resource in policy.resources or ()],
+                           {"items": [_Item.of(item) for item in policy.row_filter_policy_items or ()]},
+                           *validity)
+                   for order, (policy, validity) in enumerate(_usable(filter_policies))]
+
+        masks = [_Policy(order, policy, [(_NameMatcher([resource.database]), _NameMatcher([resource.table]),
+                                          _NameMatcher([resource.column]))
+                                         for resource in policy.resources or ()],
+                         {"items": [_Item.of(item) for item in policy.data_mask_policy_items or ()]},
+                         *validity)
+                 for order, (policy, validity) in enumerate(_usable(masking_policies))]
+
+        self._access = _ResourceIndex(access)
+        self._filters = _ResourceIndex(filters)
+        self._masks = _ResourceIndex(masks)
+
+    @classmethod
+    def from_client(cls, client) -> "PolicyEvaluator":
+        """Snapshot all policies of a `DataSecurityApiClient`."""
+        return cls(access_policies=client.iter_access_policies(), filter_policies=client.iter_filter_policies(),
+                   masking_policies=client.iter_masking_policies())
+
+    def check_access(self, principal: Principal, access: AccessType, resource: Resource,
+                     at: datetime = None) -> AccessDecision:
+        return self._decide(self._access.candidates(_names(resource)), principal, value_name(access), at or _now())
+
+    def check_access_many(self, queries: Iterable[Tuple[Principal, AccessType, Resource]],
+                          at: datetime = None) -> List[AccessDecision]:
+        """`check_access` for many queries, looking up the policies of each distinct resource once."""
+        at = at or _now()
+        candidates: Dict[Resource, List[_Policy]] = {}
+        decisions = []
+        for principal, access, resource in queries:
+            policies = candidates.get(resource)
+            if policies is None:
+                policies = candidates[resource] = [policy for policy in self._access.candidates(_names(resource))
+                                                   if policy.is_valid_at(at)]
+            decisions.append(self._decide(policies, principal, value_name(access), at))
+        return decisions
+
+    def row_filter(self, principal: Principal, resource: Resource, at: datetime = None) -> Optional[RowFilterDecision]:
+        table = Resource(database=resource.database, table=resource.table)
+        item, policy = self._first_item(self._filters, _names(table)[:2], principal, at or _now())
+        return RowFilterDecision(filter_expr=item.filter_expr, policy=policy) if item is not None else None
+
+    def mask(self, principal: Principal, resource: Resource, at: datetime = None) -> Optional[MaskDecision]:
+        item, policy = self._first_item(self._masks, _names(resource), principal, at or _now())
+        if item is None:
+            return None
+        return MaskDecision(data_mask_type=item.data_mask_type, data_mask_custom_expr=item.data_mask_custom_expr,
+                            policy=policy)
+
+    def evaluate(self, principal: Principal, access: AccessType, resource: Resource,
+                 at: datetime = None) -> Evaluation:
+        """Access decision plus the row filter and mask that apply to `principal` on `resource`."""
+        at = at or _now()
+        return Evaluation(access=self.check_access(principal, access, resource, at),
+                          row_filter=self.row_filter(principal, resource, at),
+                          mask=self.mask(principal, resource, at) if resource.column is not None else None)
+
+    @staticmethod
+    def _decide(policies: List[_Policy], principal: Principal, access: str, at: datetime) -> AccessDecision:
+        allowed_by = None
+        level = None
+        for policy in policies:
+            policy_level = value_name(policy.policy.priority)
+            if level is not None and policy_level != level:
+                # an allow from a higher level stands
+                break
+            if not policy.is_valid_at(at):
+                continue
+
+            items = policy.items
+            if any(item.grants(principal, access) for item in items["deny_policy_items"]) and \
+                    not any(item.grants(principal, access) for item in items["deny_exceptions"]):
+                return AccessDecision(allowed=False, policy=policy.policy)
+            if allowed_by is None and any(item.grants(principal, access) for item in items["allow_policy_items"]) \
+                    and not any(item.grants(principal, access) for item in items["allow_exceptions"]):
+                allowed_by = policy.policy
+                level = policy_level
+
+        return AccessDecision(allowed=allowed_by is not None, policy=allowed_by)
+
+    @staticmethod
+    def _first_item(index: _ResourceIndex, names: Tuple[Optional[str], ...], principal: Principal, at: datetime):
+        for policy in index.candidates(names):
+            if not policy.is_valid_at(at):
+                continue
+            for compiled, item in zip(policy.items["items"], _policy_items(policy.policy)):
+                if compiled.applies_to(principal):
+                    return item, policy.policy
+        return None, None
+
+
+def _usable(policies: Iterable):
+    """(policy, validity bounds) of the enabled policies whose validity period parses."""
+    for policy in policies:
+        validity = validity_bounds(policy) if policy.is_enabled else None
+        if validity is not None:
+            yield policy, validity
+
+
+def _policy_items(policy) -> Sequence:
+    return getattr(policy, "row_filter_policy_items", None) or getattr(policy, "data_mask_policy_items", None) or ()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
@@ -0,0 +1,270 @@
+import dataclasses
+import logging
+import sys
+import threading
+import warnings
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Set, Union, get_args, get_origin, get_type_hints
+
+try:
+    # private dataclasses_json internals the codecs reuse to produce exactly what it produces;
+    # setup.py pins dataclasses-json to the releases known to have them
+    from dataclasses_json.core import _ExtendedEncoder, _asdict, _decode_dataclass, _user_overrides_or_exts
+except ImportError:  # pragma: no cover - a dataclasses-json release without them
+    _ExtendedEncoder = _asdict = _decode_dataclass = _user_overrides_or_exts = None
+
+# False when the installed dataclasses-json lacks the internals; models then keep its own from_dict / to_dict
+CODECS_SUPPORTED = _ExtendedEncoder is not None
+
+logger = logging.getLogger('policy_codecs')
+
+# decode(value, infer_missing) for a value known not to be None at field level
+ValueDecoder = Callable[[Any, bool], Any]
+
+_ATOMIC_TYPES = (str, int, float, bool, type(None))
+_JSON_TYPES = (dict, list, str, int, float, bool, type(None))
+_encode_default = _ExtendedEncoder().default if CODECS_SUPPORTED else None
+
+# model class -> its compiled codec
+_CODECS: Dict[type, "ModelCodec"] = {}
+# model classes whose codec is compiled on first use
+_INSTALLED: Set[type] = set()
+# serializes compiling; reads of `_CODECS` don't take it
+_COMPILE_LOCK = threading.Lock()
+
+
+def _is_optional(type_) -> bool:
+    return type_ is Any or (get_origin(type_) is Union and type(None) in get_args(type_))
+
+
+def _scalar_decoder(type_: type) -> ValueDecoder:
+    def decode(value, infer_missing):
+        return value if isinstance(value, type_) else type_(value)
+
+    return decode
+
+
+def _decode_str(value, infer_missing):
+    value = value if isinstance(value, str) else str(value)
+    # users, groups, databases, ... repeat across thousands of policies; keep one copy of each
+    return sys.intern(value) if type(value) is str else value
+
+
+def _type_decoder(type_) -> ValueDecoder:
+    """Decoder for a value of `type_`, resolved once; mirrors dataclasses_json's `_decode_type`."""
+    origin = get_origin(type_)
+
+    if origin is Union:
+        args = [arg for arg in get_args(type_) if arg is not type(None)]
+        if len(args) != 1:
+            raise TypeError(f"Unsupported union type {type_}")
+        decode_inner = _type_decoder(args[0])
+        return lambda value, infer_missing: None if value is None else decode_inner(value, infer_missing)
+
+    if origin in (list, List):
+        (item_type,) = get_args(type_) or (Any,)
+        decode_item = _type_decoder(item_type)
+        return lambda value, infer_missing: (None if value is None else
+                                             [decode_item(item, infer_missing) for item in value])
+
+    if isinstance(type_, type) and issubclass(type_, Enum):
+        return lambda value, infer_missing: None if value is None else type_(value)
+
+    if dataclasses.is_dataclass(type_):
+        # published before the codec that contains it (see `_codec`); compiled here should that ever change
+        def decode_model(value, infer_missing):
+            return (_CODECS.get(type_) or _codec(type_)).decode(value, infer_missing)
+
+        return decode_model
+
+    if type_ is str:
+        return _decode_str
+    if type_ in (int, float, bool):
+        return _scalar_decoder(type_)
+
+    if type_ is Any:
+        return lambda value, infer_missing: value
+
+    raise TypeError(f"Unsupported field type {type_}")
+
+
+def _plain(value, encode_json: bool):
+    """`value` as plain data; mirrors dataclasses_json's `_asdict` for the values models hold."""
+    codec = _CODECS.get(type(value))
+    if codec is not None:
+        return codec.encode(value, encode_json)
+    if isinstance(value, _ATOMIC_TYPES) and (type(value) in _ATOMIC_TYPES or isinstance(value, Enum)):
+        # immutable: deepcopy would return the value itself
+        return value
+    if type(value) is list:
+        return [_plain(item, encode_json) for item in value]
+    if type(value) is dict:
+        return {_plain(key, encode_json): _plain(item, encode_json) for key, item in value.items()}
+    return _asdict(value, encode_json=encode_json)
+
+
+def _json_value(value):
+    """Mirrors dataclasses_json's `_encode_json_type`."""
+    if isinstance(value, _JSON_TYPES):
+        if isinstance(value, list):
+            return [_json_value(item) for item in value]
+        if isinstance(value, dict):
+            return {key: _json_value(item) for key, item in value.items()}
+        return value
+    return _encode_default(value)
+
+
+class ModelCodec:
+    """`from_dict` / `to_dict` for one `dataclass_json` model, with field names and types resolved once.
+
+    Produces exactly what dataclasses_json's reflective path produces, including its coercions
+    (e.g. `str(value)` for str fields) and its RuntimeWarning for None in non-optional fields.
+    """
+
+    def __init__(self, cls: type):
+        overrides = _user_overrides_or_exts(cls)
+        hints = get_type_hints(cls)
+        self.cls = cls
+
+        self.decode_names: Dict[str, str] = {}
+        self.encode_names: Dict[str, str] = {}
+        self.fields = []
+        # installed models this one can contain
+        self.nested: Set[type] = set()
+        for field in dataclasses.fields(cls):
+            override = overrides[field.name]
+            if override.encoder or override.decoder or override.mm_field or override.exclude or not field.init:
+                raise TypeError(f"{cls.__name__}.{field.name} uses dataclasses_json features ModelCodec "
+                                f"doesn't compile")
+
+            key = override.letter_case(field.name) if override.letter_case is not None else field.name
+            if key != field.name:
+                self.decode_names[key] = field.name
+            self.encode_names[field.name] = key
+
+            field_type = hints[field.name]
+            self.nested.update(_nested_models(field_type))
+            decode_value = _type_decoder(field_type)
+            if dataclasses.is_dataclass(field_type):
+                # a nested model instance is taken as is at field level
+                decode_value = self._keep_models(decode_value)
+            self.fields.append((field.name, decode_value, field.default, field.default_factory,
+                                _is_optional(field_type)))
+
+    @staticmethod
+    def _keep_models(decode_value: ValueDecoder) -> ValueDecoder:
+        def decode(value, infer_missing):
+            return value if dataclasses.is_dataclass(value) else decode_value(value, infer_missing)
+
+        return decode
+
+    def decode(self, kvs: dict, infer_missing: bool = False):
+        cls = self.cls
+        if isinstance(kvs, cls):
+            return kvs
+        if kvs is None and infer_missing:
+            kvs = {}
+
+        names = self.decode_names
+        kvs = {names.get(key, key): value for key, value in kvs.items()}
+
+        kwargs = {}
+        for name, decode_value, default, default_factory, optional in self.fields:
+            if name in kvs:
+                value = kvs[name]
+            elif default is not dataclasses.MISSING:
+                value = default
+            elif default_factory is not dataclasses.MISSING:
+                value = default_factory()
+            elif infer_missing:
+                value = None
+            else:
+                raise KeyError(name)
+
+            if value is None:
+                if not optional:
+                    self._warn_none(name, infer_missing)
+                kwargs[name] = None
+            else:
+                kwargs[name] = decode_value(value, infer_missing)
+        return cls(**kwargs)
+
+    def _warn_none(self, name: str, infer_missing: bool):
+        warning = f"value of non-optional type {name} detected when decoding {self.cls.__name__}"
+        if infer_missing:
+            warnings.warn(f"Missing {warning} and was defaulted to None by infer_missing=True. "
+                          f"Set infer_missing=False (the default) to prevent this behavior.", RuntimeWarning)
+        else:
+            warnings.warn(f"'NoneType' object {warning}.", RuntimeWarning)
+
+    def encode(self, obj, encode_json: bool = False) -> dict:
+        data = {}
+        for name, key in self.encode_names.items():
+            value = _plain(getattr(obj, name), encode_json)
+            data[key] = _json_value(value) if encode_json else value
+        return data
+
+
+def _nested_models(type_) -> Set[type]:
+    if dataclasses.is_dataclass(type_):
+        return {type_} if type_ in _INSTALLED else set()
+    return set().union(*map(_nested_models, get_args(type_)))
+
+
+def _compile(cls: type, compiled: Dict[type, ModelCodec]):
+    """Compile `cls` and the models it contains into `compiled`, contained models first."""
+    if cls in _CODECS or cls in compiled:
+        return
+    codec = ModelCodec(cls)
+    # placeholder that stops a model containing itself from recursing forever
+    compiled[cls] = None
+    for nested in codec.nested:
+        _compile(nested, compiled)
+    del compiled[cls]
+    compiled[cls] = codec
+
+
+def _codec(cls: type) -> Optional[ModelCodec]:
+    """The compiled codec of an installed model, compiling it (and the models it contains) on first use."""
+    codec = _CODECS.get(cls)
+    if codec is not None or cls not in _INSTALLED:
+        return codec
+
+    with _COMPILE_LOCK:
+        compiled = {}
+        _compile(cls, compiled)
+        # contained models are published first: nested decoders look them up in `_CODECS` when called,
+        # so another thread must never see a codec before the ones it uses
+        for model, model_codec in compiled.items():
+            _CODECS[model] = model_codec
+    return _CODECS[cls]
+
+
+def _from_dict(cls, kvs, *, infer_missing=False):
+    codec = _codec(cls)
+    if codec is None:
+        # a subclass of a compiled model
+        return _decode_dataclass(cls, kvs, infer_missing)
+    return codec.decode(kvs, infer_missing)
+
+
+def _to_dict(self, encode_json=False) -> dict:
+    codec = _codec(type(self))
+    if codec is None:
+        return _asdict(self, encode_json=encode_json)
+    return codec.encode(self, encode_json)
+
+
+def install_codecs(*classes: type):
+    """Route the models' `from_dict` / `to_dict` through a codec compiled for each on first use.
+
+    Every model a compiled model can contain must be installed too. Does nothing, apart from a
+    debug log, when `CODECS_SUPPORTED` is False.
+    """
+    if not CODECS_SUPPORTED:
+        logger.debug("dataclasses_json internals not found, policy models use its reflective from_dict / to_dict")
+        return
+    for cls in classes:
+        _INSTALLED.add(cls)
+        cls.from_dict = classmethod(_from_dict)
+        cls.to_dict = _to_dict
@@ -4,6 +4,8 @@ from typing import Optional, List
 
 from dataclasses_json import dataclass_json, LetterCase
 
+from iomete_sdk.security.policy_codecs import install_codecs
+
 
 class ResourceInclusionType(str, Enum):
     INCLUDE = "INCLUDE"
@@ -39,7 +41,7 @@ class DataMaskType(str, Enum):
 
 
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@dataclass(slots=True)
 class ValidityPeriod:
     # format: yyyy/MM/dd HH:mm:ss
     start_time: str = None
@@ -50,7 +52,7 @@ class ValidityPeriod:
 
 
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@dataclass(slots=True)
 class AccessPolicyResource:
     databases: List[str] = None
     databases_inclusion_type: ResourceInclusionType = ResourceInclusionType.INCLUDE
@@ -61,7 +63,7 @@ class AccessPolicyResource:
 
 
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@dataclass(slots=True)
 class AccessPolicyItem:
     users: Optional[List[str]] = None
     groups: Optional[List[str]] = None
@@ -70,7 +72,7 @@ class AccessPolicyItem:
 
 
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@dataclass(slots=True)
 class AccessPolicyView:
     id: Optional[int] = None
     is_enabled: bool = True
@@ -88,7 +90,7 @@ class AccessPolicyView:
 
 
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@dataclass(slots=True)
 class DataMaskPolicyResource:
     database: str = None
     table: str = None
@@ -96,7 +98,7 @@ class DataMaskPolicyResource:
 
 
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@dataclass(slots=True)
 class DataMaskPolicyItem:
     data_mask_type: str = None,
     data_mask_custom_expr: Optional[str] = None
@@ -106,7 +108,7 @@ class DataMaskPolicyItem:
 
 
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@dataclass(slots=True)
 class DataMaskPolicyView:
     id: Optional[int] = None
     is_enabled: bool = True
@@ -121,7 +123,7 @@ class DataMaskPolicyView:
 
 
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@dataclass(slots=True)
 class RowFilterPolicyItem:
     filter_expr: str = None
     users: Optional[List[str]] = None
@@ -130,14 +132,14 @@ class RowFilterPolicyItem:
 
 
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@dataclass(slots=True)
 class RowFilterPolicyResource:
     database: str = None
     table: str = None
 
 
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@dataclass(slots=True)
 class RowFilterPolicyView:
     id: Optional[int] = None
     is_enabled: bool = True
@@ -149,3 +151,9 @@ class RowFilterPolicyView:
 
     resources: List[RowFilterPolicyResource] = None
     row_filter_policy_items: List[RowFilterPolicyItem] = None
+
+
+# resolve field names, types and enum coercions once instead of on every from_dict / to_dict
+install_codecs(ValidityPeriod, AccessPolicyResource, AccessPolicyItem, AccessPolicyView,
+               DataMaskPolicyResource, DataMaskPolicyItem, DataMaskPolicyView,
+               RowFilterPolicyItem, RowFilterPolicyResource, RowFilterPolicyView)
@@ -0,0 +1,52 @@
+import logging
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Collection, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+logger = logging.getLogger('policy_semantics')
+
+# group every principal belongs to
+PUBLIC_GROUP = "public"
+# user macro matching any user
+USER_MACRO = "{USER}"
+# user macro matching the owner of the resource; resource owners aren't known locally, so it never matches
+OWNER_MACRO = "{OWNER}"
+
+VALIDITY_TIME_FORMAT = "%Y/%m/%d %H:%M:%S"
+
+
+def value_name(value) -> str:
+    """The value of an enum member, or the value itself, as str."""
+    return str(value.value if isinstance(value, Enum) else value)
+
+
+def user_matches(users: Collection[str], user: Optional[str]) -> bool:
+    """Whether an item granted to `users` applies to `user`, with `{USER}` standing for any user."""
+    return user is not None and (user in users or USER_MACRO in users)
+
+
+def validity_bounds(policy) -> Optional[Tuple[Optional[datetime], Optional[datetime]]]:
+    """(start, end) of the policy's validity period, each None when open.
+
+    Returns None, and logs a warning, when a bound can't be parsed: such a policy should be
+    treated as never valid rather than fail everything evaluating it. An unknown time zone is
+    logged and read as UTC.
+    """
+    period = policy.validity_period
+    if period is None:
+        return None, None
+    try:
+        zone = ZoneInfo(period.time_zone or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown time zone {period.time_zone!r} of policy {policy.name!r}, using UTC")
+        zone = timezone.utc
+
+    def parse(value):
+        return datetime.strptime(value, VALIDITY_TIME_FORMAT).replace(tzinfo=zone) if value else None
+
+    try:
+        return parse(period.start_time), parse(period.end_time)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Validity period of policy {policy.name!r} can't be parsed: {e}")
+        return None
@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Iterable, List, Union, Optional
+
+from iomete_sdk.security.policy_models import AccessPolicyView, RowFilterPolicyView, DataMaskPolicyView
+
+PolicyView = Union[AccessPolicyView, RowFilterPolicyView, DataMaskPolicyView]
+
+# fields the server assigns, never compared
+SERVER_ASSIGNED_FIELDS = frozenset({"id"})
+
+
+class PolicyKind(str, Enum):
+    ACCESS = "access"
+    FILTER = "filter"
+    MASKING = "masking"
+
+
+@dataclass
+class PolicyUpdate:
+    policy_id: int
+    desired: PolicyView
+    current: PolicyView
+    # top-level camelCase fields that differ
+    changed_fields: List[str]
+
+
+@dataclass
+class PolicyPlan:
+    kind: PolicyKind
+    creates: List[PolicyView] = field(default_factory=list)
+    updates: List[PolicyUpdate] = field(default_factory=list)
+    deletes: List[PolicyView] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.creates or self.updates or self.deletes)
+
+    def summary(self) -> str:
+        return (f"{self.kind.value} policies: {len(self.creates)} to create, {len(self.updates)} to update, "
+                f"{len(self.deletes)} to delete, {len(self.unchanged)} unchanged")
+
+
+@dataclass
+class PolicyPlanResult:
+    """Outcome of `apply_policy_plan`, aligned with the plan lists: the returned view, None or the raised error."""
+    creates: List[Union[PolicyView, Exception]] = field(default_factory=list)
+    updates: List[Union[PolicyView, Exception]] = field(default_factory=list)
+    deletes: List[Optional[Exception]] = field(default_factory=list)
+
+    @property
+    def errors(self) -> List[Exception]:
+        return [result for result in self.creates + self.updates + self.deletes if isinstance(result, Exception)]
+
+
+def _normalize(value):
+    """Canonical form for comparison: enums as values, empty values dropped, scalar lists sorted."""
+    if isinstance(value, dict):
+        normalized = {}
+        for key, item in value.items():
+            item = _normalize(item)
+            if item is not None:
+                normalized[key] = item
+        return normalized or None
+    if isinstance(value, (list, tuple)):
+        items = [_normalize(item) for item in value]
+        items = [item for item in items if item is not None]
+        if not items:
+            return None
+        if all(not isinstance(item, (dict, list)) for item in items):
+            # principals, accesses and resource names are sets
+            return sorted(items, key=str)
+        return items
+    if isinstance(value, Enum):
+        return value.value
+    if value == "":
+        return None
+    return value
+
+
+def normalize_policy(policy: PolicyView) -> dict:
+    data = policy.to_dict()
+    return _normalize({key: value for key, value in data.items() if key not in SERVER_ASSIGNED_FIELDS}) or {}
+
+
+def diff_policy(desired: PolicyView, current: PolicyView) -> List[str]:
+    """Top-level fields that differ between two policies once server-assigned fields are ignored."""
+    desired_data = normalize_policy(desired)
+    current_data = normalize_policy(current)
+    return sorted(key for key in desired_data.keys() | current_data.keys()
+                  if desired_data.get(key) != current_data.get(key))
+
+
+def plan_policies(kind: PolicyKind, desired: Iterable[PolicyView], current: Iterable[PolicyView],
+                  delete_missing: bool = False) -> PolicyPlan:
+    """Match policies by name and compute the creates/updates/deletes that converge `current` to `desired`.
+
+    Runs in time linear in the number of policies. Current policies that aren't desired are only
+    deleted with `delete_missing`.
+    """
+    current_by_name = {}
+    for policy in current:
+        current_by_name[policy.name] = policy
+
+    plan = PolicyPlan(kind=kind)
+    seen = set()
+    for policy in desired:
+        if policy.name in seen:
+            raise ValueError(f"Duplicate desired {kind.value} policy name: {policy.name}")
+        seen.add(policy.name)
+
+        existing = current_by_name.pop(policy.name, None)
+        if existing is None:
+            plan.creates.append(policy)
+            continue
+
+        changed_fields = diff_policy(policy, existing)
+        if changed_fields:
+            plan.updates.append(PolicyUpdate(policy_id=existing.id, desired=policy, current=existing,
+                                             changed_fields=changed_fields))
+        else:
+            plan.unchanged.append(policy.name)
+
+    if delete_missing:
+        plan.deletes = list(current_by_name.values())
+    return plan
@@ -1 +1,28 @@
-from iomete_sdk.spark.spark_job import SparkJobApiClient
+import importlib
+from typing import TYPE_CHECKING
+
+# exported name -> module defining it, imported on first access (PEP 562) so that the sync client
+# doesn't pull in aiohttp and vice versa
+_EXPORTS = {
+    "SparkJobApiClient": "iomete_sdk.spark.spark_job",
+    "AsyncSparkJobApiClient": "iomete_sdk.spark.async_spark_job",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from iomete_sdk.spark.spark_job import SparkJobApiClient
+    from iomete_sdk.spark.async_spark_job import AsyncSparkJobApiClient
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
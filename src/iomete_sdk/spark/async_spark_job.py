@@ -0,0 +1,85 @@
+import logging
+from dataclasses import dataclass
+
+from iomete_sdk.async_api_utils import AsyncAPIUtils
+from iomete_sdk.spark.spark_job import validate_job_payload, validate_create_job_payload
+from iomete_sdk.timeouts import Timeout
+
+
+@dataclass
+class AsyncSparkJobApiClient:
+    """asyncio version of `SparkJobApiClient` with the same methods and return values."""
+    logger = logging.getLogger('AsyncSparkJobApiClient')
+
+    host: str
+    api_key: str
+    domain: str
+    verify: bool = True
+
+    spark_job_endpoint: str = None
+    api_utils: AsyncAPIUtils = None
+    # connect/read timeouts of the transport created by this client
+    timeout: Timeout = None
+
+    def __post_init__(self):
+        # a transport passed in by the caller is shared and stays open when this client is closed
+        self._owns_api_utils = self.api_utils is None
+        if self._owns_api_utils:
+            self.api_utils = AsyncAPIUtils(api_key=self.api_key, verify=self.verify, timeout=self.timeout)
+
+        self.logger.debug(f"Host: {self.host}")
+        self.spark_job_endpoint = f"{self.host}/api/v2/domains/{self.domain}/sdk/spark/jobs"
+
+    async def close(self):
+        if self._owns_api_utils:
+            await self.api_utils.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def create_job(self, payload: dict, retry: bool = False):
+        validate_job_payload(payload)
+        validate_create_job_payload(payload)
+
+        return await self.api_utils.call(method="POST", url=self.spark_job_endpoint, payload=payload, retry=retry)
+
+    async def update_job(self, job_id: str, payload: dict):
+        validate_job_payload(payload)
+        return await self.api_utils.call(method="PUT", url=f"{self.spark_job_endpoint}/{job_id}", payload=payload)
+
+    async def get_jobs(self):
+        response = await self.api_utils.call(method="GET", url=self.spark_job_endpoint)
+        return response.get("items", []) if isinstance(response, dict) else response
+
+    async def get_job_by_id(self, job_id: str):
+        return await self.api_utils.call(method="GET", url=f"{self.spark_job_endpoint}/{job_id}")
+
+    async def get_job_by_name(self, job_name: str):
+        return await self.api_utils.call(method="GET", url=f"{self.spark_job_endpoint}/name/{job_name}")
+
+    async def delete_job_by_id(self, job_id: str):
+        return await self.api_utils.call(method="DELETE", url=f"{self.spark_job_endpoint}/{job_id}")
+
+    async def get_job_runs(self, job_id: str):
+        return await self.api_utils.call(method="GET", url=f"{self.spark_job_endpoint}/{job_id}/runs")
+
+    async def submit_job_run(self, job_id: str, payload: dict, retry: bool = False):
+        return await self.api_utils.call(method="POST", url=f"{self.spark_job_endpoint}/{job_id}/runs",
+                                         payload=payload, retry=retry)
+
+    async def cancel_job_run(self, job_id: str, run_id: str):
+        return await self.api_utils.call(method="DELETE", url=f"{self.spark_job_endpoint}/{job_id}/runs/{run_id}")
+
+    async def get_job_run_by_id(self, job_id: str, run_id: str):
+        return await self.api_utils.call(method="GET", url=f"{self.spark_job_endpoint}/{job_id}/runs/{run_id}")
+
+    async def get_job_run_logs(self, job_id: str, run_id: str, time_range: str = "5m"):
+        return await self.api_utils.call(method="GET",
+                                         url=f"{self.spark_job_endpoint}/{job_id}/runs/{run_id}/logs?range={time_range}")
+
+    async def get_job_run_metrics(self, job_id: str, run_id: str):
+        return await self.api_utils.call(method="GET",
+                                         url=f"{self.spark_job_endpoint}/{job_id}/runs/{run_id}/metrics")
@@ -0,0 +1,63 @@
+import threading
+from typing import Iterable, Optional
+
+
+class JobNameIndex:
+    """Thread-safe map of job names to ids, kept current by the `SparkJobApiClient` that owns it.
+
+    Unlike `TTLCache` entries, names never expire: an id that turns out to be stale is dropped
+    when the server answers 404 for it.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, job_name: str) -> bool:
+        return job_name in self._ids
+
+    def get(self, job_name: str) -> Optional[str]:
+        return self._ids.get(job_name)
+
+    def add(self, job: dict):
+        """Record the name and id of a job as returned by the server; anything else is ignored."""
+        if not isinstance(job, dict) or job.get("id") is None or job.get("name") is None:
+            return
+        with self._lock:
+            self._discard_id(job["id"])
+            self._discard_name(job["name"])
+            self._ids[job["name"]] = job["id"]
+            self._names[job["id"]] = job["name"]
+
+    def add_all(self, jobs: Iterable[dict]):
+        for job in jobs:
+            self.add(job)
+
+    def discard_id(self, job_id: str):
+        with self._lock:
+            self._discard_id(job_id)
+
+    def discard_name(self, job_name: str):
+        with self._lock:
+            self._discard_name(job_name)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+            self._names.clear()
+
+    # called with the lock held
+
+    def _discard_id(self, job_id: str):
+        name = self._names.pop(job_id, None)
+        if name is not None:
+            del self._ids[name]
+
+    def _discard_name(self, job_name: str):
+        job_id = self._ids.pop(job_name, None)
+        if job_id is not None:
+            del self._names[job_id]
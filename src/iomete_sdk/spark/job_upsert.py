@@ -0,0 +1,58 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import FrozenSet, Iterable
+
+
+class UpsertAction(str, Enum):
+    CREATED = "CREATED"
+    UPDATED = "UPDATED"
+    UNCHANGED = "UNCHANGED"
+
+
+@dataclass
+class JobUpsert:
+    action: UpsertAction
+    # the job as returned by the server, or its current definition when unchanged
+    job: dict
+
+
+# fields the server assigns to a job definition, at any depth; they never count as changes
+SERVER_FIELDS = frozenset({"id", "createdAt", "updatedAt", "createdBy", "updatedBy", "status", "lastRun"})
+
+
+def _normalize(value, ignore: FrozenSet[str]):
+    """Canonical form for comparison: enums as values, `ignore`d keys, None and empty containers
+    dropped, so a field set to null compares equal to a missing one; list order is kept."""
+    if isinstance(value, dict):
+        normalized = {}
+        for key, item in value.items():
+            if key in ignore:
+                continue
+            item = _normalize(item, ignore)
+            if item is not None:
+                normalized[key] = item
+        return normalized or None
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item, ignore) for item in value] or None
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def normalize_job(payload: dict, ignore: Iterable[str] = SERVER_FIELDS) -> dict:
+    """Canonical form of a job definition, without the `ignore`d fields.
+
+    Every other field counts, including those only one side sets: `update_job` replaces the whole
+    definition, so a field the desired payload leaves out or sets to null is a change whenever
+    the server still has a value for it.
+    """
+    return _normalize(payload, frozenset(ignore)) or {}
+
+
+def job_hash(payload: dict, ignore: Iterable[str] = SERVER_FIELDS) -> str:
+    """SHA-256 of the canonical JSON of `normalize_job(payload, ignore)`."""
+    canonical = json.dumps(normalize_job(payload, ignore), sort_keys=True, separators=(",", ":"),
+                           ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,77 @@
+from collections import Counter, deque
+from typing import Iterable, List, Optional
+
+# supported `time_range` values of the run logs endpoint, in seconds
+LOG_TIME_RANGES = (
+    ("5m", 5 * 60),
+    ("15m", 15 * 60),
+    ("30m", 30 * 60),
+    ("1h", 60 * 60),
+    ("3h", 3 * 60 * 60),
+    ("6h", 6 * 60 * 60),
+    ("12h", 12 * 60 * 60),
+    ("24h", 24 * 60 * 60),
+    ("2d", 2 * 24 * 60 * 60),
+    ("7d", 7 * 24 * 60 * 60),
+    ("14d", 14 * 24 * 60 * 60),
+    ("30d", 30 * 24 * 60 * 60),
+)
+
+
+def smallest_log_time_range(seconds: float) -> str:
+    """The narrowest supported window covering the last `seconds`, capped at the widest one."""
+    for time_range, window in LOG_TIME_RANGES:
+        if window >= seconds:
+            return time_range
+    return LOG_TIME_RANGES[-1][0]
+
+
+class LogDeduplicator:
+    """Drops log entries already yielded from an overlapping earlier window, in bounded memory.
+
+    Identical entries within one window are all kept, since a run can log the same line twice
+    in the same second: an entry is only dropped when earlier windows already had as many copies
+    of it. Remembers the last `max_tracked` distinct entries. Untracked entries dated at or
+    before the newest entry it has forgotten are treated as seen, so a re-fetched window never
+    yields them twice; an unseen line sharing that timestamp is dropped too.
+    """
+
+    def __init__(self, max_tracked: int = 10000):
+        self._recent = deque()
+        # (date, logLine) -> most copies seen in one window
+        self._keys = {}
+        self.max_tracked = max_tracked
+        self.watermark: Optional[str] = None
+
+    def new_entries(self, window: Iterable[dict]) -> List[dict]:
+        """The entries of one fetched window that earlier windows didn't have, in order."""
+        copies = Counter()
+        new = []
+        for entry in window:
+            date = entry.get("date")
+            key = (date, entry.get("logLine"))
+            if key not in self._keys and self.watermark is not None and date is not None \
+                    and date <= self.watermark:
+                # forgotten, and not tracked again
+                continue
+            copies[key] += 1
+            if copies[key] <= self._keys.get(key, 0):
+                continue
+            new.append(entry)
+
+        for key, count in copies.items():
+            seen = self._keys.get(key)
+            if seen is None:
+                self._recent.append(key)
+            if seen is None or count > seen:
+                self._keys[key] = count
+        while len(self._recent) > self.max_tracked:
+            forgotten = self._recent.popleft()
+            del self._keys[forgotten]
+            if forgotten[0] is not None and (self.watermark is None or forgotten[0] > self.watermark):
+                self.watermark = forgotten[0]
+        return new
+
+    def is_new(self, entry: dict) -> bool:
+        """`new_entries` for a window of one entry."""
+        return bool(self.new_entries([entry]))
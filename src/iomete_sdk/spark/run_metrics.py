@@ -0,0 +1,409 @@
+import csv
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from iomete_sdk.api_utils import ClientError
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+RunKey = Tuple[str, str]
+
+# one sample every 10 seconds for a day
+DEFAULT_CAPACITY = 8640
+
+
+def flatten_metrics(data: dict, prefix: str = "") -> Dict[str, float]:
+    """Numeric fields of a metrics response, nested objects as dotted names; other values are skipped."""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_metrics(value, prefix=f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+class _Ring:
+    """Fixed-capacity buffer of doubles that overwrites its oldest values once full."""
+    __slots__ = ("values", "capacity")
+
+    def __init__(self, capacity: int, values: array = None):
+        self.capacity = capacity
+        self.values = values if values is not None else array("d")
+
+    def append(self, value: float, head: int):
+        if len(self.values) < self.capacity:
+            self.values.append(value)
+        else:
+            self.values[head] = value
+
+    def ordered(self, head: int) -> array:
+        """Values oldest first; `head` is the index of the oldest once the buffer is full."""
+        if len(self.values) < self.capacity or head == 0:
+            return array("d", self.values)
+        return self.values[head:] + self.values[:head]
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    # linear interpolation between the closest ranks, like numpy's default
+    position = q * (len(ordered) - 1)
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _rate(timestamps: array, values: array) -> Optional[float]:
+    present = [index for index in range(len(values)) if not math.isnan(values[index])]
+    if len(present) < 2 or timestamps[present[-1]] == timestamps[present[0]]:
+        return None
+    first, last = present[0], present[-1]
+    return (values[last] - values[first]) / (timestamps[last] - timestamps[first])
+
+
+@dataclass
+class MetricSummary:
+    """Aggregates of one metric over the samples that have it; None when there are none."""
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    # change per second between the first and the last sample; across runs, the mean of the runs' rates
+    rate: Optional[float] = None
+
+    @classmethod
+    def of(cls, values: array, rate: Optional[float] = None) -> "MetricSummary":
+        if np is not None:
+            data = np.frombuffer(values, dtype=np.float64)
+            data = data[~np.isnan(data)]
+            if not data.size:
+                return cls(count=0, rate=rate)
+            p50, p90, p99 = np.quantile(data, (0.5, 0.9, 0.99)).tolist()
+            return cls(count=int(data.size), min=float(data.min()), max=float(data.max()),
+                       mean=float(data.mean()), p50=p50, p90=p90, p99=p99, rate=rate)
+
+        ordered = sorted(value for value in values if not math.isnan(value))
+        if not ordered:
+            return cls(count=0, rate=rate)
+        return cls(count=len(ordered), min=ordered[0], max=ordered[-1], mean=math.fsum(ordered) / len(ordered),
+                   p50=_percentile(ordered, 0.5), p90=_percentile(ordered, 0.9), p99=_percentile(ordered, 0.99),
+                   rate=rate)
+
+
+class RunSeries:
+    """Samples of one run's metrics in ring buffers of doubles, one per metric, keeping the latest `capacity`.
+
+    Metrics missing from a sample, or that first appear in a later one, are NaN. Thread-safe.
+    """
+
+    def __init__(self, job_id: str, run_id: str, capacity: int = DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.job_id = job_id
+        self.run_id = run_id
+        self.capacity = capacity
+        self._timestamps = _Ring(capacity)
+        self._columns: Dict[str, _Ring] = {}
+        # index of the oldest sample once the buffers are full
+        self._head = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._timestamps.values)
+
+    @property
+    def metrics(self) -> List[str]:
+        with self._lock:
+            return list(self._columns)
+
+    def append(self, sample: Dict[str, float], timestamp: float = None):
+        """Add a sample of `{metric: value}` taken at `timestamp` (seconds since the epoch, default now)."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            size = len(self._timestamps.values)
+            for name in sample.keys() - self._columns.keys():
+                self._columns[name] = _Ring(self.capacity, array("d", [math.nan]) * size)
+
+            self._timestamps.append(timestamp, self._head)
+            for name, column in self._columns.items():
+                column.append(sample.get(name, math.nan), self._head)
+            if size == self.capacity:
+                self._head = (self._head + 1) % self.capacity
+
+    def timestamps(self) -> array:
+        with self._lock:
+            return self._timestamps.ordered(self._head)
+
+    def column(self, metric: str) -> array:
+        """The metric's values, oldest first, aligned with `timestamps()`."""
+        with self._lock:
+            return self._column(metric)
+
+    def rate(self, metric: str) -> Optional[float]:
+        with self._lock:
+            return _rate(self._timestamps.ordered(self._head), self._column(metric))
+
+    def summary(self, metric: str) -> MetricSummary:
+        with self._lock:
+            values = self._column(metric)
+            return MetricSummary.of(values, rate=_rate(self._timestamps.ordered(self._head), values))
+
+    def to_columns(self, metrics: Iterable[str] = None) -> Dict[str, Union[list, array]]:
+        """`jobId`, `runId`, `timestamp` and one column per metric, e.g. for `pyarrow.table` or `pandas.DataFrame`."""
+        with self._lock:
+            metrics = list(self._columns) if metrics is None else list(metrics)
+            size = len(self._timestamps.values)
+            columns = {"jobId": [self.job_id] * size, "runId": [self.run_id] * size,
+                       "timestamp": self._timestamps.ordered(self._head)}
+            for metric in metrics:
+                columns[metric] = self._column(metric)
+            return columns
+
+    # called with the lock held
+
+    def _column(self, metric: str) -> array:
+        column = self._columns.get(metric)
+        if column is None:
+            return array("d", [math.nan]) * len(self._timestamps.values)
+        return column.ordered(self._head)
+
+
+class RunMetricsCollector:
+    """Samples `get_job_run_metrics` for many runs on a single background thread.
+
+    Every watched run is sampled every `interval` seconds into a `RunSeries` keeping the latest
+    `capacity` samples. With `stop_on_terminal`, the client's `RunWaiter` tells when a run
+    finishes; it is then sampled once more and no longer. A 4xx other than 429 stops sampling
+    the run, other errors are logged and retried at the next interval. Like `RunWaiter`, the
+    thread exits when nothing is watched.
+    """
+    logger = logging.getLogger('RunMetricsCollector')
+
+    def __init__(self, client, interval: float = 10.0, capacity: int = DEFAULT_CAPACITY,
+                 stop_on_terminal: bool = True):
+        self.client = client
+        self.interval = interval
+        self.capacity = capacity
+        self.stop_on_terminal = stop_on_terminal
+
+        self._series: Dict[RunKey, RunSeries] = {}
+        # runs still sampled -> their run waiter future, if any
+        self._active: Dict[RunKey, object] = {}
+        # active runs found terminal, due for their last sample
+        self._finishing: Set[RunKey] = set()
+        self._schedule = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def watch(self, job_id: str, run_id: str) -> RunSeries:
+        """Start sampling the run now; returns its series, shared with earlier watches of the same run."""
+        key = (job_id, run_id)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("RunMetricsCollector is closed")
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = RunSeries(job_id, run_id, capacity=self.capacity)
+            if key in self._active:
+                return series
+            self._active[key] = None
+            self._push(time.monotonic(), key)
+
+        if self.stop_on_terminal:
+            future = self.client.run_waiter.watch(job_id, run_id)
+            with self._cond:
+                watched = key in self._active
+                if watched:
+                    self._active[key] = future
+            if watched:
+                # runs on the run waiter's thread, or right here if the run has already finished
+                future.add_done_callback(lambda _: self._finish(key))
+            else:
+                future.cancel()
+        return series
+
+    def unwatch(self, job_id: str, run_id: str):
+        """Stop sampling the run; its series is kept."""
+        with self._cond:
+            future = self._active.pop((job_id, run_id), None)
+            self._finishing.discard((job_id, run_id))
+        if future is not None:
+            future.cancel()
+
+    @property
+    def watched_count(self) -> int:
+        with self._cond:
+            return len(self._active)
+
+    def series(self, job_id: str, run_id: str) -> Optional[RunSeries]:
+        with self._cond:
+            return self._series.get((job_id, run_id))
+
+    def runs(self) -> List[RunKey]:
+        with self._cond:
+            return list(self._series)
+
+    def forget(self, job_id: str, run_id: str):
+        """Stop sampling the run and drop its series."""
+        self.unwatch(job_id, run_id)
+        with self._cond:
+            self._series.pop((job_id, run_id), None)
+
+    def close(self):
+        """Stop sampling; the collected series stay readable."""
+        with self._cond:
+            self._closed = True
+            futures = [future for future in self._active.values() if future is not None]
+            self._active.clear()
+            self._finishing.clear()
+            self._schedule.clear()
+            self._cond.notify()
+        for future in futures:
+            future.cancel()
+
+    # aggregation and export
+
+    def summaries(self, metric: str) -> Dict[RunKey, MetricSummary]:
+        """Summary of `metric` per run."""
+        return {key: series.summary(metric) for key, series in self._snapshot()}
+
+    def summary(self, metric: str, runs: Iterable[RunKey] = None) -> MetricSummary:
+        """Summary of `metric` over the samples of all runs (or of `runs`) pooled together."""
+        selected = self._snapshot(runs)
+        values = array("d")
+        rates = []
+        for _, series in selected:
+            values.extend(series.column(metric))
+            rate = series.rate(metric)
+            if rate is not None:
+                rates.append(rate)
+        return MetricSummary.of(values, rate=math.fsum(rates) / len(rates) if rates else None)
+
+    def to_columns(self, metrics: Iterable[str] = None, runs: Iterable[RunKey] = None) -> Dict[str, Union[list, array]]:
+        """Samples of all runs (or of `runs`) as columns: `jobId`, `runId`, `timestamp` and one per metric.
+
+        Metrics default to every metric any of the runs has. Numeric columns are `array('d')`
+        with NaN for missing values; `pyarrow.table(columns)` or `pandas.DataFrame(columns)`
+        take the result as is.
+        """
+        selected = self._snapshot(runs)
+        if metrics is None:
+            metrics = list(dict.fromkeys(metric for _, series in selected for metric in series.metrics))
+        else:
+            metrics = list(metrics)
+
+        columns = {"jobId": [], "runId": [], "timestamp": array("d"), **{metric: array("d") for metric in metrics}}
+        for _, series in selected:
+            for name, values in series.to_columns(metrics).items():
+                columns[name].extend(values)
+        return columns
+
+    def write_csv(self, file, metrics: Iterable[str] = None, runs: Iterable[RunKey] = None):
+        """Write `to_columns` to a text file object as CSV with a header row; NaN is written as an empty field."""
+        columns = self.to_columns(metrics=metrics, runs=runs)
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for row in zip(*columns.values()):
+            writer.writerow("" if isinstance(value, float) and math.isnan(value) else value for value in row)
+
+    def _snapshot(self, runs: Iterable[RunKey] = None) -> List[Tuple[RunKey, RunSeries]]:
+        with self._cond:
+            if runs is None:
+                return list(self._series.items())
+            return [(key, self._series[key]) for key in runs if key in self._series]
+
+    # sampling
+
+    def _push(self, sample_at: float, key: RunKey):
+        # called with the lock held
+        heapq.heappush(self._schedule, (sample_at, next(self._sequence), key))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="iomete-run-metrics", daemon=True)
+            self._thread.start()
+        self._cond.notify()
+
+    def _run(self):
+        sampling = None
+        try:
+            while True:
+                with self._cond:
+                    while True:
+                        if not self._schedule:
+                            self._thread = None
+                            return
+                        wait = self._schedule[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(timeout=wait)
+
+                    _, _, key = heapq.heappop(self._schedule)
+                    if key not in self._active:
+                        continue
+                    series = self._series[key]
+                    last = key in self._finishing
+                    sampling = key
+
+                if self._sample(series) and not last:
+                    with self._cond:
+                        if key in self._active:
+                            self._push(time.monotonic() + self.interval, key)
+                else:
+                    self.unwatch(*key)
+                sampling = None
+        finally:
+            # also when the loop dies, so the next watch starts a new thread instead of queueing forever
+            with self._cond:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+            if sampling is not None:
+                # the run the loop died on has no schedule left
+                self.unwatch(*sampling)
+
+    def _sample(self, series: RunSeries) -> bool:
+        """Take one sample; returns whether to keep sampling the run."""
+        try:
+            metrics = self.client.get_job_run_metrics(job_id=series.job_id, run_id=series.run_id)
+        except ClientError as e:
+            if 400 <= e.status < 500 and e.status != 429:
+                self.logger.warning(f"Stopped sampling metrics of run {series.run_id}: {e}")
+                return False
+            self.logger.warning(f"Sampling metrics of run {series.run_id} failed, will retry: {e}")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Sampling metrics of run {series.run_id} failed, will retry: {e}")
+            return True
+
+        if isinstance(metrics, dict):
+            series.append(flatten_metrics(metrics))
+        return True
+
+    def _finish(self, key: RunKey):
+        # the run is terminal: have the sampling thread sample it once more and stop. Runs on the
+        # run waiter's thread, which must not wait for a metrics request.
+        with self._cond:
+            future = self._active.get(key)
+            if future is None or future.cancelled() or key in self._finishing:
+                return
+            self._finishing.add(key)
+            self._push(time.monotonic(), key)
@@ -0,0 +1,175 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from iomete_sdk.api_utils import ClientError
+
+# run statuses after which a run produces no more logs or metrics
+TERMINAL_RUN_STATUSES = frozenset({"COMPLETED", "FAILED", "ABORTED", "CANCELLED", "SUBMISSION_FAILED"})
+
+
+def is_run_terminal(run: dict) -> bool:
+    return isinstance(run, dict) and run.get("status") in TERMINAL_RUN_STATUSES
+
+
+@dataclass
+class _WatchedRun:
+    job_id: str
+    run_id: str
+    future: Future
+    callback: Optional[Callable[[dict], None]]
+    watched_since: float = field(default_factory=time.monotonic)
+    polls: int = 0
+
+
+class RunWaiter:
+    """Waits for many job runs to finish using a single background poller thread.
+
+    Each watched run is polled with `get_job_run_by_id` on its own schedule: every `min_interval`
+    seconds at first, then backing off by `backoff_factor` up to `max_interval` for long runs.
+    Runs of a job whose past durations are known are polled at `min_interval` again around
+    their expected finish. The thread exits when nothing is watched, so an idle waiter costs no
+    thread at all.
+    """
+    logger = logging.getLogger('RunWaiter')
+
+    def __init__(self, client, min_interval: float = 2.0, max_interval: float = 60.0, backoff_factor: float = 1.5,
+                 terminal: Callable[[dict], bool] = is_run_terminal):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.terminal = terminal
+
+        # job_id -> moving average of observed run durations in seconds
+        self.expected_durations: Dict[str, float] = {}
+
+        self._schedule = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def watch(self, job_id: str, run_id: str, callback: Callable[[dict], None] = None) -> Future:
+        """Return a future resolved with the run once it reaches a terminal state.
+
+        `callback(run)` is called on the poller thread at the same moment; cancelling the
+        future stops watching the run.
+        """
+        future = Future()
+        watched = _WatchedRun(job_id=job_id, run_id=run_id, future=future, callback=callback)
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("RunWaiter is closed")
+            self._push(time.monotonic(), watched)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="iomete-run-waiter", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    @property
+    def watched_count(self) -> int:
+        with self._cond:
+            return len(self._schedule)
+
+    def close(self):
+        """Stop polling; futures still pending are cancelled."""
+        with self._cond:
+            self._closed = True
+            pending = [entry[2] for entry in self._schedule]
+            self._schedule.clear()
+            self._cond.notify()
+
+        for watched in pending:
+            watched.future.cancel()
+
+    def _push(self, poll_at: float, watched: _WatchedRun):
+        heapq.heappush(self._schedule, (poll_at, next(self._sequence), watched))
+
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    while True:
+                        if not self._schedule:
+                            self._thread = None
+                            return
+                        wait = self._schedule[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(timeout=wait)
+
+                    _, _, watched = heapq.heappop(self._schedule)
+
+                if watched.future.cancelled():
+                    continue
+
+                next_poll = self._poll(watched)
+                if next_poll is not None:
+                    with self._cond:
+                        closed = self._closed
+                        if not closed:
+                            self._push(next_poll, watched)
+                    if closed:
+                        # closed while this run was being polled, so `close` didn't see it
+                        watched.future.cancel()
+        finally:
+            # also when the loop dies, so the next watch starts a new thread instead of queueing forever
+            with self._cond:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _poll(self, watched: _WatchedRun) -> Optional[float]:
+        """Poll one run; returns when to poll it next or None once its future is resolved."""
+        watched.polls += 1
+        try:
+            run = self.client.get_job_run_by_id(job_id=watched.job_id, run_id=watched.run_id)
+        except ClientError as e:
+            if 400 <= e.status < 500 and e.status != 429:
+                # the caller may have cancelled the future while the poll was in flight
+                if watched.future.set_running_or_notify_cancel():
+                    watched.future.set_exception(e)
+                return None
+            self.logger.warning(f"Polling run {watched.run_id} failed, will retry: {e}")
+            return time.monotonic() + self._interval(watched)
+        except Exception as e:
+            self.logger.warning(f"Polling run {watched.run_id} failed, will retry: {e}")
+            return time.monotonic() + self._interval(watched)
+
+        if not self.terminal(run):
+            return time.monotonic() + self._interval(watched)
+
+        self._record_duration(watched.job_id, time.monotonic() - watched.watched_since)
+        if watched.future.set_running_or_notify_cancel():
+            watched.future.set_result(run)
+            if watched.callback is not None:
+                try:
+                    watched.callback(run)
+                except Exception as e:
+                    self.logger.error(f"Run callback failed for run {watched.run_id}: {e}")
+        return None
+
+    def _interval(self, watched: _WatchedRun) -> float:
+        interval = min(self.max_interval, self.min_interval * self.backoff_factor ** (watched.polls - 1))
+
+        expected = self.expected_durations.get(watched.job_id)
+        if expected is not None:
+            elapsed = time.monotonic() - watched.watched_since
+            until_expected = 0.9 * expected - elapsed
+            if until_expected > 0:
+                # sleep through the middle of the run but wake up shortly before its usual finish
+                interval = min(interval, max(self.min_interval, until_expected))
+            elif elapsed <= 1.2 * expected:
+                interval = self.min_interval
+        return interval
+
+    def _record_duration(self, job_id: str, duration: float):
+        previous = self.expected_durations.get(job_id)
+        self.expected_durations[job_id] = duration if previous is None else 0.7 * previous + 0.3 * duration
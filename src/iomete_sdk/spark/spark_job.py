@@ -1,8 +1,23 @@
+import copy
 import logging
+import threading
+import time
 from dataclasses import dataclass
+from concurrent.futures import Future
+from typing import Iterator, Iterable, Tuple, Callable, List, Union
 from enum import Enum
+from urllib.parse import urlencode
 
-from iomete_sdk.api_utils import APIUtils
+from iomete_sdk.api_utils import APIUtils, ClientError
+from iomete_sdk.bulk import run_bulk, ProgressCallback, DEFAULT_MAX_WORKERS
+from iomete_sdk.cache import TTLCache, MISSING
+from iomete_sdk.pagination import iter_pages, DEFAULT_PAGE_SIZE
+from iomete_sdk.spark.job_index import JobNameIndex
+from iomete_sdk.spark.job_upsert import JobUpsert, UpsertAction, job_hash
+from iomete_sdk.spark.logs import LogDeduplicator, smallest_log_time_range
+from iomete_sdk.spark.run_waiter import RunWaiter, is_run_terminal
+from iomete_sdk.throttle import TokenBucketRateLimiter
+from iomete_sdk.timeouts import Timeout
 
 
 class Flow(str, Enum):
@@ -15,6 +30,23 @@ class Priority(str, Enum):
     HIGH = "HIGH"
 
 
+def validate_job_payload(payload: dict):
+    """Validate required fields and enum values for v2 job payloads."""
+
+    if "flow" in payload:
+        if payload["flow"] not in [e.value for e in Flow]:
+            raise ValueError(f"flow must be one of: {[e.value for e in Flow]}")
+
+    if "priority" in payload:
+        if payload["priority"] not in [e.value for e in Priority]:
+            raise ValueError(f"priority must be one of: {[e.value for e in Priority]}")
+
+
+def validate_create_job_payload(payload: dict):
+    if "bundleId" not in payload:
+        raise ValueError("bundleId is required in job payload")
+
+
 @dataclass
 class SparkJobApiClient:
     logger = logging.getLogger('SparkJobApiClient')
@@ -26,58 +58,279 @@ class SparkJobApiClient:
 
     spark_job_endpoint: str = None
     api_utils: APIUtils = None
+    # connect/read timeouts of the transport created by this client
+    timeout: Timeout = None
+    # opt-in read-through cache for get_job_by_id / get_job_by_name, invalidated by this client's writes
+    cache: TTLCache = None
+    # opt-in name -> id index behind resolve_job_id and the *_by_name run operations
+    job_index: JobNameIndex = None
 
     def __post_init__(self):
-        self.api_utils = APIUtils(api_key=self.api_key, verify=self.verify)
+        # a transport passed in by the caller is shared and stays open when this client is closed
+        self._owns_api_utils = self.api_utils is None
+        if self._owns_api_utils:
+            self.api_utils = APIUtils(api_key=self.api_key, verify=self.verify, timeout=self.timeout)
 
         self.logger.debug(f"Host: {self.host}")
         self.spark_job_endpoint = f"{self.host}/api/v2/domains/{self.domain}/sdk/spark/jobs"
 
+        self._run_waiter = None
+        self._run_waiter_lock = threading.Lock()
+
+    def close(self):
+        if self._run_waiter is not None:
+            self._run_waiter.close()
+        if self._owns_api_utils:
+            self.api_utils.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def _validate_job_payload(self, payload: dict):
-        """Validate required fields and enum values for v2 job payloads."""
+        validate_job_payload(payload)
 
-        if "flow" in payload:
-            if payload["flow"] not in [e.value for e in Flow]:
-                raise ValueError(f"flow must be one of: {[e.value for e in Flow]}")
+    def _remember_job(self, job):
+        if self.job_index is not None:
+            self.job_index.add(job)
+        if self.cache is None or not isinstance(job, dict) or job.get("id") is None:
+            return
+        self.cache.set(("job", job["id"]), copy.deepcopy(job))
+        if job.get("name") is not None:
+            # names point at the id entry, so invalidating the id is enough after updates and deletes;
+            # after a rename, get_job_by_name finds the old name pointing at a job with another name
+            self.cache.set(("job-name", job["name"]), job["id"])
 
-        if "priority" in payload:
-            if payload["priority"] not in [e.value for e in Priority]:
-                raise ValueError(f"priority must be one of: {[e.value for e in Priority]}")
+    def _invalidate(self, key: tuple):
+        # after the write, so a concurrent read can't re-cache the previous state
+        if self.cache is not None:
+            self.cache.invalidate(key)
 
-    def create_job(self, payload: dict):
-        self._validate_job_payload(payload)
+    def _cached_job(self, job_id: str):
+        job = self.cache.get(("job", job_id))
+        return job if job is MISSING else copy.deepcopy(job)
 
-        if "bundleId" not in payload:
-            raise ValueError("bundleId is required in job payload")
+    def create_job(self, payload: dict, retry: bool = False):
+        self._validate_job_payload(payload)
+        validate_create_job_payload(payload)
 
-        return self.api_utils.call(method="POST", url=self.spark_job_endpoint, payload=payload)
+        try:
+            job = self.api_utils.call(method="POST", url=self.spark_job_endpoint, payload=payload, retry=retry)
+        finally:
+            self._invalidate(("job-name", payload.get("name")))
+        if self.job_index is not None:
+            self.job_index.add(job)
+        return job
 
     def update_job(self, job_id: str, payload: dict):
         self._validate_job_payload(payload)
-        return self.api_utils.call(method="PUT", url=f"{self.spark_job_endpoint}/{job_id}", payload=payload)
+
+        try:
+            job = self.api_utils.call(method="PUT", url=f"{self.spark_job_endpoint}/{job_id}", payload=payload)
+        except ClientError as e:
+            if e.status == 404:
+                self._forget_job_id(job_id)
+            raise
+        finally:
+            self._invalidate(("job", job_id))
+        if self.job_index is not None:
+            # the name may have changed
+            self.job_index.discard_id(job_id)
+            self.job_index.add(job)
+        return job
+
+    def _forget_job_id(self, job_id: str):
+        if self.job_index is not None:
+            self.job_index.discard_id(job_id)
+
+    def _upsert_job(self, payload: dict, current) -> JobUpsert:
+        if current is None:
+            return JobUpsert(action=UpsertAction.CREATED, job=self.create_job(payload=payload))
+        if job_hash(payload) == job_hash(current):
+            return JobUpsert(action=UpsertAction.UNCHANGED, job=current)
+        return JobUpsert(action=UpsertAction.UPDATED, job=self.update_job(job_id=current["id"], payload=payload))
+
+    def upsert_job(self, payload: dict) -> JobUpsert:
+        """Create the job named in `payload`, or update it only if its definition differs from `payload`.
+
+        Fields the server assigns (`job_upsert.SERVER_FIELDS`) are ignored, every other difference,
+        including a field `payload` leaves out, is an update. Unchanged jobs cost one GET (none
+        with a warm `cache`) and no PUT.
+        """
+        if not payload.get("name"):
+            raise ValueError("name is required to upsert a job")
+        self._validate_job_payload(payload)
+
+        try:
+            current = self.get_job_by_name(job_name=payload["name"])
+        except ClientError as e:
+            if e.status != 404:
+                raise
+            current = None
+        return self._upsert_job(payload, current)
+
+    def upsert_jobs(self, payloads: Iterable[dict], max_workers: int = DEFAULT_MAX_WORKERS,
+                    progress: ProgressCallback = None) -> List[Union[JobUpsert, Exception]]:
+        """`upsert_job` for many jobs; returns the upsert or the raised error per payload, in order.
+
+        Current definitions are listed once instead of fetched per job, then creates and updates
+        run on a bounded worker pool.
+        """
+        payloads = list(payloads)
+        names = set()
+        for payload in payloads:
+            if not payload.get("name"):
+                raise ValueError("name is required to upsert a job")
+            if payload["name"] in names:
+                raise ValueError(f"Duplicate job name: {payload['name']}")
+            names.add(payload["name"])
+            self._validate_job_payload(payload)
+
+        current_by_name = {job.get("name"): job for job in self.iter_jobs() if job.get("name") in names}
+        return run_bulk(lambda payload: self._upsert_job(payload, current_by_name.get(payload["name"])), payloads,
+                        max_workers=max_workers, progress=progress)
+
+    def _decode_jobs(self, response):
+        jobs = response.get("items", []) if isinstance(response, dict) else response
+
+        if self.cache is not None or self.job_index is not None:
+            for job in jobs:
+                self._remember_job(job)
+        return jobs
 
     def get_jobs(self):
-        response = self.api_utils.call(method="GET", url=self.spark_job_endpoint)
-        return response.get("items", []) if isinstance(response, dict) else response
+        return self.api_utils.call(method="GET", url=self.spark_job_endpoint, decode=self._decode_jobs)
+
+    def _fetch_page(self, url: str, filters: dict, decode=None):
+        def fetch_page(page_number: int, page_size: int) -> list:
+            params = {key: value for key, value in filters.items() if value is not None}
+            params.update(page=page_number, size=page_size)
+            response = self.api_utils.call(method="GET", url=f"{url}?{urlencode(params, doseq=True)}", decode=decode)
+            return response.get("items", []) if isinstance(response, dict) else response or []
+
+        return fetch_page
+
+    def iter_jobs(self, page_size: int = DEFAULT_PAGE_SIZE, prefetch: bool = True, **filters) -> Iterator[dict]:
+        """Yield jobs page by page, e.g. `iter_jobs(name="etl")`; keyword filters are sent as query parameters.
+
+        The next page is fetched in the background while the current one is consumed.
+        """
+        fetch_page = self._fetch_page(self.spark_job_endpoint, filters, decode=self._decode_jobs)
+        return iter_pages(fetch_page, page_size=page_size, prefetch=prefetch)
 
     def get_job_by_id(self, job_id: str):
-        return self.api_utils.call(method="GET", url=f"{self.spark_job_endpoint}/{job_id}")
+        if self.cache is not None:
+            job = self._cached_job(job_id)
+            if job is not MISSING:
+                return job
+
+        try:
+            job = self.api_utils.call(method="GET", url=f"{self.spark_job_endpoint}/{job_id}")
+        except ClientError as e:
+            if e.status == 404:
+                self._forget_job_id(job_id)
+            raise
+        self._remember_job(job)
+        return job
 
     def get_job_by_name(self, job_name: str):
-        return self.api_utils.call(method="GET", url=f"{self.spark_job_endpoint}/name/{job_name}")
+        if self.cache is not None:
+            job_id = self.cache.get(("job-name", job_name))
+            if job_id is not MISSING:
+                job = self._cached_job(job_id)
+                if job is not MISSING and job.get("name") == job_name:
+                    return job
+                if job is not MISSING:
+                    # renamed since the name was cached
+                    self.cache.invalidate(("job-name", job_name))
+
+        try:
+            job = self.api_utils.call(method="GET", url=f"{self.spark_job_endpoint}/name/{job_name}")
+        except ClientError as e:
+            if e.status == 404 and self.job_index is not None:
+                self.job_index.discard_name(job_name)
+            raise
+        self._remember_job(job)
+        return job
 
     def delete_job_by_id(self, job_id: str):
-        return self.api_utils.call(method="DELETE", url=f"{self.spark_job_endpoint}/{job_id}")
+        try:
+            return self.api_utils.call(method="DELETE", url=f"{self.spark_job_endpoint}/{job_id}")
+        finally:
+            self._invalidate(("job", job_id))
+            self._forget_job_id(job_id)
+
+    def resolve_job_id(self, job_name: str) -> str:
+        """Id of the job named `job_name`; from `job_index` when it has the name, otherwise fetched by name."""
+        if self.job_index is not None:
+            job_id = self.job_index.get(job_name)
+            if job_id is not None:
+                return job_id
+        return self.get_job_by_name(job_name=job_name)["id"]
+
+    def _call_by_name(self, job_name: str, call: Callable[[str], dict]):
+        job_id = self.resolve_job_id(job_name)
+        try:
+            return call(job_id)
+        except ClientError as e:
+            if e.status != 404 or self.job_index is None:
+                raise
+            # the indexed id may be stale, e.g. the job was recreated by someone else
+            self.job_index.discard_id(job_id)
+            fresh_id = self.resolve_job_id(job_name)
+            if fresh_id == job_id:
+                raise
+            return call(fresh_id)
 
     def get_job_runs(self, job_id: str):
         return self.api_utils.call(method="GET", url=f"{self.spark_job_endpoint}/{job_id}/runs")
 
-    def submit_job_run(self, job_id: str, payload: dict):
-        return self.api_utils.call(method="POST", url=f"{self.spark_job_endpoint}/{job_id}/runs", payload=payload)
+    def iter_job_runs(self, job_id: str, page_size: int = DEFAULT_PAGE_SIZE, prefetch: bool = True,
+                      **filters) -> Iterator[dict]:
+        """Yield the job's runs page by page, e.g. `iter_job_runs(job_id, status="FAILED")`."""
+        fetch_page = self._fetch_page(f"{self.spark_job_endpoint}/{job_id}/runs", filters)
+        return iter_pages(fetch_page, page_size=page_size, prefetch=prefetch)
+
+    def submit_job_run(self, job_id: str, payload: dict, retry: bool = False):
+        return self.api_utils.call(method="POST", url=f"{self.spark_job_endpoint}/{job_id}/runs", payload=payload,
+                                   retry=retry)
 
     def cancel_job_run(self, job_id: str, run_id: str):
         return self.api_utils.call(method="DELETE", url=f"{self.spark_job_endpoint}/{job_id}/runs/{run_id}")
 
+    def submit_job_runs(self, runs: Iterable[Tuple[str, dict]], max_workers: int = DEFAULT_MAX_WORKERS,
+                        rate_limiter: TokenBucketRateLimiter = None, retry: bool = False,
+                        progress: ProgressCallback = None) -> List[Union[dict, Exception]]:
+        """Submit a run per `(job_id, payload)` concurrently; returns the run or the raised error per input, in order.
+
+        At most `max_workers` submissions are in flight and, with a `rate_limiter`, they start at
+        most at its rate. A failed submission doesn't stop the others.
+        """
+        return run_bulk(lambda run: self.submit_job_run(job_id=run[0], payload=run[1], retry=retry), runs,
+                        max_workers=max_workers, progress=progress, rate_limiter=rate_limiter)
+
+    def cancel_job_runs(self, runs: Iterable[Tuple[str, str]], max_workers: int = DEFAULT_MAX_WORKERS,
+                        rate_limiter: TokenBucketRateLimiter = None,
+                        progress: ProgressCallback = None) -> List[Union[dict, Exception]]:
+        """Cancel each `(job_id, run_id)` concurrently; returns the response or the raised error per input, in order."""
+        return run_bulk(lambda run: self.cancel_job_run(job_id=run[0], run_id=run[1]), runs,
+                        max_workers=max_workers, progress=progress, rate_limiter=rate_limiter)
+
+    def get_job_runs_by_name(self, job_name: str):
+        return self._call_by_name(job_name, lambda job_id: self.get_job_runs(job_id=job_id))
+
+    def submit_job_run_by_name(self, job_name: str, payload: dict, retry: bool = False):
+        return self._call_by_name(job_name, lambda job_id: self.submit_job_run(job_id=job_id, payload=payload,
+                                                                                retry=retry))
+
+    def cancel_job_run_by_name(self, job_name: str, run_id: str):
+        return self._call_by_name(job_name, lambda job_id: self.cancel_job_run(job_id=job_id, run_id=run_id))
+
+    def get_job_run_by_name(self, job_name: str, run_id: str):
+        return self._call_by_name(job_name, lambda job_id: self.get_job_run_by_id(job_id=job_id, run_id=run_id))
+
     def get_job_run_by_id(self, job_id: str, run_id: str):
         return self.api_utils.call(method="GET", url=f"{self.spark_job_endpoint}/{job_id}/runs/{run_id}")
 
@@ -87,3 +340,62 @@ class SparkJobApiClient:
 
     def get_job_run_metrics(self, job_id: str, run_id: str):
         return self.api_utils.call(method="GET", url=f"{self.spark_job_endpoint}/{job_id}/runs/{run_id}/metrics")
+
+    def stream_job_run_logs(self, job_id: str, run_id: str, follow: bool = True, poll_interval: float = 5.0,
+                            time_range: str = "5m", max_tracked_lines: int = 10000) -> Iterator[dict]:
+        """Yield the run's log entries (`{"date": ..., "logLine": ...}`) as they appear.
+
+        Starts with the last `time_range` of logs. With `follow`, keeps polling every `poll_interval`
+        seconds using the narrowest window that covers the time since the previous poll, skips
+        entries already yielded and stops after the poll that sees the run in a terminal state.
+        Memory stays bounded by `max_tracked_lines` regardless of how long the run is followed.
+        """
+        deduplicator = LogDeduplicator(max_tracked=max_tracked_lines)
+
+        while True:
+            polled_at = time.monotonic()
+            # checked before fetching, so the last fetch includes everything the run wrote
+            finished = not follow or is_run_terminal(self.get_job_run_by_id(job_id=job_id, run_id=run_id))
+
+            entries = self.get_job_run_logs(job_id=job_id, run_id=run_id, time_range=time_range) or []
+            yield from deduplicator.new_entries(entries)
+
+            if finished:
+                return
+
+            time.sleep(max(0.0, poll_interval - (time.monotonic() - polled_at)))
+            # margin for the server's clock and the time the previous fetch took
+            time_range = smallest_log_time_range((time.monotonic() - polled_at) * 1.5)
+
+    @property
+    def run_waiter(self) -> RunWaiter:
+        """Poller shared by `wait_for_run` / `wait_for_runs`; replace it to tune intervals."""
+        with self._run_waiter_lock:
+            if self._run_waiter is None:
+                self._run_waiter = RunWaiter(self)
+            return self._run_waiter
+
+    @run_waiter.setter
+    def run_waiter(self, run_waiter: RunWaiter):
+        with self._run_waiter_lock:
+            self._run_waiter = run_waiter
+
+    def wait_for_runs(self, runs: Iterable[Tuple[str, str]],
+                      callback: Callable[[dict], None] = None) -> List[Future]:
+        """Watch `(job_id, run_id)` pairs on one shared poller.
+
+        Returns a future per run, in order, resolved with the run once it reaches a terminal
+        state; `callback(run)` is called at that moment as well.
+        """
+        return [self.run_waiter.watch(job_id, run_id, callback=callback) for job_id, run_id in runs]
+
+    def wait_for_run(self, job_id: str, run_id: str, timeout: float = None) -> dict:
+        """Block until the run reaches a terminal state and return it.
+
+        Raises `TimeoutError` if that takes longer than `timeout` seconds.
+        """
+        future = self.run_waiter.watch(job_id, run_id)
+        try:
+            return future.result(timeout=timeout)
+        finally:
+            future.cancel()
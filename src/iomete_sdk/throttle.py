@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+class TokenBucketRateLimiter:
+    """Token bucket limiting requests to `rate` per second with bursts of up to `burst` requests.
+
+    Thread-safe; share one instance between `APIUtils` / `AsyncAPIUtils` instances to apply a
+    process-wide limit.
+    """
+
+    def __init__(self, rate: float, burst: int = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float = None) -> Optional[float]:
+        """Take a token and return how long to wait before using it.
+
+        Returns None, without taking a token, when the wait would exceed `max_wait`.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return None
+
+            self._tokens -= 1
+            return wait
+
+    def acquire(self):
+        time.sleep(self.reserve())
+
+    async def acquire_async(self):
+        # imported on use: asyncio is slow to import and only the async clients need it
+        import asyncio
+
+        await asyncio.sleep(self.reserve())
+
+
+class ConcurrencyLimiter:
+    """Bounds the number of requests in flight.
+
+    Usable from threads (`acquire`) and from any number of event loops (`acquire_async`) at
+    the same time, so a single instance can be shared by every client in the process.
+    """
+
+    def __init__(self, max_concurrency: int):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._async_waiters = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Wait for a free slot; returns False if none became free within `timeout` seconds."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._in_flight < self.limit, timeout=timeout):
+                return False
+            self._in_flight += 1
+            return True
+
+    async def acquire_async(self):
+        import asyncio
+
+        with self._cond:
+            if self._in_flight < self.limit and not self._async_waiters:
+                self._in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._async_waiters.append((loop, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # the slot may have been granted just before the cancellation arrived
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self, latency: float = None, status: int = None):
+        """Free a slot; `latency` and `status` of the finished request feed adaptive limiters."""
+        with self._cond:
+            self._in_flight -= 1
+            self._on_response(latency, status)
+            self._grant_async_waiters()
+            self._cond.notify_all()
+
+    def _on_response(self, latency: Optional[float], status: Optional[int]):
+        pass
+
+    def _grant_async_waiters(self):
+        while self._async_waiters and self._in_flight < self.limit:
+            loop, future = self._async_waiters.popleft()
+            if future.done():
+                continue
+            self._in_flight += 1
+            loop.call_soon_threadsafe(self._grant, future)
+
+    def _grant(self, future: "asyncio.Future"):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter(ConcurrencyLimiter):
+    """Concurrency limiter with an AIMD (additive increase, multiplicative decrease) limit.
+
+    Each response faster than `latency_target` grows the limit by `1 / limit`, i.e. by about one
+    per round of requests, up to `max_concurrency`. A throttling response (429/503 by default)
+    multiplies it by `backoff_ratio`, at most once per `latency_target` so a burst of rejected
+    in-flight requests counts as a single congestion signal.
+    """
+
+    def __init__(self, initial_concurrency: int = 4, min_concurrency: int = 1, max_concurrency: int = 64,
+                 latency_target: float = 1.0, backoff_ratio: float = 0.5,
+                 throttle_statuses: frozenset = frozenset({429, 503})):
+        super().__init__(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.throttle_statuses = throttle_statuses
+
+        self._last_decrease = 0.0
+
+    def _on_response(self, latency: Optional[float], status: Optional[int]):
+        if status in self.throttle_statuses:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.latency_target:
+                self._limit = max(self.min_concurrency, self._limit * self.backoff_ratio)
+                self._last_decrease = now
+        elif latency is not None and latency <= self.latency_target and status is not None and status < 500:
+            self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
@@ -0,0 +1,73 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+
+@dataclass(frozen=True)
+class Timeout:
+    """Socket timeouts in seconds; `None` waits forever."""
+    connect: Optional[float] = 10.0
+    read: Optional[float] = 60.0
+
+    @classmethod
+    def of(cls, value: Union["Timeout", float, Tuple[float, float], None]) -> Optional["Timeout"]:
+        """Accept the same shapes as requests: a single number, a `(connect, read)` tuple or a `Timeout`."""
+        if value is None or isinstance(value, Timeout):
+            return value
+        if isinstance(value, tuple):
+            return cls(connect=value[0], read=value[1])
+        return cls(connect=value, read=value)
+
+    def bounded(self, remaining: Optional[float]) -> "Timeout":
+        if remaining is None:
+            return self
+        return Timeout(connect=remaining if self.connect is None else min(self.connect, remaining),
+                       read=remaining if self.read is None else min(self.read, remaining))
+
+
+@dataclass(frozen=True)
+class RequestOptions:
+    timeout: Optional[Timeout] = None
+    # absolute time.monotonic() value
+    deadline: Optional[float] = None
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+
+_request_options: ContextVar[RequestOptions] = ContextVar("iomete_request_options", default=RequestOptions())
+
+
+def current_request_options() -> RequestOptions:
+    return _request_options.get()
+
+
+@contextmanager
+def request_options(timeout: Union[Timeout, float, Tuple[float, float]] = None, deadline: float = None):
+    """Override timeouts and/or set an overall deadline for every API call made inside the block.
+
+    `deadline` is a budget in seconds from now, shared by all calls, retries and pages inside the
+    block; nested blocks can only shorten an outer deadline. Works for both the blocking and the
+    asyncio clients.
+
+        with request_options(timeout=(3, 10), deadline=30):
+            logs = job_client.get_job_run_logs(job_id=job_id, run_id=run_id, time_range="30d")
+    """
+    outer = _request_options.get()
+
+    absolute_deadline = outer.deadline
+    if deadline is not None:
+        absolute_deadline = time.monotonic() + deadline
+        if outer.deadline is not None:
+            absolute_deadline = min(absolute_deadline, outer.deadline)
+
+    token = _request_options.set(RequestOptions(timeout=Timeout.of(timeout) or outer.timeout,
+                                                deadline=absolute_deadline))
+    try:
+        yield
+    finally:
+        _request_options.reset(token)
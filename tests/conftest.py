@@ -0,0 +1,9 @@
+import pytest
+
+from tests.fake_server import FakeIometeServer
+
+
+@pytest.fixture
+def server():
+    with FakeIometeServer() as server:
+        yield server
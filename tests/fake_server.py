@@ -0,0 +1,330 @@
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# kinds of policies, as they appear in the data security API paths
+POLICY_KINDS = ("access", "filter", "mask")
+
+
+class _Failure(Exception):
+    def __init__(self, status: int, message: str, headers: dict = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # bulk calls open many connections at once
+    request_queue_size = 128
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive, like the dataplane's load balancer
+    protocol_version = "HTTP/1.1"
+    # headers and body in one segment, so the client's delayed ACK never stalls a response
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+    fake: "FakeIometeServer" = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _handle(self, method: str):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, payload, headers = self.fake.handle(method, self.path,
+                                                   {name.lower(): value for name, value in self.headers.items()}, body)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload or b"")))
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+
+class FakeIometeServer:
+    """In-process stand-in for the dataplane endpoints `SparkJobApiClient` and `DataSecurityApiClient` use.
+
+    Serves plain HTTP on 127.0.0.1 with keep-alive, keeps jobs, runs and policies in memory and
+    tags GET responses with an `ETag` it revalidates. `latency` (seconds, or a callable returning
+    them) is added to every request; `failure_rate` of the requests, and the ones queued with
+    `fail_next`, are answered with `failure_status` instead. Runs report RUNNING until
+    `run_duration` seconds after they were submitted, then COMPLETED.
+    """
+
+    def __init__(self, domain: str = "test-domain", api_key: str = "test-key",
+                 latency: Union[float, Callable[[], float]] = 0.0, failure_rate: float = 0.0,
+                 failure_status: int = 503, run_duration: float = 0.0, seed: Optional[int] = None):
+        self.domain = domain
+        self.api_key = api_key
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.run_duration = run_duration
+
+        self.jobs = {}
+        self.runs = {}
+        self.policies = {kind: {} for kind in POLICY_KINDS}
+        self.request_count = 0
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._failures = deque()
+        self._next_policy_id = 1
+        self._policy_names = {kind: set() for kind in POLICY_KINDS}
+        # encoded list bodies, dropped on every write
+        self._bodies = {}
+        self._server = None
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FakeIometeServer":
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self._server = _Server(("127.0.0.1", 0), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), name="FakeIometeServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def spark_client(self, api_key: str = None, **kwargs):
+        """A `SparkJobApiClient` for this server; `api_key` overrides the accepted key."""
+        from iomete_sdk.spark import SparkJobApiClient
+        return SparkJobApiClient(host=self.host, api_key=api_key or self.api_key, domain=self.domain, **kwargs)
+
+    def fail_next(self, count: int = 1, status: int = None, headers: dict = None):
+        """Answer the next `count` requests with `status` (default `failure_status`)."""
+        with self._lock:
+            self._failures.extend([(status or self.failure_status, headers)] * count)
+
+    def add_job(self, payload: dict) -> dict:
+        with self._lock:
+            return self._create_job(payload)
+
+    def add_policy(self, kind: str, policy: dict) -> dict:
+        with self._lock:
+            return self._create_policy(kind, policy)
+
+    def handle(self, method: str, raw_path: str, headers: dict, body: bytes):
+        """(status, body, headers) for one request; `headers` with lowercase names."""
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+
+        with self._lock:
+            self.request_count += 1
+            try:
+                failure = self._failures.popleft() if self._failures else None
+                if failure is None and self.failure_rate and self._random.random() < self.failure_rate:
+                    failure = (self.failure_status, None)
+                if failure is not None:
+                    raise _Failure(failure[0], "injected failure", failure[1])
+                if headers.get("x-api-token") != self.api_key:
+                    raise _Failure(401, "invalid API key")
+
+                url = urlsplit(raw_path)
+                query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                payload = json.loads(body) if body else None
+                status, data = self._route(method, [unquote(part) for part in url.path.strip("/").split("/")],
+                                           query, payload)
+            except _Failure as failure:
+                return failure.status, json.dumps({"message": str(failure)}).encode("utf-8"), failure.headers
+            if data is None:
+                return status, None, {}
+            # while no other request can change the data
+            encoded = data if isinstance(data, bytes) else json.dumps(data).encode("utf-8")
+
+        if method != "GET":
+            return status, encoded, {}
+
+        etag = f'"{hashlib.sha1(encoded).hexdigest()}"'
+        if headers.get("if-none-match") == etag:
+            return 304, None, {"ETag": etag}
+        return status, encoded, {"ETag": etag}
+
+    # routing; called with the lock held
+
+    def _route(self, method: str, parts: list, query: dict, payload):
+        if parts[:3] == ["api", "v2", "domains"] and parts[4:7] == ["sdk", "spark", "jobs"] \
+                and parts[3] == self.domain:
+            return self._spark(method, parts[7:], query, payload)
+        if parts[:3] == ["api", "v1", "domains"] and parts[4:5] == ["data-security"] and parts[3] == self.domain:
+            return self._security(method, parts[5:], payload)
+        raise _Failure(404, f"no such endpoint: {'/'.join(parts)}")
+
+    def _spark(self, method: str, parts: list, query: dict, payload):
+        if not parts:
+            if method == "GET":
+                return 200, self._listing("jobs", list(self.jobs.values()), query)
+            if method == "POST":
+                return 200, self._create_job(payload)
+        elif parts[0] == "name" and len(parts) == 2 and method == "GET":
+            for job in self.jobs.values():
+                if job.get("name") == parts[1]:
+                    return 200, job
+            raise _Failure(404, f"job {parts[1]} not found")
+        else:
+            job = self._job(parts[0])
+            if len(parts) == 1:
+                if method == "GET":
+                    return 200, job
+                if method == "PUT":
+                    # a full replacement, like the real endpoint
+                    job_id = job["id"]
+                    job.clear()
+                    job.update(payload, id=job_id)
+                    self._bodies.clear()
+                    return 200, job
+                if method == "DELETE":
+                    del self.jobs[job["id"]]
+                    self._bodies.clear()
+                    return 204, None
+            elif parts[1] == "runs":
+                return self._runs(method, job, parts[2:], query, payload)
+        raise _Failure(405, f"{method} not allowed")
+
+    def _runs(self, method: str, job: dict, parts: list, query: dict, payload):
+        if not parts:
+            if method == "GET":
+                runs = [self._run_view(run) for run in self.runs.values() if run["jobId"] == job["id"]]
+                return 200, self._listing(None, runs, query)
+            if method == "POST":
+                run = {"id": str(uuid.uuid4()), "jobId": job["id"], "submittedAt": time.monotonic(),
+                       "startTime": datetime.now(timezone.utc).isoformat(), "aborted": False,
+                       "arguments": (payload or {}).get("arguments")}
+                self.runs[run["id"]] = run
+                return 200, self._run_view(run)
+
+        run = self.runs.get(parts[0])
+        if run is None or run["jobId"] != job["id"]:
+            raise _Failure(404, f"run {parts[0]} not found")
+        if len(parts) == 1 and method == "GET":
+            return 200, self._run_view(run)
+        if len(parts) == 1 and method == "DELETE":
+            run["aborted"] = True
+            return 200, self._run_view(run)
+        if parts[1:] == ["logs"] and method == "GET":
+            now = datetime.now(timezone.utc).isoformat()
+            return 200, [{"date": now, "logLine": f"{run['id']} line {i}"} for i in range(3)]
+        if parts[1:] == ["metrics"] and method == "GET":
+            # input grows by 1 MB per second of the run
+            elapsed = min(time.monotonic() - run["submittedAt"], self.run_duration)
+            return 200, {"runId": run["id"], "executors": 1, "inputBytes": int(elapsed * 1_000_000),
+                         "memory": {"usedBytes": 512 * 1024 * 1024}}
+        raise _Failure(405, f"{method} not allowed")
+
+    def _security(self, method: str, parts: list, payload):
+        if len(parts) < 2 or parts[0] not in POLICY_KINDS or parts[1] != "policy":
+            raise _Failure(404, f"no such endpoint: {'/'.join(parts)}")
+        kind = parts[0]
+        policies = self.policies[kind]
+
+        if len(parts) == 2:
+            if method == "GET":
+                return 200, self._listing(kind, list(policies.values()), {})
+            if method == "POST":
+                return 200, self._create_policy(kind, payload)
+            raise _Failure(405, f"{method} not allowed")
+
+        policy = policies.get(int(parts[2])) if parts[2].isdigit() else None
+        if policy is None:
+            raise _Failure(404, f"{kind} policy {parts[2]} not found")
+        if method == "GET":
+            return 200, policy
+        if method == "PUT":
+            self._policy_names[kind].discard(policy.get("name"))
+            policy.update(payload, id=policy["id"])
+            self._policy_names[kind].add(policy.get("name"))
+            self._bodies.clear()
+            return 200, policy
+        if method == "DELETE":
+            del policies[policy["id"]]
+            self._policy_names[kind].discard(policy.get("name"))
+            self._bodies.clear()
+            return 204, None
+        raise _Failure(405, f"{method} not allowed")
+
+    def _listing(self, cache_key: Optional[str], items: list, query: dict):
+        if "page" in query:
+            size = int(query.get("size", 100))
+            start = int(query["page"]) * size
+            return items[start:start + size]
+        if cache_key is None:
+            return items
+        body = self._bodies.get(cache_key)
+        if body is None:
+            body = self._bodies[cache_key] = json.dumps(items).encode("utf-8")
+        return body
+
+    def _job(self, job_id: str) -> dict:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise _Failure(404, f"job {job_id} not found")
+        return job
+
+    def _create_job(self, payload: dict) -> dict:
+        if any(job.get("name") == payload.get("name") for job in self.jobs.values()):
+            raise _Failure(409, f"job {payload.get('name')} already exists")
+        job = dict(payload, id=str(uuid.uuid4()))
+        self.jobs[job["id"]] = job
+        self._bodies.clear()
+        return job
+
+    def _create_policy(self, kind: str, policy: dict) -> dict:
+        if policy.get("name") in self._policy_names[kind]:
+            raise _Failure(409, f"{kind} policy {policy.get('name')} already exists")
+        policy = dict(policy, id=self._next_policy_id)
+        self._next_policy_id += 1
+        self.policies[kind][policy["id"]] = policy
+        self._policy_names[kind].add(policy.get("name"))
+        self._bodies.clear()
+        return policy
+
+    def _run_view(self, run: dict) -> dict:
+        if run["aborted"]:
+            status = "ABORTED"
+        elif time.monotonic() - run["submittedAt"] >= self.run_duration:
+            status = "COMPLETED"
+        else:
+            status = "RUNNING"
+        return {"id": run["id"], "jobId": run["jobId"], "status": status, "startTime": run["startTime"],
+                "arguments": run["arguments"]}
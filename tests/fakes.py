@@ -0,0 +1,53 @@
+import io
+import json
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+TEST_FAKE_HOST = "https://dataplane.test"
+
+
+class FakeAdapter(BaseAdapter):
+    """Transport adapter that answers requests from a handler instead of the network.
+
+    `handler(request)` returns `(status, body)` or `(status, body, headers)`; a `dict`/`list`
+    body is JSON-encoded, `bytes` are sent as is. Raising from the handler simulates a
+    connection level failure.
+    """
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+        self.requests = []
+        self.timeouts = []
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self.requests.append(request)
+        self.timeouts.append(timeout)
+        result = self.handler(request)
+        status, body = result[0], result[1]
+        headers = result[2] if len(result) > 2 else {}
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        content = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        if stream:
+            response.raw = io.BytesIO(content)
+        else:
+            response._content = content
+        response.url = request.url
+        response.request = request
+        response.reason = "FAKE"
+        response.encoding = "utf-8"
+        return response
+
+    def close(self):
+        pass
+
+
+def mount_fake(api_utils, handler) -> FakeAdapter:
+    adapter = FakeAdapter(handler)
+    api_utils.session.mount(TEST_FAKE_HOST, adapter)
+    return adapter
@@ -0,0 +1,164 @@
+import json
+import time
+from datetime import datetime, timezone
+
+from iomete_sdk.security.analyzer import analyze_policies, FindingKind
+from iomete_sdk.security.evaluator import PolicyEvaluator, Principal, Resource
+from iomete_sdk.security.policy_models import AccessPolicyView, AccessPolicyResource, AccessPolicyItem, \
+    AccessType, PolicyPriority, ValidityPeriod, DataMaskPolicyView, DataMaskPolicyResource, DataMaskPolicyItem, \
+    RowFilterPolicyView, RowFilterPolicyResource, RowFilterPolicyItem
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def access_policy(name, tables=("orders",), columns=("*",), allow=(), deny=(), allow_exceptions=(),
+                  deny_exceptions=(), priority=PolicyPriority.NORMAL, databases=("sales",)):
+    return AccessPolicyView(
+        name=name, priority=priority,
+        resources=[AccessPolicyResource(databases=list(databases), tables=list(tables), columns=list(columns))],
+        allow_policy_items=[AccessPolicyItem(**item) for item in allow],
+        allow_exceptions=[AccessPolicyItem(**item) for item in allow_exceptions],
+        deny_policy_items=[AccessPolicyItem(**item) for item in deny],
+        deny_exceptions=[AccessPolicyItem(**item) for item in deny_exceptions],
+    )
+
+
+def mask_policy(name, column="email", table="customers", groups=("analysts",), mask="MASK_HASH"):
+    return DataMaskPolicyView(
+        name=name, resources=[DataMaskPolicyResource(database="sales", table=table, column=column)],
+        data_mask_policy_items=[DataMaskPolicyItem(data_mask_type=mask, groups=list(groups))])
+
+
+def test_mask_and_row_filter_conflicts():
+    report = analyze_policies(
+        masking_policies=[mask_policy("hash emails"), mask_policy("null emails", mask="MASK_NULL"),
+                          mask_policy("all customer columns", column="*", groups=["support"]),
+                          mask_policy("other column", column="phone")],
+        filter_policies=[
+            RowFilterPolicyView(name=f"filter {i}", resources=[RowFilterPolicyResource(database="sales", table="orders")],
+                                row_filter_policy_items=[RowFilterPolicyItem(filter_expr="1 = 1", users=[user])])
+            for i, user in enumerate(["ana", "ana", "bob"])],
+        now=NOW)
+
+    masks = report.of_kind(FindingKind.MASK_CONFLICT)
+    assert len(masks) == 1
+    assert masks[0].policies == ["hash emails", "null emails"]
+    assert masks[0].resource == "sales.customers.email"
+    assert masks[0].principals == ["group:analysts"]
+    assert masks[0].detail == "MASK_HASH, MASK_NULL"
+
+    filters = report.of_kind(FindingKind.ROW_FILTER_CONFLICT)
+    assert [(finding.policies, finding.principals) for finding in filters] == [(["filter 0", "filter 1"], ["user:ana"])]
+
+
+def test_public_mask_conflicts_with_everyone():
+    report = analyze_policies(masking_policies=[mask_policy("public", table="*", groups=["public"]),
+                                                mask_policy("analysts")], now=NOW)
+
+    (finding,) = report.of_kind(FindingKind.MASK_CONFLICT)
+    assert finding.policies == ["public", "analysts"]
+    assert finding.resource == "sales.customers.email"
+
+
+def test_shadowed_deny_and_access_conflict():
+    report = analyze_policies(access_policies=[
+        access_policy("deny contractors", deny=[{"groups": ["contractors"], "accesses": [AccessType.ALL]}]),
+        access_policy("override for etl", tables=["*"], priority=PolicyPriority.OVERRIDE,
+                      allow=[{"groups": ["contractors"], "users": ["etl"], "accesses": [AccessType.SELECT]}]),
+        access_policy("analysts read", columns=["amount"],
+                      allow=[{"groups": ["public"], "accesses": [AccessType.SELECT, AccessType.UPDATE]}],
+                      allow_exceptions=[{"groups": ["interns"], "accesses": [AccessType.ALL]}]),
+        access_policy("no intern updates", deny=[{"groups": ["interns"], "accesses": [AccessType.UPDATE]}]),
+    ], now=NOW)
+
+    (shadowed,) = report.of_kind(FindingKind.SHADOWED_DENY)
+    assert shadowed.policies == ["override for etl", "deny contractors"]
+    assert shadowed.resource == "sales.orders"
+    assert shadowed.principals == ["group:contractors"]
+    assert shadowed.accesses == ["SELECT"]
+
+    conflicts = report.of_kind(FindingKind.ACCESS_CONFLICT)
+    assert [(finding.policies, finding.principals, finding.accesses) for finding in conflicts] == [
+        (["deny contractors", "analysts read"], ["group:contractors"], ["SELECT", "UPDATE"])]
+
+
+def test_dead_policies():
+    expired = access_policy("expired", allow=[{"users": ["ana"], "accesses": [AccessType.SELECT]}])
+    expired.validity_period = ValidityPeriod(start_time="2025/01/01 00:00:00", end_time="2026/01/01 00:00:00")
+    disabled = mask_policy("disabled")
+    disabled.is_enabled = False
+    empty = access_policy("empty")
+
+    report = analyze_policies(access_policies=[expired, empty], masking_policies=[disabled, mask_policy("same")],
+                              now=NOW)
+
+    assert [(finding.policies, finding.detail) for finding in report.findings] == [
+        (["expired"], "expired at 2026/01/01 00:00:00 Universal"),
+        (["empty"], "no policy items"),
+        (["disabled"], "disabled"),
+    ]
+    assert json.loads(report.to_json())["findings"][0] == {
+        "kind": "DEAD_POLICY", "policies": ["expired"], "policyIds": [None], "resource": None,
+        "principals": [], "accesses": [], "detail": "expired at 2026/01/01 00:00:00 Universal"}
+
+
+def test_scales_with_overlaps_not_policy_pairs():
+    masking_policies = [mask_policy(f"mask {i}", table=f"t{i % 10000}", groups=[f"team-{i}"]) for i in range(20000)]
+    masking_policies.append(mask_policy("late duplicate", table="t7", groups=["team-7"]))
+
+    started = time.perf_counter()
+    report = analyze_policies(masking_policies=masking_policies, now=NOW)
+    elapsed = time.perf_counter() - started
+
+    assert [finding.policies for finding in report.findings] == [["mask 7", "late duplicate"]]
+    # 20000 policies are 2 * 10^8 pairs
+    assert elapsed < 5
+
+
+def test_user_macro_and_malformed_validity_period():
+    broken = access_policy("broken", allow=[{"users": ["ana"], "accesses": [AccessType.SELECT]}])
+    broken.validity_period = ValidityPeriod(start_time=None, end_time="2026-12-31")
+    report = analyze_policies(access_policies=[
+        access_policy("everyone reads", allow=[{"users": ["{USER}"], "accesses": [AccessType.SELECT]}]),
+        access_policy("no alice", deny=[{"users": ["alice"], "accesses": [AccessType.ALL]}]),
+        access_policy("readers read", allow=[{"users": ["{USER}"], "accesses": [AccessType.SELECT]}]),
+        broken,
+    ], now=NOW)
+
+    # {USER} overlaps with alice, not with a user literally named "{USER}"
+    conflicts = report.of_kind(FindingKind.ACCESS_CONFLICT)
+    assert [(finding.policies, finding.principals) for finding in conflicts] == [
+        (["no alice", "everyone reads"], ["user:alice"]), (["no alice", "readers read"], ["user:alice"])]
+    assert [(finding.policies, finding.detail) for finding in report.of_kind(FindingKind.DEAD_POLICY)] == [
+        (["broken"], "validity period can't be parsed")]
+
+
+def test_deny_covered_by_its_exception_agrees_with_the_evaluator():
+    policies = [
+        access_policy("alice reads", allow=[{"users": ["alice"], "accesses": [AccessType.SELECT]}]),
+        access_policy("deny but alice", deny=[{"users": ["alice"], "accesses": [AccessType.SELECT]}],
+                      deny_exceptions=[{"users": ["alice"], "accesses": [AccessType.SELECT]}]),
+        access_policy("override", priority=PolicyPriority.OVERRIDE,
+                      allow=[{"users": ["alice"], "accesses": [AccessType.SELECT]}]),
+    ]
+
+    assert analyze_policies(access_policies=policies, now=NOW).findings == []
+    decision = PolicyEvaluator(access_policies=policies).check_access(
+        Principal(user="alice"), AccessType.SELECT, Resource("sales", "orders"), at=NOW)
+    assert decision.allowed
+
+
+def test_scales_with_wildcard_database_policies():
+    access_policies = [
+        access_policy(f"policy {i}", databases=["*"] if i % 10 == 0 else [f"db{i}"], tables=[f"t{i}"],
+                      allow=[{"users": [f"reader-{i}"], "accesses": [AccessType.SELECT]}],
+                      deny=[{"users": [f"blocked-{i}"], "accesses": [AccessType.SELECT]}])
+        for i in range(20000)]
+
+    started = time.perf_counter()
+    report = analyze_policies(access_policies=access_policies, now=NOW)
+    elapsed = time.perf_counter() - started
+
+    assert report.findings == []
+    # each of the 18000 literal keys would otherwise be checked against 2000 wildcard database keys
+    assert elapsed < 5
@@ -0,0 +1,56 @@
+import pytest
+
+from iomete_sdk.api_utils import APIUtils, ClientError
+from iomete_sdk.security import DataSecurityApiClient
+from iomete_sdk.spark import SparkJobApiClient
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+def test_session_is_reused_across_calls():
+    api_utils = APIUtils(api_key="token")
+    adapter = mount_fake(api_utils, lambda request: (200, {"id": "job-1"}))
+
+    assert api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs/job-1") == {"id": "job-1"}
+    assert api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs/job-1") == {"id": "job-1"}
+
+    assert len(adapter.requests) == 2
+    assert adapter.requests[0].headers["X-API-TOKEN"] == "token"
+    assert adapter.requests[0].headers["Connection"] == "keep-alive"
+
+
+def test_pool_size_is_configurable():
+    api_utils = APIUtils(api_key="token", pool_connections=2, pool_maxsize=32)
+    adapter = api_utils.session.get_adapter("https://dataplane.example.com")
+
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 32
+
+
+def test_http_error_raises_client_error():
+    api_utils = APIUtils(api_key="token")
+    mount_fake(api_utils, lambda request: (404, {"errorCode": "NOT_FOUND"}))
+
+    with pytest.raises(ClientError) as err:
+        api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs/missing")
+
+    assert err.value.status == 404
+    assert err.value.content["errorCode"] == "NOT_FOUND"
+
+
+def test_clients_share_transport_and_close_only_owned_sessions():
+    shared = APIUtils(api_key="token")
+    closed = []
+    shared.close = lambda: closed.append(True)
+
+    with SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default", api_utils=shared) as job_client:
+        security_client = DataSecurityApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default",
+                                                api_utils=shared)
+        assert job_client.api_utils is security_client.api_utils
+        security_client.close()
+
+    assert closed == []
+
+    with SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default") as job_client:
+        job_client.api_utils.close = lambda: closed.append(True)
+
+    assert closed == [True]
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from iomete_sdk.api_utils import ClientError, RequestTimeoutError
+from iomete_sdk.async_api_utils import AsyncAPIUtils
+from iomete_sdk.security import AsyncDataSecurityApiClient
+from iomete_sdk.security.policy_models import AccessPolicyView, AccessType
+from iomete_sdk.spark import AsyncSparkJobApiClient
+from iomete_sdk.timeouts import request_options
+
+ACCESS_POLICY = {
+    "id": 7,
+    "name": "policy",
+    "isEnabled": True,
+    "resources": [{"databases": ["db"], "tables": ["tbl"], "columns": ["*"]}],
+    "allowPolicyItems": [{"users": ["{USER}"], "accesses": ["SELECT"]}],
+}
+
+
+def _create_app() -> web.Application:
+    async def get_job(request):
+        if request.match_info["job_id"] == "missing":
+            return web.json_response({"errorCode": "NOT_FOUND"}, status=404)
+        if request.match_info["job_id"] == "slow":
+            await asyncio.sleep(1)
+        assert request.headers["X-API-TOKEN"] == "token"
+        return web.json_response({"id": request.match_info["job_id"]})
+
+    async def delete_job(request):
+        return web.Response(status=204)
+
+    async def get_access_policies(request):
+        return web.json_response([ACCESS_POLICY])
+
+    app = web.Application()
+    app.router.add_get("/api/v2/domains/default/sdk/spark/jobs/{job_id}", get_job)
+    app.router.add_delete("/api/v2/domains/default/sdk/spark/jobs/{job_id}", delete_job)
+    app.router.add_get("/api/v1/domains/default/data-security/access/policy", get_access_policies)
+    return app
+
+
+async def _with_server(test):
+    async with TestServer(_create_app()) as server:
+        host = str(server.make_url("")).rstrip("/")
+        async with AsyncAPIUtils(api_key="token") as api_utils:
+            await test(host, api_utils)
+
+
+def test_async_clients_share_one_pool():
+    async def test(host, api_utils):
+        job_client = AsyncSparkJobApiClient(host=host, api_key="token", domain="default", api_utils=api_utils)
+        security_client = AsyncDataSecurityApiClient(host=host, api_key="token", domain="default",
+                                                     api_utils=api_utils)
+
+        jobs = await asyncio.gather(*[job_client.get_job_by_id(job_id=f"job-{i}") for i in range(50)])
+        policies = await security_client.get_access_policies()
+
+        assert [job["id"] for job in jobs] == [f"job-{i}" for i in range(50)]
+        assert policies == [AccessPolicyView.from_dict(ACCESS_POLICY)]
+        assert policies[0].allow_policy_items[0].accesses == [AccessType.SELECT]
+        assert await job_client.delete_job_by_id(job_id="job-1") is None
+
+        await job_client.close()
+        assert not api_utils._get_session().closed
+
+    asyncio.run(_with_server(test))
+
+
+def test_async_client_raises_client_error():
+    async def test(host, api_utils):
+        job_client = AsyncSparkJobApiClient(host=host, api_key="token", domain="default", api_utils=api_utils)
+
+        with pytest.raises(ClientError) as err:
+            await job_client.get_job_by_id(job_id="missing")
+
+        assert err.value.status == 404
+        assert err.value.content["errorCode"] == "NOT_FOUND"
+
+    asyncio.run(_with_server(test))
+
+
+def test_async_client_raises_request_timeout_error():
+    async def test(host, api_utils):
+        job_client = AsyncSparkJobApiClient(host=host, api_key="token", domain="default", api_utils=api_utils)
+
+        with request_options(timeout=0.05):
+            with pytest.raises(RequestTimeoutError):
+                await job_client.get_job_by_id(job_id="slow")
+
+    asyncio.run(_with_server(test))
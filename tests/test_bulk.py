@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+
+from iomete_sdk.api_utils import ClientError, DeadlineExceededError
+from iomete_sdk.bulk import run_bulk
+from iomete_sdk.security import DataSecurityApiClient
+from iomete_sdk.security.policy_models import AccessPolicyView
+from iomete_sdk.spark import SparkJobApiClient
+from iomete_sdk.throttle import TokenBucketRateLimiter
+from iomete_sdk.timeouts import request_options
+from tests.fake_server import FakeIometeServer
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+def test_run_bulk_keeps_order_and_bounds_concurrency():
+    lock = threading.Lock()
+    running = []
+    peak = []
+    progress = []
+
+    def work(item):
+        with lock:
+            running.append(item)
+            peak.append(len(running))
+        time.sleep(0.001 * (item % 3))
+        with lock:
+            running.remove(item)
+        if item % 4 == 0:
+            raise ValueError(item)
+        return item * 10
+
+    results = run_bulk(work, range(40), max_workers=3, progress=lambda done, total: progress.append((done, total)))
+
+    assert max(peak) <= 3
+    assert [r for i, r in enumerate(results) if i % 4] == [i * 10 for i in range(40) if i % 4]
+    assert all(isinstance(results[i], ValueError) for i in range(0, 40, 4))
+    assert progress[-1] == (40, 40) and len(progress) == 40
+
+
+def test_create_access_policies_reports_per_item_results():
+    client = DataSecurityApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default")
+
+    def handler(request):
+        policy = json.loads(request.body)
+        if policy["name"] == "bad":
+            return 400, {"errorCode": "BAD_REQUEST"}
+        return 200, {**policy, "id": int(policy["name"].split("-")[1])}
+
+    mount_fake(client.api_utils, handler)
+
+    results = client.create_access_policies([AccessPolicyView(name="p-1"), AccessPolicyView(name="bad"),
+                                             AccessPolicyView(name="p-3")], max_workers=2)
+
+    assert [r.id for r in (results[0], results[2])] == [1, 3]
+    assert isinstance(results[1], ClientError) and results[1].status == 400
+
+
+def test_delete_masking_policies_returns_none_per_success():
+    client = DataSecurityApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default")
+    adapter = mount_fake(client.api_utils, lambda request: (204, b""))
+
+    assert client.delete_masking_policies([1, 2, 3]) == [None, None, None]
+    assert sorted(r.url.rsplit("/", 1)[1] for r in adapter.requests) == ["1", "2", "3"]
+
+
+def test_run_bulk_rate_limits_calls():
+    limiter = TokenBucketRateLimiter(rate=100, burst=1)
+    started = time.monotonic()
+    assert run_bulk(lambda item: item, range(11), max_workers=4, rate_limiter=limiter) == list(range(11))
+    assert time.monotonic() - started >= 0.09
+
+    slow = TokenBucketRateLimiter(rate=1, burst=1)
+    with request_options(deadline=0.2):
+        results = run_bulk(lambda item: item, range(3), max_workers=3, rate_limiter=slow)
+    assert sum(isinstance(result, DeadlineExceededError) for result in results) == 2
+
+
+def test_submit_and_cancel_job_runs():
+    with FakeIometeServer(run_duration=60, latency=0.05) as server, \
+            SparkJobApiClient(host=server.host, api_key=server.api_key, domain=server.domain) as client:
+        jobs = [server.add_job({"name": f"job-{i}"}) for i in range(10)]
+        submissions = [(job["id"], {"arguments": [str(i)]}) for i, job in enumerate(jobs)]
+        submissions.insert(4, ("missing-job", {}))
+
+        started = time.monotonic()
+        runs = client.submit_job_runs(submissions, max_workers=8)
+        assert time.monotonic() - started < 0.4
+
+        assert isinstance(runs[4], ClientError) and runs[4].status == 404
+        runs = runs[:4] + runs[5:]
+        assert [run["jobId"] for run in runs] == [job["id"] for job in jobs]
+        assert [run["arguments"] for run in runs] == [[str(i)] for i in range(10)]
+
+        cancellations = [(run["jobId"], run["id"]) for run in runs] + [(jobs[0]["id"], "missing-run")]
+        results = client.cancel_job_runs(cancellations, max_workers=4,
+                                         rate_limiter=TokenBucketRateLimiter(rate=1000, burst=4))
+        assert [result["status"] for result in results[:-1]] == ["ABORTED"] * 10
+        assert isinstance(results[-1], ClientError)
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from iomete_sdk.api_utils import ClientError
+from iomete_sdk.cache import TTLCache, MISSING
+from iomete_sdk.security import DataSecurityApiClient
+from iomete_sdk.security.policy_models import AccessPolicyView
+from iomete_sdk.spark import SparkJobApiClient
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("iomete_sdk.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    now[0] += 11
+    assert cache.get("a") is MISSING
+
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.evictions, stats.expirations, stats.size) == (1, 2, 1, 1, 1)
+
+
+def test_job_lookups_are_cached_and_invalidated_by_writes():
+    job_client = SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default", cache=TTLCache())
+    jobs = {"job-1": {"id": "job-1", "name": "nightly", "jobType": "MANUAL"}}
+
+    def handler(request):
+        if request.method == "PUT":
+            jobs["job-1"] = json.loads(request.body)
+            return 200, jobs["job-1"]
+        if request.url.endswith("/jobs"):
+            return 200, {"items": list(jobs.values())}
+        return 200, jobs["job-1"]
+
+    adapter = mount_fake(job_client.api_utils, handler)
+
+    job_client.get_jobs()
+    job = job_client.get_job_by_id(job_id="job-1")
+    job["jobType"] = "mutated by caller"
+    assert job_client.get_job_by_name(job_name="nightly")["jobType"] == "MANUAL"
+    assert len(adapter.requests) == 1
+
+    job_client.update_job(job_id="job-1", payload={"id": "job-1", "name": "nightly", "jobType": "SCHEDULED"})
+    assert job_client.get_job_by_name(job_name="nightly")["jobType"] == "SCHEDULED"
+    assert len(adapter.requests) == 3
+    assert job_client.cache.stats.invalidations == 1
+
+
+def test_renamed_job_is_not_found_by_its_old_name():
+    job_client = SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default", cache=TTLCache())
+    jobs = {"j1": {"id": "j1", "name": "old"}}
+
+    def handler(request):
+        if request.method == "PUT":
+            jobs["j1"] = json.loads(request.body)
+            return 200, jobs["j1"]
+        name = request.url.rsplit("/name/", 1)[-1] if "/name/" in request.url else None
+        if name is not None:
+            found = [job for job in jobs.values() if job["name"] == name]
+            return (200, found[0]) if found else (404, {"message": f"job {name} not found"})
+        return 200, jobs["j1"]
+
+    mount_fake(job_client.api_utils, handler)
+
+    assert job_client.get_job_by_name(job_name="old")["id"] == "j1"
+    job_client.update_job(job_id="j1", payload={"id": "j1", "name": "new"})
+    assert job_client.get_job_by_id(job_id="j1")["name"] == "new"
+
+    with pytest.raises(ClientError) as error:
+        job_client.get_job_by_name(job_name="old")
+    assert error.value.status == 404
+    assert job_client.get_job_by_name(job_name="new")["id"] == "j1"
+
+
+def test_policy_lookups_are_cached_and_invalidated_by_deletes():
+    client = DataSecurityApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default",
+                                   cache=TTLCache(maxsize=100, ttl=60))
+    adapter = mount_fake(client.api_utils,
+                         lambda request: (204, b"") if request.method == "DELETE" else (200, {"id": 7, "name": "p"}))
+
+    policy = client.get_access_policy_by_id(7)
+    policy.name = "mutated by caller"
+
+    assert client.get_access_policy_by_id(7) == AccessPolicyView.from_dict({"id": 7, "name": "p"})
+    assert len(adapter.requests) == 1
+
+    client.delete_access_policy_by_id(7)
+    client.get_access_policy_by_id(7)
+    assert len(adapter.requests) == 3
+    assert client.cache.stats.hits == 1
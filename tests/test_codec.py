@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from iomete_sdk.api_utils import APIUtils
+from iomete_sdk.codec import JsonCodec, OrjsonCodec, default_codec, orjson
+from iomete_sdk.security.policy_models import AccessPolicyView, AccessPolicyResource, AccessPolicyItem, \
+    AccessType
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+requires_orjson = pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+
+POLICY = AccessPolicyView(
+    name="sales ☃ read",
+    resources=[AccessPolicyResource(databases=["sales"], tables=["orders"], columns=["*"])],
+    allow_policy_items=[AccessPolicyItem(users=["ana"], accesses=[AccessType.SELECT, AccessType.READ])],
+).to_dict()
+
+BODIES = [
+    b'{"a": 1, "b": [1.5, -2e-3, true, false, null], "c": {"d": "caf\\u00e9"}}',
+    b'[123456789012345678901234567890, 1.0]',
+    b'{"nan": NaN, "inf": -Infinity}',
+    '{"text": "non-ascii ☃"}'.encode("utf-8"),
+]
+
+
+@requires_orjson
+@pytest.mark.parametrize("body", BODIES)
+def test_orjson_decodes_like_stdlib(body):
+    decoded = OrjsonCodec().loads(body)
+
+    assert json.dumps(decoded, sort_keys=True) == json.dumps(json.loads(body), sort_keys=True)
+
+
+@requires_orjson
+@pytest.mark.parametrize("payload", [POLICY, {1: "int key", "big": 2 ** 70}, [{"nested": [None, "x"]}]])
+def test_orjson_encodes_like_stdlib(payload):
+    assert json.loads(OrjsonCodec().dumps(payload)) == json.loads(JsonCodec().dumps(payload))
+
+
+@pytest.mark.parametrize("payload", [[float("nan")], {"a": (1, float("-inf"))}, {float("inf"): "key"}])
+@pytest.mark.parametrize("codec", [JsonCodec(), pytest.param(None, marks=requires_orjson)])
+def test_non_finite_floats_are_rejected(codec, payload):
+    codec = codec or OrjsonCodec()
+    with pytest.raises(ValueError, match="Out of range float values"):
+        codec.dumps(payload)
+
+
+@requires_orjson
+def test_orjson_checks_nulls_without_the_stdlib_encoder(monkeypatch):
+    def stdlib_dumps(*args, **kwargs):
+        raise AssertionError("encoded with the stdlib")
+
+    monkeypatch.setattr(json, "dumps", stdlib_dumps)
+    assert json.loads(OrjsonCodec().dumps([POLICY, {"null": None, 1.5: [None, 2.5]}]))[0] == \
+        json.loads(json.JSONEncoder().encode(POLICY))
+
+
+@requires_orjson
+def test_invalid_json_raises_json_decode_error():
+    with pytest.raises(json.JSONDecodeError):
+        OrjsonCodec().loads(b"{not json")
+
+
+def test_default_codec_prefers_orjson():
+    assert default_codec().name == ("orjson" if orjson is not None else "json")
+
+
+@pytest.mark.parametrize("codec", [JsonCodec(), pytest.param(None, marks=requires_orjson)])
+def test_api_utils_round_trips_bodies_through_codec(codec):
+    api_utils = APIUtils(api_key="token", codec=codec)
+    adapter = mount_fake(api_utils, lambda request: (200, json.loads(request.body)))
+
+    assert api_utils.call("PUT", f"{TEST_FAKE_HOST}/echo", payload=POLICY) == json.loads(json.dumps(POLICY))
+    assert adapter.requests[0].headers["Content-Type"] == "application/json"
@@ -0,0 +1,65 @@
+import pickle
+
+import pytest
+
+from iomete_sdk.security.compact import freeze, freeze_all, thaw, frozen_model
+from iomete_sdk.security.policy_models import AccessPolicyView, AccessPolicyResource, AccessPolicyItem, \
+    AccessType, DataMaskPolicyView, DataMaskPolicyItem
+
+
+def policy_data(i):
+    return {
+        "id": i,
+        "name": f"policy-{i}",
+        "priority": "NORMAL",
+        "resources": [{"databases": ["sales"], "tables": ["orders"], "columns": ["*"]}],
+        "allowPolicyItems": [{"users": ["SELECT"], "accesses": ["SELECT"]}],
+    }
+
+
+def test_models_are_slotted_and_strings_interned():
+    first, second = (AccessPolicyView.from_dict(policy_data(i)) for i in range(2))
+
+    assert not hasattr(first, "__dict__")
+    assert first.resources[0].databases[0] is second.resources[0].databases[0]
+    assert first.allow_policy_items[0].users[0] == "SELECT"
+
+
+def test_frozen_policies_are_hashable_and_share_nested_values():
+    policies = [AccessPolicyView.from_dict(policy_data(i)) for i in range(3)]
+
+    frozen = freeze_all(policies)
+
+    assert type(frozen[0]) is frozen_model(AccessPolicyView)
+    assert len({*frozen, freeze(policies[0])}) == 3
+    assert frozen[0].resources is frozen[2].resources
+    with pytest.raises(AttributeError):
+        frozen[0].name = "renamed"
+
+
+def test_freezing_never_mixes_up_equal_values_of_different_types():
+    item = freeze(AccessPolicyItem(users=["SELECT"], accesses=[AccessType.SELECT]))
+
+    assert type(item.users[0]) is str
+    assert item.accesses[0] is AccessType.SELECT
+
+
+@pytest.mark.parametrize("policy", [
+    AccessPolicyView.from_dict(policy_data(1)),
+    DataMaskPolicyView(name="mask", data_mask_policy_items=[DataMaskPolicyItem(data_mask_type="MASK", users=["a"])]),
+])
+def test_thaw_and_to_dict_match_the_mutable_model(policy):
+    frozen = freeze(policy)
+
+    assert thaw(frozen) == policy
+    assert frozen.to_dict() == policy.to_dict()
+    assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+
+def test_thawed_policy_is_independent():
+    frozen = freeze(AccessPolicyView(resources=[AccessPolicyResource(tables=["t"])]))
+
+    policy = frozen.thaw()
+    policy.resources[0].tables.append("u")
+
+    assert frozen.resources[0].tables == ("t",)
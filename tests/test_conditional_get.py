@@ -0,0 +1,61 @@
+from iomete_sdk.api_utils import APIUtils
+from iomete_sdk.cache import TTLCache
+from iomete_sdk.security import DataSecurityApiClient
+from iomete_sdk.spark import SparkJobApiClient
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+POLICIES = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+
+
+def etag_handler(version):
+    def handler(request):
+        etag = f'"v{version[0]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return 304, b"", {"ETag": etag}
+        return 200, POLICIES[:version[0]], {"ETag": etag}
+
+    return handler
+
+
+def test_not_modified_returns_previously_decoded_views():
+    api_utils = APIUtils(api_key="token", validator_cache=TTLCache(maxsize=64, ttl=3600))
+    client = DataSecurityApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default", api_utils=api_utils)
+    version = [1]
+    adapter = mount_fake(api_utils, etag_handler(version))
+
+    first = client.get_access_policies()
+    second = client.get_access_policies()
+
+    assert second is first
+    assert adapter.requests[1].headers["If-None-Match"] == '"v1"'
+
+    version[0] = 2
+    third = client.get_access_policies()
+    assert [policy.name for policy in third] == ["a", "b"]
+
+
+def test_last_modified_is_revalidated_for_jobs():
+    api_utils = APIUtils(api_key="token", validator_cache=TTLCache(maxsize=64, ttl=3600))
+    job_client = SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default", api_utils=api_utils)
+    stamp = "Wed, 21 Oct 2026 07:28:00 GMT"
+
+    def handler(request):
+        if request.headers.get("If-Modified-Since") == stamp:
+            return 304, b""
+        return 200, {"items": [{"id": "job-1"}]}, {"Last-Modified": stamp}
+
+    mount_fake(api_utils, handler)
+
+    jobs = job_client.get_jobs()
+    assert job_client.get_jobs() is jobs
+    assert jobs == [{"id": "job-1"}]
+
+
+def test_conditional_headers_are_off_by_default():
+    api_utils = APIUtils(api_key="token")
+    adapter = mount_fake(api_utils, etag_handler([1]))
+
+    api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/access/policy")
+    api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/access/policy")
+
+    assert "If-None-Match" not in adapter.requests[1].headers
@@ -0,0 +1,169 @@
+import time
+from datetime import datetime, timezone
+
+from iomete_sdk.security.compact import freeze_all
+from iomete_sdk.security.evaluator import PolicyEvaluator, Principal, Resource
+from iomete_sdk.security.policy_models import AccessPolicyView, AccessPolicyResource, AccessPolicyItem, \
+    AccessType, PolicyPriority, ResourceInclusionType, ValidityPeriod, RowFilterPolicyView, \
+    RowFilterPolicyResource, RowFilterPolicyItem, DataMaskPolicyView, DataMaskPolicyResource, DataMaskPolicyItem
+
+ANA = Principal(user="ana", groups={"analysts"})
+BOB = Principal(user="bob", groups={"contractors"})
+
+
+def access_policy(name, databases=("sales",), tables=("*",), columns=("*",), allow=(), deny=(),
+                  allow_exceptions=(), priority=PolicyPriority.NORMAL, **kwargs):
+    return AccessPolicyView(
+        name=name, priority=priority,
+        resources=[AccessPolicyResource(databases=list(databases), tables=list(tables), columns=list(columns),
+                                        **kwargs)],
+        allow_policy_items=[AccessPolicyItem(**item) for item in allow],
+        allow_exceptions=[AccessPolicyItem(**item) for item in allow_exceptions],
+        deny_policy_items=[AccessPolicyItem(**item) for item in deny],
+    )
+
+
+def test_allow_deny_and_exceptions():
+    evaluator = PolicyEvaluator(access_policies=[
+        access_policy("read sales", allow=[{"groups": ["analysts", "contractors"], "accesses": [AccessType.SELECT]}],
+                      allow_exceptions=[{"users": ["bob"], "accesses": [AccessType.SELECT]}]),
+        access_policy("no salaries", tables=["salaries"], deny=[{"groups": ["public"], "accesses": [AccessType.ALL]}]),
+    ])
+    orders = Resource("Sales", "orders", "amount")
+
+    assert evaluator.check_access(ANA, AccessType.SELECT, orders).allowed
+    assert evaluator.check_access(ANA, AccessType.SELECT, orders).policy.name == "read sales"
+    assert not evaluator.check_access(ANA, AccessType.DROP, orders).allowed
+    assert not evaluator.check_access(BOB, AccessType.SELECT, orders).allowed
+    denied = evaluator.check_access(ANA, AccessType.SELECT, Resource("sales", "salaries", "total"))
+    assert not denied.allowed and denied.policy.name == "no salaries"
+
+
+def test_override_priority_allow_beats_normal_deny():
+    evaluator = PolicyEvaluator(access_policies=[
+        access_policy("deny all", deny=[{"groups": ["public"], "accesses": [AccessType.ALL]}]),
+        access_policy("break glass", allow=[{"users": ["ana"], "accesses": [AccessType.ALL]}],
+                      priority=PolicyPriority.OVERRIDE),
+    ])
+
+    assert evaluator.check_access(ANA, AccessType.UPDATE, Resource("sales", "orders")).allowed
+    assert not evaluator.check_access(BOB, AccessType.UPDATE, Resource("sales", "orders")).allowed
+
+
+def test_wildcards_exclusion_and_resource_levels():
+    evaluator = PolicyEvaluator(access_policies=[
+        access_policy("staging", databases=["stg_*"], allow=[{"users": ["ana"], "accesses": [AccessType.SELECT]}]),
+        access_policy("not pii", databases=["crm"], tables=["customers"], columns=["ssn", "email"],
+                      columns_inclusion_type=ResourceInclusionType.EXCLUDE,
+                      allow=[{"users": ["bob"], "accesses": [AccessType.SELECT]}]),
+    ])
+
+    assert evaluator.check_access(ANA, AccessType.SELECT, Resource("stg_orders", "t")).allowed
+    assert not evaluator.check_access(ANA, AccessType.SELECT, Resource("prod_orders", "t")).allowed
+    assert evaluator.check_access(BOB, AccessType.SELECT, Resource("crm", "customers", "name")).allowed
+    assert not evaluator.check_access(BOB, AccessType.SELECT, Resource("crm", "customers", "ssn")).allowed
+    # the policy doesn't cover every column, so it doesn't grant the whole table
+    assert not evaluator.check_access(BOB, AccessType.SELECT, Resource("crm", "customers")).allowed
+
+
+def test_validity_period_and_disabled_policies():
+    policy = access_policy("q1 only", allow=[{"users": ["ana"], "accesses": [AccessType.SELECT]}])
+    policy.validity_period = ValidityPeriod(start_time="2026/01/01 00:00:00", end_time="2026/04/01 00:00:00",
+                                            time_zone="Europe/Berlin")
+    disabled = access_policy("disabled", allow=[{"users": ["bob"], "accesses": [AccessType.SELECT]}])
+    disabled.is_enabled = False
+    evaluator = PolicyEvaluator(access_policies=[policy, disabled])
+    orders = Resource("sales", "orders")
+
+    assert evaluator.check_access(ANA, AccessType.SELECT, orders, at=datetime(2026, 2, 1, tzinfo=timezone.utc)).allowed
+    assert not evaluator.check_access(ANA, AccessType.SELECT, orders,
+                                      at=datetime(2026, 3, 31, 23, 30, tzinfo=timezone.utc)).allowed
+    assert not evaluator.check_access(BOB, AccessType.SELECT, orders).allowed
+
+
+def test_user_macros():
+    evaluator = PolicyEvaluator(access_policies=[
+        access_policy("everyone reads", allow=[{"users": ["{USER}"], "accesses": [AccessType.SELECT]}]),
+        access_policy("owners drop", allow=[{"users": ["{OWNER}"], "accesses": [AccessType.DROP]}]),
+    ])
+    orders = Resource("sales", "orders")
+
+    assert evaluator.check_access(Principal(user="alice"), AccessType.SELECT, orders).allowed
+    assert not evaluator.check_access(Principal(groups={"analysts"}), AccessType.SELECT, orders).allowed
+    # resource owners are unknown locally
+    assert not evaluator.check_access(Principal(user="alice"), AccessType.DROP, orders).allowed
+
+
+def test_malformed_validity_period_ignores_only_that_policy():
+    broken = access_policy("broken", allow=[{"users": ["bob"], "accesses": [AccessType.SELECT]}])
+    broken.validity_period = ValidityPeriod(start_time="2026-01-01", end_time=None)
+    evaluator = PolicyEvaluator(access_policies=[
+        broken, access_policy("read sales", allow=[{"users": ["ana"], "accesses": [AccessType.SELECT]}])])
+
+    assert evaluator.check_access(ANA, AccessType.SELECT, Resource("sales", "orders")).allowed
+    assert not evaluator.check_access(BOB, AccessType.SELECT, Resource("sales", "orders")).allowed
+
+
+def test_row_filter_and_mask():
+    evaluator = PolicyEvaluator(
+        filter_policies=[RowFilterPolicyView(
+            name="eu rows", resources=[RowFilterPolicyResource(database="sales", table="orders")],
+            row_filter_policy_items=[RowFilterPolicyItem(filter_expr="region = 'EU'", groups=["analysts"])])],
+        masking_policies=[DataMaskPolicyView(
+            name="hash emails", resources=[DataMaskPolicyResource(database="sales", table="*", column="email")],
+            data_mask_policy_items=[DataMaskPolicyItem(data_mask_type="MASK_HASH", users=["ana"])])],
+    )
+
+    evaluation = evaluator.evaluate(ANA, AccessType.SELECT, Resource("sales", "orders", "email"))
+
+    assert not evaluation.access.allowed
+    assert evaluation.row_filter.filter_expr == "region = 'EU'"
+    assert evaluation.mask.data_mask_type == "MASK_HASH"
+    assert evaluator.row_filter(BOB, Resource("sales", "orders")) is None
+    assert evaluator.mask(ANA, Resource("sales", "orders", "amount")) is None
+
+
+def test_batch_queries_only_look_at_indexed_candidates():
+    policies = [access_policy(f"table {i}", tables=[f"t{i}"],
+                              allow=[{"groups": [f"team-{i % 50}"], "accesses": [AccessType.SELECT]}])
+                for i in range(5000)]
+    evaluator = PolicyEvaluator(access_policies=freeze_all(policies))
+    queries = [(Principal(user="u", groups={f"team-{i % 50}"}), AccessType.SELECT, Resource("sales", f"t{i % 5000}"))
+               for i in range(20000)]
+
+    started = time.perf_counter()
+    decisions = evaluator.check_access_many(queries)
+    elapsed = time.perf_counter() - started
+
+    assert all(decision.allowed for decision in decisions)
+    assert len(evaluator._access.candidates(("sales", "t42", None))) == 1
+    # a linear scan would compare each query with 5000 policies
+    assert elapsed < 5
+
+
+def test_wildcard_database_policies_are_indexed_by_table_and_column():
+    policies = [access_policy(f"table {i}", databases=["*"], tables=[f"t{i}"],
+                              allow=[{"users": ["ana"], "accesses": [AccessType.SELECT]}])
+                for i in range(5000)]
+    policies += [
+        access_policy("emails anywhere", databases=["*"], tables=["*"], columns=["email"],
+                      deny=[{"users": ["ana"], "accesses": [AccessType.SELECT]}]),
+        access_policy("sales override", tables=["t7"], priority=PolicyPriority.OVERRIDE,
+                      allow=[{"users": ["bob"], "accesses": [AccessType.SELECT]}]),
+        access_policy("everything", databases=["*"], allow=[{"users": ["carl"], "accesses": [AccessType.SELECT]}]),
+    ]
+    evaluator = PolicyEvaluator(access_policies=policies)
+
+    assert [policy.policy.name for policy in evaluator._access.candidates(("sales", "t7", "email"))] == [
+        "sales override", "table 7", "emails anywhere", "everything"]
+    assert [policy.policy.name for policy in evaluator._access.candidates(("sales", "t7", None))] == [
+        "sales override", "table 7", "everything"]
+    assert not evaluator.check_access(ANA, AccessType.SELECT, Resource("hr", "t7", "email")).allowed
+    assert evaluator.check_access(ANA, AccessType.SELECT, Resource("hr", "t7", "name")).allowed
+
+    started = time.perf_counter()
+    for i in range(5000):
+        evaluator.check_access(ANA, AccessType.SELECT, Resource(f"db{i}", f"t{i}", "name"))
+    elapsed = time.perf_counter() - started
+    # the 5000 wildcard database policies used to be candidates for every query
+    assert elapsed < 2
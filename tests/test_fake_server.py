@@ -0,0 +1,92 @@
+import pytest
+
+from iomete_sdk.api_utils import APIUtils, ClientError
+from iomete_sdk.cache import TTLCache
+from iomete_sdk.retry import RetryPolicy
+from iomete_sdk.security import DataSecurityApiClient
+from iomete_sdk.security.policy_models import AccessPolicyView, AccessPolicyResource, AccessPolicyItem, AccessType
+from iomete_sdk.spark.run_waiter import RunWaiter
+
+JOB = {"name": "daily-etl", "bundleId": "bundle-1", "template": {"mainApplicationFile": "local:///app/job.py"}}
+
+
+def test_spark_job_lifecycle(server):
+    server.run_duration = 0.2
+    with server.spark_client() as client:
+        client.run_waiter = RunWaiter(client, min_interval=0.05)
+        job = client.create_job(payload=JOB)
+        assert client.get_job_by_name(job_name="daily-etl")["id"] == job["id"]
+
+        client.update_job(job_id=job["id"], payload={**JOB, "bundleId": "bundle-2"})
+        assert client.get_job_by_id(job_id=job["id"])["bundleId"] == "bundle-2"
+
+        run = client.submit_job_run(job_id=job["id"], payload={})
+        assert run["status"] == "RUNNING"
+        assert client.wait_for_run(job_id=job["id"], run_id=run["id"], timeout=10)["status"] == "COMPLETED"
+        assert len(client.get_job_run_logs(job_id=job["id"], run_id=run["id"])) == 3
+
+        aborted = client.submit_job_run(job_id=job["id"], payload={})
+        assert client.cancel_job_run(job_id=job["id"], run_id=aborted["id"])["status"] == "ABORTED"
+        assert [r["id"] for r in client.iter_job_runs(job_id=job["id"], page_size=1)] == [run["id"], aborted["id"]]
+
+        client.delete_job_by_id(job_id=job["id"])
+        with pytest.raises(ClientError) as error:
+            client.get_job_by_id(job_id=job["id"])
+        assert error.value.status == 404
+
+
+def test_pagination_and_conflicts(server):
+    for i in range(25):
+        server.add_job({**JOB, "name": f"job-{i}"})
+
+    with server.spark_client() as client:
+        assert [job["name"] for job in client.iter_jobs(page_size=10)] == [f"job-{i}" for i in range(25)]
+        with pytest.raises(ClientError) as error:
+            client.create_job(payload={**JOB, "name": "job-3"})
+        assert error.value.status == 409
+
+
+def test_policies_round_trip_and_stream(server):
+    policy = AccessPolicyView(
+        name="read orders", resources=[AccessPolicyResource(databases=["sales"], tables=["orders"], columns=["*"])],
+        allow_policy_items=[AccessPolicyItem(groups=["analysts"], accesses=[AccessType.SELECT])])
+    with DataSecurityApiClient(host=server.host, api_key=server.api_key, domain=server.domain) as client:
+        created = client.create_access_policy(policy)
+        assert created.id == 1 and created.allow_policy_items == policy.allow_policy_items
+
+        results = client.create_access_policies([AccessPolicyView(name=f"p-{i}", resources=[]) for i in range(20)], max_workers=8)
+        assert not [result for result in results if isinstance(result, Exception)]
+        streamed = [p.name for p in client.iter_access_policies()]
+        assert streamed[0] == "read orders" and sorted(streamed[1:]) == sorted(f"p-{i}" for i in range(20))
+
+        client.delete_access_policy_by_id(created.id)
+        assert len(client.get_access_policies()) == 20
+
+
+def test_injected_failures_are_retried(server):
+    api_utils = APIUtils(api_key=server.api_key, retry_policy=RetryPolicy(max_attempts=3, backoff_base=0.001))
+    job = server.add_job(JOB)
+    with server.spark_client(api_utils=api_utils) as client:
+        server.fail_next(2, status=503)
+        assert client.get_job_by_id(job_id=job["id"])["id"] == job["id"]
+
+        server.fail_next(3, status=502)
+        with pytest.raises(ClientError) as error:
+            client.get_job_by_id(job_id=job["id"])
+        assert error.value.status == 502
+    api_utils.close()
+
+
+def test_conditional_gets_and_authentication(server):
+    server.add_policy("mask", {"name": "hash emails", "resources": [], "dataMaskPolicyItems": []})
+    api_utils = APIUtils(api_key=server.api_key, validator_cache=TTLCache(ttl=60))
+    with DataSecurityApiClient(host=server.host, api_key=server.api_key, domain=server.domain,
+                               api_utils=api_utils) as client:
+        first = client.get_masking_policies()
+        assert client.get_masking_policies() is first
+    api_utils.close()
+
+    with pytest.raises(ClientError) as error:
+        with server.spark_client(api_key="wrong") as client:
+            client.get_jobs()
+    assert error.value.status == 401
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import iomete_sdk.api_utils
+
+SRC = str(Path(iomete_sdk.api_utils.__file__).resolve().parents[1])
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": SRC}
+    return subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True, check=True)
+
+
+def loaded_modules(statement: str) -> set:
+    return set(run_python("-c", f"{statement}\nimport sys\nprint(' '.join(sys.modules))").stdout.split())
+
+
+def import_times(statement: str) -> dict:
+    """Module -> (self, cumulative) import time in microseconds, from `python -X importtime`."""
+    times = {}
+    for line in run_python("-X", "importtime", "-c", statement).stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "self [us]" not in line:
+            own, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def test_sync_clients_do_not_import_the_async_stack():
+    spark = loaded_modules("from iomete_sdk.spark import SparkJobApiClient")
+    assert "iomete_sdk.spark.spark_job" in spark
+    assert not {"aiohttp", "asyncio", "iomete_sdk.spark.async_spark_job", "dataclasses_json"} & spark
+
+    security = loaded_modules("from iomete_sdk.security import DataSecurityApiClient")
+    assert "iomete_sdk.security.data_security" in security
+    assert not {"aiohttp", "asyncio", "iomete_sdk.security.async_data_security"} & security
+
+
+def test_policy_codecs_compile_on_first_use():
+    output = run_python("-c", "\n".join([
+        "from iomete_sdk.security.policy_codecs import _CODECS",
+        "from iomete_sdk.security.policy_models import AccessPolicyView",
+        "print(len(_CODECS))",
+        "AccessPolicyView.from_dict({'name': 'p', 'resources': [{'databases': ['db']}]})",
+        "print(' '.join(sorted(cls.__name__ for cls in _CODECS)))",
+    ])).stdout.splitlines()
+
+    assert output == ["0", "AccessPolicyItem AccessPolicyResource AccessPolicyView ValidityPeriod"]
+
+
+def test_sdk_modules_import_quickly():
+    for statement in ["from iomete_sdk.spark import SparkJobApiClient",
+                      "from iomete_sdk.security import DataSecurityApiClient"]:
+        times = import_times(statement)
+        # the SDK's own modules, without the third-party libraries they import
+        own = sum(own for name, (own, _) in times.items() if name.startswith("iomete_sdk"))
+        assert own < 150_000, f"{statement}: {own / 1000:.1f} ms in iomete_sdk modules"
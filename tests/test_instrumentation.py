@@ -0,0 +1,132 @@
+import pytest
+import requests
+
+from iomete_sdk.api_utils import APIUtils, ClientError
+from iomete_sdk.instrumentation import Histogram, MetricsCollector, RequestHook, url_template
+from iomete_sdk.retry import RetryPolicy
+from iomete_sdk.spark import SparkJobApiClient
+from tests.fake_server import FakeIometeServer
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+class RecordingHook(RequestHook):
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, event):
+        self.calls.append(("before", event.attempt, event.status))
+
+    def after_response(self, event):
+        self.calls.append(("after", event.attempt, event.status))
+
+    def on_error(self, event):
+        self.calls.append(("error", event.attempt, type(event.error).__name__))
+
+
+def test_url_templates():
+    base = "https://dataplane.test/api/v2/domains/prod/sdk/spark/jobs"
+    assert url_template(f"{base}?page=0&size=10") == "/api/v2/domains/{domain}/sdk/spark/jobs"
+    assert url_template(f"{base}/9f1c/runs") == "/api/v2/domains/{domain}/sdk/spark/jobs/{job_id}/runs"
+    assert url_template(f"{base}/9f1c/runs/r-2/logs?range=5m") == \
+        "/api/v2/domains/{domain}/sdk/spark/jobs/{job_id}/runs/{run_id}/logs"
+    assert url_template(f"{base}/name/daily") == "/api/v2/domains/{domain}/sdk/spark/jobs/name/{job_name}"
+    assert url_template("https://dataplane.test/api/v1/domains/prod/data-security/mask/policy/12") == \
+        "/api/v1/domains/{domain}/data-security/mask/policy/{policy_id}"
+
+
+def test_hooks_see_every_attempt():
+    statuses = iter([503, 200])
+    hook = RecordingHook()
+    collector = MetricsCollector()
+    api_utils = APIUtils(api_key="token", retry_policy=RetryPolicy(backoff_base=0.001), hooks=[hook, collector])
+    mount_fake(api_utils, lambda request: (next(statuses), {"id": "job-1"}))
+
+    api_utils.call(method="PUT", url=f"{TEST_FAKE_HOST}/api/v2/domains/d/sdk/spark/jobs/job-1", payload={"a": 1})
+
+    assert hook.calls == [("before", 1, None), ("after", 1, 503), ("before", 2, None), ("after", 2, 200)]
+    stats = collector.stats("PUT", "/api/v2/domains/{domain}/sdk/spark/jobs/{job_id}")
+    assert (stats.requests, stats.errors, stats.retries) == (2, 1, 1)
+    assert stats.bytes_sent == 2 * len(api_utils.codec.dumps({"a": 1}))
+    assert stats.bytes_received == 2 * len(b'{"id": "job-1"}')
+    assert stats.total.count == 2
+
+
+def test_errors_and_failing_hooks():
+    class BrokenHook(RequestHook):
+        def before_request(self, event):
+            raise RuntimeError("broken")
+
+    hook = RecordingHook()
+    api_utils = APIUtils(api_key="token", retry_policy=RetryPolicy(max_attempts=1), hooks=[BrokenHook(), hook])
+
+    def handler(request):
+        raise requests.exceptions.ConnectionError("refused")
+
+    mount_fake(api_utils, handler)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs")
+
+    assert hook.calls == [("before", 1, None), ("error", 1, "ConnectionError")]
+
+
+def test_connect_time_and_snapshot_against_a_server():
+    collector = MetricsCollector()
+    with FakeIometeServer() as server:
+        job = server.add_job({"name": "job", "bundleId": "b"})
+        api_utils = APIUtils(api_key=server.api_key, hooks=[collector])
+        client = SparkJobApiClient(host=server.host, api_key=server.api_key, domain=server.domain,
+                                   api_utils=api_utils)
+        for _ in range(5):
+            client.get_job_by_id(job_id=job["id"])
+        with pytest.raises(ClientError):
+            client.get_job_by_id(job_id="missing")
+        api_utils.close()
+
+    stats = collector.stats("GET", "/api/v2/domains/{domain}/sdk/spark/jobs/{job_id}")
+    assert (stats.requests, stats.errors) == (6, 1)
+    # one new connection, reused afterwards
+    assert stats.connect.counts[0] >= 5 and stats.connect.max > 0
+    snapshot = collector.snapshot()["GET /api/v2/domains/{domain}/sdk/spark/jobs/{job_id}"]
+    assert snapshot["total"]["count"] == 6 and snapshot["total"]["p50"] is not None
+
+
+def test_histogram_percentiles():
+    histogram = Histogram(bounds=(0.01, 0.1, 1.0))
+    for value in [0.005] * 90 + [0.05] * 9 + [3.0]:
+        histogram.observe(value)
+
+    assert histogram.percentile(0.5) == 0.01
+    assert histogram.percentile(0.95) == 0.1
+    assert histogram.percentile(1.0) == 3.0
+    assert Histogram().percentile(0.5) is None
+
+
+def test_open_telemetry_hook():
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    from iomete_sdk.otel import OpenTelemetryHook
+
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    reader = InMemoryMetricReader()
+    hook = OpenTelemetryHook(tracer_provider=tracer_provider, meter_provider=MeterProvider(metric_readers=[reader]))
+
+    api_utils = APIUtils(api_key="token", hooks=[hook])
+    mount_fake(api_utils, lambda request: (404, {"errorCode": "NOT_FOUND"}))
+    with pytest.raises(ClientError):
+        api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/api/v1/domains/d/data-security/access/policy/3")
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "GET /api/v1/domains/{domain}/data-security/access/policy/{policy_id}"
+    assert span.attributes["http.response.status_code"] == 404
+    assert span.attributes["error.type"] == "404"
+    metrics = {metric.name for resource in reader.get_metrics_data().resource_metrics
+               for scope in resource.scope_metrics for metric in scope.metrics}
+    assert {"http.client.request.duration", "http.client.request.body.size",
+            "http.client.response.body.size"} <= metrics
@@ -0,0 +1,70 @@
+import pytest
+
+from iomete_sdk.api_utils import ClientError
+from iomete_sdk.spark.job_index import JobNameIndex
+
+JOB = {"name": "daily-etl", "bundleId": "bundle-1", "template": {"mainApplicationFile": "local:///app/job.py"}}
+
+
+def test_job_name_index_follows_renames():
+    index = JobNameIndex()
+    index.add_all([{"id": "1", "name": "a"}, {"id": "2", "name": "b"}, {"name": "no-id"}])
+    assert len(index) == 2 and index.get("a") == "1"
+
+    index.add({"id": "1", "name": "renamed"})
+    assert "a" not in index and index.get("renamed") == "1"
+
+    index.add({"id": "3", "name": "b"})
+    index.discard_id("2")
+    assert index.get("b") == "3"
+
+    index.discard_name("b")
+    index.discard_id("1")
+    assert len(index) == 0
+
+
+def test_run_operations_resolve_names_locally(server):
+    jobs = [server.add_job({**JOB, "name": f"job-{i}"}) for i in range(5)]
+    with server.spark_client(job_index=JobNameIndex()) as client:
+        client.get_jobs()
+        requests = server.request_count
+
+        run = client.submit_job_run_by_name("job-3", payload={})
+        assert run["jobId"] == jobs[3]["id"]
+        assert client.get_job_run_by_name("job-3", run["id"])["id"] == run["id"]
+        assert [r["id"] for r in client.get_job_runs_by_name("job-3")] == [run["id"]]
+        assert client.cancel_job_run_by_name("job-3", run["id"])["status"] == "ABORTED"
+        # no lookups by name
+        assert server.request_count == requests + 4
+
+
+def test_index_is_kept_current_by_writes(server):
+    with server.spark_client(job_index=JobNameIndex()) as client:
+        job = client.create_job(payload=JOB)
+        assert client.job_index.get("daily-etl") == job["id"]
+
+        client.update_job(job_id=job["id"], payload={**JOB, "name": "hourly-etl"})
+        assert "daily-etl" not in client.job_index
+        assert client.resolve_job_id("hourly-etl") == job["id"]
+
+        client.delete_job_by_id(job_id=job["id"])
+        assert len(client.job_index) == 0
+        with pytest.raises(ClientError):
+            client.submit_job_run_by_name("hourly-etl", payload={})
+
+
+def test_misses_and_stale_ids_are_refreshed(server):
+    job = server.add_job(JOB)
+    with server.spark_client(job_index=JobNameIndex()) as client:
+        # miss: one lookup by name, then served from the index
+        client.submit_job_run_by_name("daily-etl", payload={})
+        requests = server.request_count
+        client.submit_job_run_by_name("daily-etl", payload={})
+        assert server.request_count == requests + 1
+
+        # recreated by someone else: the stale id gets a 404, the name is looked up again
+        del server.jobs[job["id"]]
+        recreated = server.add_job(JOB)
+        run = client.submit_job_run_by_name("daily-etl", payload={})
+        assert run["jobId"] == recreated["id"]
+        assert client.job_index.get("daily-etl") == recreated["id"]
@@ -0,0 +1,87 @@
+import pytest
+
+from iomete_sdk.spark.job_upsert import UpsertAction, job_hash, normalize_job
+from iomete_sdk.spark.spark_job import Flow
+
+JOB = {"name": "daily-etl", "bundleId": "bundle-1", "flow": "PRIORITY",
+       "template": {"mainApplicationFile": "local:///app/job.py", "arguments": ["--day", "today"],
+                    "sparkConf": {"spark.executor.cores": "2", "spark.executor.memory": "4g"}}}
+
+
+def test_job_hash_ignores_server_fields_and_key_order():
+    current = {"id": "42", "createdAt": "2024-01-01", "status": "ACTIVE", "name": "daily-etl",
+               "bundleId": "bundle-1", "flow": "PRIORITY",
+               "template": {"sparkConf": {"spark.executor.memory": "4g", "spark.executor.cores": "2"},
+                            "arguments": ["--day", "today"], "mainApplicationFile": "local:///app/job.py",
+                            "volumeId": None, "configMaps": [{"id": "7", "key": "app.conf", "content": "x"}]}}
+    desired = {**JOB, "flow": Flow.PRIORITY, "description": None,
+               "template": {**JOB["template"], "configMaps": [{"key": "app.conf", "content": "x"}]}}
+
+    assert job_hash(desired) == job_hash(current)
+    assert normalize_job({"name": "daily-etl", "template": {"arguments": []}}) == {"name": "daily-etl"}
+
+    reordered = {**desired, "template": {**desired["template"], "arguments": ["today", "--day"]}}
+    assert job_hash(reordered) != job_hash(current)
+
+
+def test_job_hash_counts_removed_and_nulled_fields():
+    current = {"id": "42", **JOB, "schedule": "0 3 * * *", "priority": "HIGH"}
+
+    assert job_hash({**JOB, "schedule": "0 3 * * *"}) != job_hash(current)
+    assert job_hash({**JOB, "schedule": None, "priority": "HIGH"}) != job_hash(current)
+    assert job_hash({**JOB, "schedule": "0 3 * * *", "priority": "HIGH"}) == job_hash(current)
+
+
+def test_upsert_job_creates_then_skips_unchanged_then_updates(server):
+    with server.spark_client() as client:
+        created = client.upsert_job(JOB)
+        assert created.action == UpsertAction.CREATED
+
+        requests = server.request_count
+        unchanged = client.upsert_job(JOB)
+        assert unchanged.action == UpsertAction.UNCHANGED
+        assert unchanged.job["id"] == created.job["id"]
+        # a single GET by name, no PUT
+        assert server.request_count == requests + 1
+
+        changed = {**JOB, "template": {**JOB["template"], "arguments": ["--day", "yesterday"]}}
+        updated = client.upsert_job(changed)
+        assert updated.action == UpsertAction.UPDATED
+        assert server.jobs[created.job["id"]]["template"]["arguments"] == ["--day", "yesterday"]
+
+        with pytest.raises(ValueError):
+            client.upsert_job({"bundleId": "bundle-1"})
+
+
+def test_upsert_job_deploys_a_removed_field(server):
+    scheduled = {**JOB, "schedule": "0 3 * * *"}
+    with server.spark_client() as client:
+        job = client.upsert_job(scheduled).job
+        assert client.upsert_job(scheduled).action == UpsertAction.UNCHANGED
+
+        assert client.upsert_job(JOB).action == UpsertAction.UPDATED
+        assert "schedule" not in server.jobs[job["id"]]
+        assert client.upsert_job(JOB).action == UpsertAction.UNCHANGED
+
+        assert client.upsert_job(scheduled).action == UpsertAction.UPDATED
+        assert client.upsert_job({**JOB, "schedule": None}).action == UpsertAction.UPDATED
+
+
+def test_upsert_jobs_lists_once_and_reports_per_job(server):
+    existing = [server.add_job({**JOB, "name": f"job-{i}"}) for i in range(20)]
+    payloads = [{**JOB, "name": f"job-{i}", "bundleId": "bundle-2" if i % 5 == 0 else "bundle-1"} for i in range(30)]
+    # the server rejects creates without a bundle
+    payloads.append({"name": "no-bundle"})
+
+    with server.spark_client() as client:
+        results = client.upsert_jobs(payloads, max_workers=8)
+
+    assert isinstance(results[-1], ValueError)
+    actions = [result.action for result in results[:-1]]
+    assert actions[:20] == [UpsertAction.UPDATED if i % 5 == 0 else UpsertAction.UNCHANGED for i in range(20)]
+    assert actions[20:] == [UpsertAction.CREATED] * 10
+    assert [result.job["id"] for result in results[:20]] == [job["id"] for job in existing]
+    assert len(server.jobs) == 30
+
+    with server.spark_client() as client, pytest.raises(ValueError):
+        client.upsert_jobs([JOB, JOB])
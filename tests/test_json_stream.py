@@ -0,0 +1,80 @@
+import json
+from json import JSONDecodeError
+
+import pytest
+
+from iomete_sdk.api_utils import ClientError, APIUtils
+from iomete_sdk.cache import TTLCache
+from iomete_sdk.json_stream import iter_json_array
+from iomete_sdk.security import DataSecurityApiClient
+from iomete_sdk.security.policy_models import AccessPolicyView
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+DOCUMENT = [
+    {"id": 1, "name": "café ☃", "items": [1, 2.5, -3e10], "nested": {"a": [True, None]}},
+    12345.678e-2,
+    "plain, [string]",
+    [],
+    {},
+    -0.5,
+    False,
+]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_decodes_across_any_chunk_boundary(size):
+    data = json.dumps(DOCUMENT, ensure_ascii=False, indent=2).encode("utf-8")
+
+    assert list(iter_json_array(chunked(data, size))) == DOCUMENT
+
+
+def test_empty_array_and_wrapped_items():
+    assert list(iter_json_array([b" [ ", b" ] "])) == []
+    assert list(iter_json_array(chunked(b'{"items": [1, 2], "total": 2}', 3))) == [1, 2]
+
+
+@pytest.mark.parametrize("data", [b"[1, 2", b"[1 2]", b'[{"a": ]', b"42", b""])
+def test_malformed_input_raises(data):
+    with pytest.raises(JSONDecodeError):
+        list(iter_json_array(chunked(data, 2)))
+
+
+def test_elements_are_yielded_before_the_body_is_read():
+    read = []
+
+    def chunks():
+        for chunk in [b"[1,", b"2,", b"3]"]:
+            read.append(chunk)
+            yield chunk
+
+    elements = iter_json_array(chunks())
+    assert next(elements) == 1
+    assert read == [b"[1,"]
+
+
+def test_stream_array_raises_client_error():
+    api_utils = APIUtils(api_key="token")
+    mount_fake(api_utils, lambda request: (404, {"message": "not found"}))
+
+    with pytest.raises(ClientError) as e:
+        list(api_utils.stream_array("GET", f"{TEST_FAKE_HOST}/missing"))
+    assert e.value.status == 404
+
+
+def test_iter_access_policies_yields_views_and_warms_cache():
+    security_client = DataSecurityApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default",
+                                            cache=TTLCache())
+    policies = [{"id": i, "name": f"policy-{i}", "priority": "NORMAL", "isEnabled": True} for i in range(500)]
+    adapter = mount_fake(security_client.api_utils, lambda request: (200, policies))
+
+    views = list(security_client.iter_access_policies())
+
+    assert all(isinstance(view, AccessPolicyView) for view in views)
+    assert [view.name for view in views] == [policy["name"] for policy in policies]
+    assert security_client.get_access_policy_by_id(42).name == "policy-42"
+    assert len(adapter.requests) == 1
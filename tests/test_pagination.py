@@ -0,0 +1,92 @@
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+from iomete_sdk.pagination import iter_pages
+from iomete_sdk.spark import SparkJobApiClient
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+def paged_handler(total, key="items"):
+    def handler(request):
+        query = parse_qs(urlparse(request.url).query)
+        page, size = int(query["page"][0]), int(query["size"][0])
+        items = [{"id": f"job-{i}"} for i in range(page * size, min(total, (page + 1) * size))]
+        return 200, {key: items} if key else items
+
+    return handler
+
+
+def test_iter_jobs_walks_all_pages_with_filters():
+    job_client = SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default")
+    adapter = mount_fake(job_client.api_utils, paged_handler(250))
+
+    jobs = list(job_client.iter_jobs(page_size=100, name="etl", status=None))
+
+    assert [job["id"] for job in jobs] == [f"job-{i}" for i in range(250)]
+    queries = [parse_qs(urlparse(request.url).query) for request in adapter.requests]
+    assert [query["page"] for query in queries] == [["0"], ["1"], ["2"]]
+    assert all(query["name"] == ["etl"] and "status" not in query for query in queries)
+
+
+def test_iter_job_runs_handles_list_pages_and_exact_multiple():
+    job_client = SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default")
+    adapter = mount_fake(job_client.api_utils, paged_handler(20, key=None))
+
+    runs = list(job_client.iter_job_runs(job_id="job-1", page_size=10, prefetch=False))
+
+    assert len(runs) == 20
+    assert len(adapter.requests) == 3
+    assert urlparse(adapter.requests[0].url).path.endswith("/job-1/runs")
+
+
+def test_stops_when_server_ignores_pagination():
+    everything = list(range(10))
+
+    assert list(iter_pages(lambda page, size: everything, page_size=5)) == everything
+    assert list(iter_pages(lambda page, size: everything, page_size=50)) == everything
+
+
+def test_next_page_is_prefetched_while_current_is_consumed():
+    fetched = []
+    second_page_requested = threading.Event()
+
+    def fetch_page(page, size):
+        fetched.append(page)
+        if page == 1:
+            second_page_requested.set()
+        return list(range(page * size, (page + 1) * size)) if page < 3 else []
+
+    pages = iter_pages(fetch_page, page_size=2)
+    assert next(pages) == 0
+    assert second_page_requested.wait(timeout=5)
+    assert list(pages) == [1, 2, 3, 4, 5]
+    assert fetched == [0, 1, 2, 3]
+
+
+def test_abandoned_iterator_stops_fetching():
+    fetched = []
+
+    def fetch_page(page, size):
+        fetched.append(page)
+        time.sleep(0.01)
+        return [page] * size
+
+    pages = iter_pages(fetch_page, page_size=1)
+    assert next(pages) == 0
+    pages.close()
+    time.sleep(0.05)
+
+    assert len(fetched) <= 2
+
+
+def test_errors_surface_to_the_caller():
+    def fetch_page(page, size):
+        if page == 1:
+            raise RuntimeError("boom")
+        return [page] * size
+
+    with pytest.raises(RuntimeError):
+        list(iter_pages(fetch_page, page_size=3))
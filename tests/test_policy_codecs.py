@@ -0,0 +1,152 @@
+import os
+import random
+import subprocess
+import sys
+import threading
+import warnings
+
+import pytest
+from dataclasses_json.core import _asdict, _decode_dataclass
+
+from iomete_sdk.security import policy_models
+from iomete_sdk.security import policy_codecs
+from iomete_sdk.security.policy_codecs import ModelCodec
+from iomete_sdk.security.policy_models import AccessPolicyView, DataMaskPolicyItem, PolicyPriority
+
+MODELS = [policy_models.ValidityPeriod, policy_models.AccessPolicyResource, policy_models.AccessPolicyItem,
+          policy_models.AccessPolicyView, policy_models.DataMaskPolicyResource, policy_models.DataMaskPolicyItem,
+          policy_models.DataMaskPolicyView, policy_models.RowFilterPolicyItem,
+          policy_models.RowFilterPolicyResource, policy_models.RowFilterPolicyView]
+
+SCALARS = [None, "", "text", 7, "7", 0, 1.5, True, False, "NORMAL", "OVERRIDE", "INCLUDE", "SELECT",
+           PolicyPriority.OVERRIDE, ["a", None, 3], [], ["SELECT", "READ", None]]
+
+
+def random_value(rng: random.Random, depth: int):
+    if depth < 2 and rng.random() < 0.3:
+        if rng.random() < 0.5:
+            return random_dict(rng, rng.choice(MODELS), depth + 1)
+        return [random_dict(rng, rng.choice(MODELS), depth + 1) for _ in range(rng.randint(0, 2))]
+    return rng.choice(SCALARS)
+
+
+def random_dict(rng: random.Random, model: type, depth: int = 0) -> dict:
+    data = {}
+    for name, key in ModelCodec(model).encode_names.items():
+        roll = rng.random()
+        if roll < 0.2:
+            continue
+        data[name if roll < 0.3 else key] = random_value(rng, depth)
+    if rng.random() < 0.2:
+        data["unknownField"] = "ignored"
+    return data
+
+
+def outcome(fn, *args, **kwargs):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        try:
+            result = repr(fn(*args, **kwargs))
+        except Exception as e:
+            result = type(e)
+    return result, [str(warning.message) for warning in caught]
+
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda model: model.__name__)
+@pytest.mark.parametrize("infer_missing", [False, True])
+def test_decoding_matches_dataclasses_json(model, infer_missing):
+    rng = random.Random(f"{model.__name__}-{infer_missing}")
+
+    for _ in range(200):
+        data = random_dict(rng, model)
+
+        expected = outcome(_decode_dataclass, model, data, infer_missing)
+        assert outcome(model.from_dict, data, infer_missing=infer_missing) == expected, data
+
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda model: model.__name__)
+@pytest.mark.parametrize("encode_json", [False, True])
+def test_encoding_matches_dataclasses_json(model, encode_json):
+    rng = random.Random(f"{model.__name__}-{encode_json}")
+
+    for _ in range(200):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            try:
+                obj = _decode_dataclass(model, random_dict(rng, model), False)
+            except Exception:
+                continue
+
+        assert outcome(obj.to_dict, encode_json=encode_json) == outcome(_asdict, obj, encode_json=encode_json)
+
+
+def test_keeps_dataclasses_json_quirks():
+    assert DataMaskPolicyItem.from_dict({}).data_mask_type == "(None,)"
+    assert DataMaskPolicyItem().to_dict()["dataMaskType"] == [None]
+    assert AccessPolicyView().to_dict(encode_json=True)["priority"] is PolicyPriority.NORMAL
+
+
+def test_json_round_trip_and_subclasses():
+    class Extended(AccessPolicyView):
+        pass
+
+    view = AccessPolicyView.from_json('{"name": "p", "priority": "OVERRIDE", "resources": [{"tables": ["t"]}]}')
+
+    assert AccessPolicyView.from_json(view.to_json()) == view
+    assert type(Extended.from_dict(view.to_dict())) is Extended
+    assert Extended.from_dict(view.to_dict()).to_dict() == view.to_dict()
+
+
+@pytest.mark.parametrize("attempt", range(5))
+def test_first_use_from_many_threads(monkeypatch, attempt):
+    monkeypatch.setattr(policy_codecs, "_CODECS", {})
+    data = {"name": "p", "resources": [{"databases": ["db"]}],
+            "validitySchedules": [{"startTime": "2024/01/01 00:00:00"}],
+            "allowPolicyItems": [{"users": ["alice"], "accesses": ["SELECT"]}]}
+    barrier = threading.Barrier(8)
+    results = []
+
+    def decode():
+        barrier.wait()
+        try:
+            results.append(repr(AccessPolicyView.from_dict(data)))
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=decode) for _ in range(8)]
+    switch_interval = sys.getswitchinterval()
+    # recording warnings isn't thread-safe; the single-threaded tests check them
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        # switch threads as often as possible while the codecs compile
+        sys.setswitchinterval(1e-6)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+        expected = repr(_decode_dataclass(AccessPolicyView, data, False))
+
+    assert results == [expected] * 8
+
+
+def test_falls_back_without_dataclasses_json_internals():
+    script = "\n".join([
+        "import dataclasses_json.core as core",
+        "internal = core._user_overrides_or_exts",
+        "del core._user_overrides_or_exts",
+        "from iomete_sdk.security import policy_codecs",
+        # dataclasses_json itself still needs it
+        "core._user_overrides_or_exts = internal",
+        "from iomete_sdk.security.policy_models import AccessPolicyView",
+        "policy = AccessPolicyView.from_dict({'name': 'p', 'resources': [{'databases': ['db']}]})",
+        "print(policy_codecs.CODECS_SUPPORTED, len(policy_codecs._CODECS), policy.to_dict()['resources'][0]['databases'])",
+    ])
+    package = os.path.dirname(os.path.dirname(policy_codecs.__file__))
+    env = {**os.environ, "PYTHONPATH": os.path.dirname(package)}
+    output = subprocess.run([sys.executable, "-W", "ignore", "-c", script], env=env, capture_output=True,
+                            text=True, check=True).stdout
+
+    assert output.strip() == "False 0 ['db']"
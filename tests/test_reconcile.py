@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from iomete_sdk.security import DataSecurityApiClient
+from iomete_sdk.security.policy_models import AccessPolicyView, AccessPolicyResource, AccessPolicyItem, AccessType
+from iomete_sdk.security.reconcile import PolicyKind, plan_policies
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+def access_policy(name, policy_id=None, users=("alice", "bob"), description="managed"):
+    return AccessPolicyView(
+        id=policy_id,
+        name=name,
+        description=description,
+        resources=[AccessPolicyResource(databases=["db"], tables=["tbl"], columns=["*"])],
+        allow_policy_items=[AccessPolicyItem(users=list(users), accesses=[AccessType.SELECT])],
+    )
+
+
+def test_plan_ignores_server_assigned_fields_and_set_ordering():
+    desired = [access_policy("same"), access_policy("changed"), access_policy("new")]
+    current = [access_policy("same", policy_id=1, users=("bob", "alice")),
+               access_policy("changed", policy_id=2, description="old"),
+               access_policy("stale", policy_id=3)]
+
+    plan = plan_policies(PolicyKind.ACCESS, desired, current)
+
+    assert [policy.name for policy in plan.creates] == ["new"]
+    assert [(update.policy_id, update.changed_fields) for update in plan.updates] == [(2, ["description"])]
+    assert plan.unchanged == ["same"]
+    assert plan.deletes == []
+
+    plan = plan_policies(PolicyKind.ACCESS, desired, current, delete_missing=True)
+    assert [policy.id for policy in plan.deletes] == [3]
+
+
+def test_plan_rejects_duplicate_desired_names():
+    with pytest.raises(ValueError, match="Duplicate"):
+        plan_policies(PolicyKind.ACCESS, [access_policy("a"), access_policy("a")], [])
+
+
+def test_plan_scales_to_many_policies():
+    current = [access_policy(f"p-{i}", policy_id=i) for i in range(2000)]
+    desired = [access_policy(f"p-{i}", description="changed" if i % 100 == 0 else "managed") for i in range(2000)]
+
+    plan = plan_policies(PolicyKind.ACCESS, desired, current)
+
+    assert len(plan.updates) == 20
+    assert len(plan.unchanged) == 1980
+
+
+def test_apply_plan_sends_only_changes():
+    client = DataSecurityApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default")
+    server = {1: access_policy("same", policy_id=1).to_dict(encode_json=True),
+              2: access_policy("changed", policy_id=2, description="old").to_dict(encode_json=True),
+              3: access_policy("stale", policy_id=3).to_dict(encode_json=True)}
+
+    def handler(request):
+        if request.method == "GET":
+            return 200, list(server.values())
+        if request.method == "POST":
+            return 200, {**json.loads(request.body), "id": 4}
+        if request.method == "PUT":
+            return 200, json.loads(request.body)
+        return 204, b""
+
+    adapter = mount_fake(client.api_utils, handler)
+
+    plan = client.plan_access_policies([access_policy("same"), access_policy("changed"), access_policy("new")],
+                                       delete_missing=True)
+    result = client.apply_policy_plan(plan)
+
+    assert sorted((r.method, r.url.split("/policy")[1]) for r in adapter.requests[1:]) == [
+        ("DELETE", "/3"), ("POST", ""), ("PUT", "/2")]
+    assert result.creates[0].id == 4
+    assert result.updates[0].description == "managed"
+    assert result.deletes == [None]
+    assert result.errors == []
@@ -0,0 +1,98 @@
+import pytest
+import requests
+
+from iomete_sdk.api_utils import APIUtils, ClientError
+from iomete_sdk.retry import RetryPolicy, parse_retry_after
+from iomete_sdk.spark import SparkJobApiClient
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr("iomete_sdk.api_utils.time.sleep", recorded.append)
+    return recorded
+
+
+def responses(*results):
+    results = list(results)
+
+    def handler(request):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return handler
+
+
+def test_get_is_retried_on_throttling_and_gateway_errors(sleeps):
+    api_utils = APIUtils(api_key="token", retry_policy=RetryPolicy(max_attempts=4))
+    adapter = mount_fake(api_utils, responses((429, {}), (503, {}), (502, {}), (200, {"id": "job-1"})))
+
+    assert api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs/job-1") == {"id": "job-1"}
+    assert len(adapter.requests) == 4
+    assert len(sleeps) == 3
+
+
+def test_retries_are_exhausted_with_client_error(sleeps):
+    api_utils = APIUtils(api_key="token", retry_policy=RetryPolicy(max_attempts=2))
+    mount_fake(api_utils, responses((503, {"message": "busy"}), (503, {"message": "busy"})))
+
+    with pytest.raises(ClientError) as err:
+        api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs/job-1")
+
+    assert err.value.status == 503
+    assert len(sleeps) == 1
+
+
+def test_connection_errors_are_retried(sleeps):
+    api_utils = APIUtils(api_key="token")
+    mount_fake(api_utils, responses(requests.exceptions.ConnectionError("reset"), (200, {"id": "job-1"})))
+
+    assert api_utils.call(method="DELETE", url=f"{TEST_FAKE_HOST}/jobs/job-1") == {"id": "job-1"}
+
+
+def test_retry_after_is_honored(sleeps):
+    api_utils = APIUtils(api_key="token", retry_policy=RetryPolicy(backoff_base=0.01))
+    mount_fake(api_utils, responses((429, {}, {"Retry-After": "7"}), (200, {})))
+
+    api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs")
+
+    assert sleeps == [7.0]
+
+
+def test_total_timeout_stops_retrying(sleeps):
+    api_utils = APIUtils(api_key="token", retry_policy=RetryPolicy(max_attempts=5, total_timeout=5))
+    adapter = mount_fake(api_utils, responses((429, {}, {"Retry-After": "10"})))
+
+    with pytest.raises(ClientError):
+        api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs")
+
+    assert len(adapter.requests) == 1
+    assert sleeps == []
+
+
+def test_post_is_retried_only_when_opted_in(sleeps):
+    job_client = SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default")
+    adapter = mount_fake(job_client.api_utils, responses((503, {}), (503, {}), (201, {"id": "run-1"})))
+
+    with pytest.raises(ClientError):
+        job_client.submit_job_run(job_id="job-1", payload={})
+    assert len(adapter.requests) == 1
+
+    assert job_client.submit_job_run(job_id="job-1", payload={}, retry=True) == {"id": "run-1"}
+    assert len(adapter.requests) == 3
+
+
+def test_backoff_uses_full_jitter():
+    policy = RetryPolicy(backoff_base=1, backoff_max=4)
+
+    assert all(0 <= policy.backoff(attempt=10) <= 4 for _ in range(100))
+    assert all(0 <= policy.backoff(attempt=1) <= 1 for _ in range(100))
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
@@ -0,0 +1,189 @@
+import io
+import math
+import threading
+import time
+
+import pytest
+
+from iomete_sdk.api_utils import ClientError
+from iomete_sdk.spark import SparkJobApiClient, run_metrics
+from iomete_sdk.spark.run_metrics import MetricSummary, RunMetricsCollector, RunSeries, flatten_metrics
+from iomete_sdk.spark.run_waiter import RunWaiter
+from tests.fake_server import FakeIometeServer
+
+
+def test_flatten_metrics_keeps_numeric_fields():
+    assert flatten_metrics({"runId": "r", "executors": 2, "done": True, "memory": {"usedBytes": 5, "pools": [1]}}) == \
+        {"executors": 2.0, "memory.usedBytes": 5.0}
+
+
+def test_run_series_ring_buffer_and_aggregates():
+    series = RunSeries("job", "run", capacity=4)
+    for second in range(6):
+        sample = {"cpu": float(second)}
+        if second >= 3:
+            sample["memory"] = 10.0 * second
+        series.append(sample, timestamp=100.0 + second)
+
+    assert len(series) == 4
+    assert list(series.timestamps()) == [102.0, 103.0, 104.0, 105.0]
+    assert list(series.column("cpu")) == [2.0, 3.0, 4.0, 5.0]
+    assert math.isnan(series.column("memory")[0]) and list(series.column("memory"))[1:] == [30.0, 40.0, 50.0]
+
+    summary = series.summary("memory")
+    assert (summary.count, summary.min, summary.max, summary.mean, summary.p50) == (3, 30.0, 50.0, 40.0, 40.0)
+    assert summary.rate == pytest.approx(10.0)
+    assert series.summary("missing") == MetricSummary(count=0)
+
+    columns = series.to_columns()
+    assert list(columns) == ["jobId", "runId", "timestamp", "cpu", "memory"]
+    assert columns["runId"] == ["run"] * 4
+
+
+@pytest.mark.skipif(run_metrics.np is None, reason="numpy is not installed")
+def test_summaries_match_without_numpy(monkeypatch):
+    series = RunSeries("job", "run", capacity=100)
+    for second in range(37):
+        series.append({"value": float((second * 7919) % 101), "sparse": second if second % 3 else math.nan},
+                      timestamp=float(second))
+
+    with_numpy = [series.summary("value"), series.summary("sparse")]
+    monkeypatch.setattr(run_metrics, "np", None)
+    without_numpy = [series.summary("value"), series.summary("sparse")]
+
+    for expected, actual in zip(with_numpy, without_numpy):
+        assert actual.count == expected.count
+        for name in ("min", "max", "mean", "p50", "p90", "p99", "rate"):
+            assert getattr(actual, name) == pytest.approx(getattr(expected, name))
+
+
+def wait_until_idle(collector: RunMetricsCollector, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while collector.watched_count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert collector.watched_count == 0
+
+
+def test_collector_samples_runs_until_they_finish():
+    with FakeIometeServer(run_duration=0.3) as server, \
+            SparkJobApiClient(host=server.host, api_key=server.api_key, domain=server.domain) as client:
+        client.run_waiter = RunWaiter(client, min_interval=0.05)
+        job = server.add_job({"name": "daily-etl"})
+        runs = [client.submit_job_run(job_id=job["id"], payload={}) for _ in range(3)]
+
+        with RunMetricsCollector(client, interval=0.05) as collector:
+            for run in runs:
+                collector.watch(job["id"], run["id"])
+            wait_until_idle(collector)
+
+            for run in runs:
+                series = collector.series(job["id"], run["id"])
+                assert len(series) >= 3
+                assert series.column("inputBytes")[-1] == 300_000
+                assert series.summary("inputBytes").rate > 0
+
+            pooled = collector.summary("memory.usedBytes")
+            assert pooled.min == pooled.max == 512 * 1024 * 1024
+            assert set(collector.summaries("inputBytes")) == {(job["id"], run["id"]) for run in runs}
+
+            columns = collector.to_columns(metrics=["inputBytes"])
+            assert list(columns) == ["jobId", "runId", "timestamp", "inputBytes"]
+            assert len(columns["runId"]) == len(columns["inputBytes"]) == pooled.count
+
+            out = io.StringIO()
+            collector.write_csv(out, metrics=["executors"])
+            lines = out.getvalue().splitlines()
+            assert lines[0] == "jobId,runId,timestamp,executors" and len(lines) == pooled.count + 1
+
+
+def test_collector_stops_on_client_errors():
+    with FakeIometeServer() as server, \
+            SparkJobApiClient(host=server.host, api_key=server.api_key, domain=server.domain) as client:
+        job = server.add_job({"name": "daily-etl"})
+        with RunMetricsCollector(client, interval=0.05, stop_on_terminal=False) as collector:
+            series = collector.watch(job["id"], "missing-run")
+            wait_until_idle(collector)
+            assert len(series) == 0
+
+            run = client.submit_job_run(job_id=job["id"], payload={})
+            collector.watch(job["id"], run["id"])
+            collector.unwatch(job["id"], run["id"])
+            assert collector.watched_count == 0
+
+        with pytest.raises(RuntimeError):
+            collector.watch(job["id"], run["id"])
+
+
+def test_last_sample_is_taken_on_the_collector_thread():
+    with FakeIometeServer(run_duration=0.2) as server, \
+            SparkJobApiClient(host=server.host, api_key=server.api_key, domain=server.domain) as client:
+        client.run_waiter = RunWaiter(client, min_interval=0.05)
+        job = server.add_job({"name": "daily-etl"})
+        run = client.submit_job_run(job_id=job["id"], payload={})
+
+        sampled_on = []
+        get_job_run_metrics = client.get_job_run_metrics
+
+        def recording(**kwargs):
+            sampled_on.append(threading.current_thread().name)
+            return get_job_run_metrics(**kwargs)
+
+        client.get_job_run_metrics = recording
+        # samples rarely, so the sample after the run finishes is the one `_finish` asks for
+        with RunMetricsCollector(client, interval=60) as collector:
+            series = collector.watch(job["id"], run["id"])
+            wait_until_idle(collector)
+
+        assert len(series) == 2
+        assert set(sampled_on) == {"iomete-run-metrics"}
+
+
+def test_close_during_a_failing_poll():
+    with FakeIometeServer() as server, \
+            SparkJobApiClient(host=server.host, api_key=server.api_key, domain=server.domain) as client:
+        client.run_waiter = RunWaiter(client, min_interval=0.05)
+        job = server.add_job({"name": "daily-etl"})
+        run = client.submit_job_run(job_id=job["id"], payload={})
+
+        polling, fail = threading.Event(), threading.Event()
+        get_job_run_by_id = client.get_job_run_by_id
+
+        def failing(**kwargs):
+            polling.set()
+            fail.wait(5)
+            raise ClientError(status=404, content={})
+
+        client.get_job_run_by_id = failing
+        collector = RunMetricsCollector(client, interval=60)
+        collector.watch(job["id"], run["id"])
+        assert polling.wait(5)
+        # cancels the run waiter future while its poll is in flight
+        collector.close()
+        fail.set()
+
+        client.get_job_run_by_id = get_job_run_by_id
+        # the poller survived: a later watch still resolves
+        assert client.run_waiter.watch(job["id"], run["id"]).result(timeout=5)["id"] == run["id"]
+        assert collector.watched_count == 0
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_collector_recovers_when_sampling_raises():
+    with FakeIometeServer() as server, \
+            SparkJobApiClient(host=server.host, api_key=server.api_key, domain=server.domain) as client:
+        job = server.add_job({"name": "daily-etl"})
+        broken, working = (client.submit_job_run(job_id=job["id"], payload={}) for _ in range(2))
+
+        get_job_run_metrics = client.get_job_run_metrics
+        # float() overflows in flatten_metrics, outside the request's error handling
+        client.get_job_run_metrics = lambda **kwargs: {"inputBytes": 10 ** 400}
+        with RunMetricsCollector(client, interval=0.05, stop_on_terminal=False) as collector:
+            collector.watch(job["id"], broken["id"])
+            wait_until_idle(collector)
+
+            client.get_job_run_metrics = get_job_run_metrics
+            series = collector.watch(job["id"], working["id"])
+            deadline = time.monotonic() + 5
+            while len(series) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert len(series) >= 2
@@ -0,0 +1,114 @@
+import threading
+from concurrent.futures import wait
+from urllib.parse import urlparse
+
+import pytest
+
+from iomete_sdk.api_utils import ClientError
+from iomete_sdk.spark import SparkJobApiClient
+from iomete_sdk.spark.run_waiter import RunWaiter, _WatchedRun
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+def make_client(statuses_by_run):
+    job_client = SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default")
+    job_client.run_waiter = RunWaiter(job_client, min_interval=0.01, max_interval=0.05)
+
+    def handler(request):
+        run_id = urlparse(request.url).path.rsplit("/", 1)[-1]
+        statuses = statuses_by_run[run_id]
+        if isinstance(statuses, int):
+            return statuses, {"message": "not found"}
+        status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+        return 200, {"id": run_id, "status": status}
+
+    adapter = mount_fake(job_client.api_utils, handler)
+    return job_client, adapter
+
+
+def test_wait_for_run_returns_terminal_run():
+    job_client, adapter = make_client({"run-1": ["STARTING", "RUNNING", "RUNNING", "COMPLETED"]})
+
+    run = job_client.wait_for_run(job_id="job-1", run_id="run-1", timeout=5)
+
+    assert run == {"id": "run-1", "status": "COMPLETED"}
+    assert len(adapter.requests) == 4
+    assert "job-1" in job_client.run_waiter.expected_durations
+
+
+def test_many_runs_share_one_poller_thread():
+    statuses = {f"run-{i}": ["RUNNING"] * (i % 5 + 1) + ["FAILED" if i % 7 == 0 else "COMPLETED"] for i in range(50)}
+    job_client, _ = make_client(statuses)
+    finished = []
+    threads_before = threading.active_count()
+
+    futures = job_client.wait_for_runs([("job-1", run_id) for run_id in statuses], callback=finished.append)
+    assert threading.active_count() <= threads_before + 1
+
+    done, not_done = wait(futures, timeout=10)
+
+    assert not not_done
+    assert [future.result()["id"] for future in futures] == list(statuses)
+    assert futures[7].result()["status"] == "FAILED"
+    assert len(finished) == 50
+    assert job_client.run_waiter.watched_count == 0
+
+
+def test_client_error_fails_the_future():
+    job_client, _ = make_client({"missing": 404})
+
+    with pytest.raises(ClientError):
+        job_client.wait_for_run(job_id="job-1", run_id="missing", timeout=5)
+
+
+def test_client_error_after_timeout_keeps_the_poller_alive():
+    job_client, _ = make_client({"run-2": ["COMPLETED"]})
+    in_flight = threading.Event()
+    release = threading.Event()
+
+    def handler(request):
+        run_id = urlparse(request.url).path.rsplit("/", 1)[-1]
+        if run_id == "gone":
+            in_flight.set()
+            release.wait(timeout=5)
+            return 404, {"message": "not found"}
+        return 200, {"id": run_id, "status": "COMPLETED"}
+
+    mount_fake(job_client.api_utils, handler)
+    future = job_client.run_waiter.watch("job-1", "gone")
+    assert in_flight.wait(timeout=5)
+    # cancelled while the failing poll is in flight
+    future.cancel()
+    release.set()
+
+    assert job_client.wait_for_run(job_id="job-1", run_id="run-2", timeout=5)["status"] == "COMPLETED"
+
+
+def test_server_errors_are_retried():
+    job_client, _ = make_client({"run-1": ["RUNNING", "COMPLETED"]})
+    responses = [(503, {}), (503, {}), (200, {"id": "run-1", "status": "COMPLETED"})]
+    mount_fake(job_client.api_utils, lambda request: responses.pop(0))
+    job_client.api_utils.retry_policy.max_attempts = 1
+
+    assert job_client.wait_for_run(job_id="job-1", run_id="run-1", timeout=5)["status"] == "COMPLETED"
+
+
+def test_close_cancels_pending_futures():
+    job_client, _ = make_client({"run-1": ["RUNNING"]})
+    future = job_client.wait_for_runs([("job-1", "run-1")])[0]
+
+    job_client.close()
+
+    assert future.cancelled()
+
+
+def test_interval_backs_off_and_tightens_near_expected_finish():
+    waiter = RunWaiter(client=None, min_interval=1.0, max_interval=60.0, backoff_factor=2.0)
+    watched = _WatchedRun(job_id="job-1", run_id="run-1", future=None, callback=None, polls=6)
+    assert waiter._interval(watched) == 32.0
+
+    waiter.expected_durations["job-1"] = 10.0
+    assert waiter._interval(watched) <= 9.0
+
+    watched.watched_since -= 9.5
+    assert waiter._interval(watched) == 1.0
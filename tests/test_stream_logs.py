@@ -0,0 +1,73 @@
+from urllib.parse import urlparse, parse_qs
+
+from iomete_sdk.spark import SparkJobApiClient
+from iomete_sdk.spark.logs import LogDeduplicator, smallest_log_time_range
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+def log(second):
+    return {"date": f"2026-10-17T10:00:{second:02d}Z", "logLine": f"line {second}"}
+
+
+def test_follow_yields_each_line_once_and_stops_on_terminal_state(monkeypatch):
+    monkeypatch.setattr("iomete_sdk.spark.spark_job.time.sleep", lambda seconds: None)
+    job_client = SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default")
+    statuses = ["RUNNING", "RUNNING", "COMPLETED"]
+    windows = [[log(0), log(1)], [log(1), log(2), log(3)], [log(2), log(3), log(4)]]
+    ranges = []
+
+    def handler(request):
+        url = urlparse(request.url)
+        if url.path.endswith("/logs"):
+            ranges.append(parse_qs(url.query)["range"][0])
+            return 200, windows.pop(0)
+        return 200, {"id": "run-1", "status": statuses.pop(0)}
+
+    mount_fake(job_client.api_utils, handler)
+
+    lines = [entry["logLine"] for entry in job_client.stream_job_run_logs(job_id="job-1", run_id="run-1",
+                                                                          time_range="1h")]
+
+    assert lines == [f"line {second}" for second in range(5)]
+    assert ranges == ["1h", "5m", "5m"]
+
+
+def test_without_follow_fetches_once():
+    job_client = SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default")
+    adapter = mount_fake(job_client.api_utils, lambda request: (200, [log(0), log(0)]))
+
+    # a line logged twice in the same second is two entries
+    assert len(list(job_client.stream_job_run_logs(job_id="job-1", run_id="run-1", follow=False))) == 2
+    assert len(adapter.requests) == 1
+
+
+def test_deduplicator_keeps_repeats_within_a_window():
+    deduplicator = LogDeduplicator()
+
+    assert deduplicator.new_entries([log(0), log(0), log(1)]) == [log(0), log(0), log(1)]
+    # overlap with the previous window: only copies beyond the ones already yielded are new
+    assert deduplicator.new_entries([log(0), log(0), log(1), log(1), log(2)]) == [log(1), log(2)]
+    assert deduplicator.new_entries([log(1), log(2)]) == []
+
+
+def test_deduplicator_memory_is_bounded():
+    deduplicator = LogDeduplicator(max_tracked=3)
+
+    assert all(deduplicator.is_new(log(second)) for second in range(10))
+    assert len(deduplicator._keys) == 3
+    assert not deduplicator.is_new(log(2))
+    assert not deduplicator.is_new(log(9))
+
+
+def test_deduplicator_forgets_entries_at_the_watermark_once():
+    deduplicator = LogDeduplicator(max_tracked=2)
+    first = [{"date": "t1", "logLine": "a"}, {"date": "t1", "logLine": "b"}, {"date": "t2", "logLine": "c"}]
+
+    assert deduplicator.new_entries(first) == first
+    assert deduplicator.new_entries(first + [{"date": "t3", "logLine": "d"}]) == [{"date": "t3", "logLine": "d"}]
+
+
+def test_smallest_log_time_range():
+    assert smallest_log_time_range(10) == "5m"
+    assert smallest_log_time_range(301) == "15m"
+    assert smallest_log_time_range(10 ** 9) == "30d"
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from iomete_sdk.api_utils import APIUtils, DeadlineExceededError
+from iomete_sdk.throttle import TokenBucketRateLimiter, ConcurrencyLimiter, AdaptiveConcurrencyLimiter
+from iomete_sdk.timeouts import request_options
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+def test_token_bucket_allows_burst_then_paces():
+    limiter = TokenBucketRateLimiter(rate=10, burst=3)
+
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(0.1, abs=0.01)
+    assert limiter.reserve(max_wait=0.05) is None
+
+
+def test_shared_concurrency_limiter_bounds_in_flight_requests():
+    limiter = ConcurrencyLimiter(max_concurrency=2)
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def handler(request):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.pop()
+        return 200, {}
+
+    transports = [APIUtils(api_key="token", concurrency_limiter=limiter) for _ in range(2)]
+    for api_utils in transports:
+        mount_fake(api_utils, handler)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: transports[i % 2].call(method="GET", url=f"{TEST_FAKE_HOST}/jobs"), range(16)))
+
+    assert max(peak) <= 2
+    assert limiter.in_flight == 0
+
+
+def test_concurrency_limiter_serves_async_waiters():
+    limiter = ConcurrencyLimiter(max_concurrency=3)
+    peak = []
+
+    async def task():
+        await limiter.acquire_async()
+        peak.append(limiter.in_flight)
+        await asyncio.sleep(0.001)
+        limiter.release()
+
+    async def main():
+        await asyncio.gather(*[task() for _ in range(30)])
+
+    asyncio.run(main())
+
+    assert max(peak) <= 3
+    assert limiter.in_flight == 0
+
+
+def test_full_concurrency_limiter_respects_deadline():
+    limiter = ConcurrencyLimiter(max_concurrency=1)
+    limiter.acquire()
+    api_utils = APIUtils(api_key="token", concurrency_limiter=limiter)
+    mount_fake(api_utils, lambda request: (200, {}))
+
+    with request_options(deadline=0.05):
+        with pytest.raises(DeadlineExceededError):
+            api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs")
+
+
+def test_adaptive_limiter_grows_on_fast_responses_and_backs_off_on_throttling():
+    limiter = AdaptiveConcurrencyLimiter(initial_concurrency=4, max_concurrency=8, latency_target=0.5)
+
+    for _ in range(40):
+        limiter.acquire()
+        limiter.release(latency=0.01, status=200)
+    assert limiter.limit == 8
+
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(latency=0.01, status=429)
+    assert limiter.limit == 4
+
+    limiter.acquire()
+    limiter.release(latency=2.0, status=200)
+    assert limiter.limit == 4
@@ -0,0 +1,71 @@
+import pytest
+import requests
+
+from iomete_sdk.api_utils import APIUtils, RequestTimeoutError, DeadlineExceededError, ClientError
+from iomete_sdk.spark import SparkJobApiClient
+from iomete_sdk.timeouts import Timeout, request_options, current_request_options
+from tests.fakes import TEST_FAKE_HOST, mount_fake
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr("iomete_sdk.api_utils.time.sleep", lambda seconds: None)
+
+
+def test_client_timeouts_are_sent_with_every_request():
+    job_client = SparkJobApiClient(host=TEST_FAKE_HOST, api_key="token", domain="default",
+                                   timeout=Timeout(connect=2, read=15))
+    adapter = mount_fake(job_client.api_utils, lambda request: (200, {"id": "job-1"}))
+
+    job_client.get_job_by_id(job_id="job-1")
+    with request_options(timeout=(1, 5)):
+        job_client.get_job_by_id(job_id="job-1")
+
+    assert adapter.timeouts == [(2, 15), (1, 5)]
+
+
+def test_timeout_raises_request_timeout_error_after_retries():
+    api_utils = APIUtils(api_key="token")
+    adapter = mount_fake(api_utils, lambda request: (_ for _ in ()).throw(requests.exceptions.ReadTimeout("slow")))
+
+    with pytest.raises(RequestTimeoutError):
+        api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs")
+    assert len(adapter.requests) == api_utils.retry_policy.max_attempts
+
+    with pytest.raises(RequestTimeoutError):
+        api_utils.call(method="POST", url=f"{TEST_FAKE_HOST}/jobs", payload={})
+    assert len(adapter.requests) == api_utils.retry_policy.max_attempts + 1
+
+
+def test_deadline_bounds_attempt_timeouts_and_stops_retries():
+    api_utils = APIUtils(api_key="token", timeout=Timeout(connect=10, read=60))
+    adapter = mount_fake(api_utils, lambda request: (503, {}, {"Retry-After": "5"}))
+
+    with request_options(deadline=2):
+        with pytest.raises(ClientError):
+            api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs/job-1/runs/run-1/logs?range=30d")
+
+    assert len(adapter.requests) == 1
+    connect, read = adapter.timeouts[0]
+    assert connect <= 2 and read <= 2
+
+
+def test_expired_deadline_raises_without_sending():
+    api_utils = APIUtils(api_key="token")
+    adapter = mount_fake(api_utils, lambda request: (200, {}))
+
+    with request_options(deadline=0):
+        with pytest.raises(DeadlineExceededError):
+            api_utils.call(method="GET", url=f"{TEST_FAKE_HOST}/jobs")
+
+    assert adapter.requests == []
+
+
+def test_nested_deadline_cannot_extend_outer_deadline():
+    with request_options(deadline=1):
+        outer = current_request_options().deadline
+        with request_options(deadline=100, timeout=3):
+            assert current_request_options().deadline == outer
+            assert current_request_options().timeout == Timeout(3, 3)
+
+    assert current_request_options().deadline is None